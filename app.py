@@ -7,22 +7,75 @@
 
 import os
 import logging
+import copy
+import csv
+import datetime
+import gzip
 import hashlib
+import importlib.util
+import io
+import itertools
+import mimetypes
+import pickle
+import re
+import shutil
+import threading
+import time
+import uuid
+from array import array
+from bisect import bisect_left, bisect_right
+from collections import OrderedDict
+from collections.abc import Sequence
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
 from pathlib import Path
-from flask import Flask, request, jsonify, send_from_directory
+from flask import Flask, request, jsonify, send_from_directory, stream_with_context
 import json as json_lib
+import numpy as np
 
 # 配置日志
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Excel处理库
+# Excel处理库：pandas导入耗时且占用较多内存，启动时只检查是否安装，首次使用时再导入（见 _pandas）
+PANDAS_AVAILABLE = importlib.util.find_spec('pandas') is not None
+OPENPYXL_AVAILABLE = importlib.util.find_spec('openpyxl') is not None
+XLRD_AVAILABLE = importlib.util.find_spec('xlrd') is not None
+pd = None
+if not PANDAS_AVAILABLE:
+    logger.warning("pandas未安装，将使用openpyxl/xlrd流式读取Excel，转换缓存不可用。如需安装请运行: pip install pandas openpyxl")
+
+# Excel读取后端：pandas 解析整个工作簿为DataFrame并缓存；stream 用openpyxl/xlrd逐行读取，读够请求的行即停止。
+# auto 在安装了pandas时使用pandas
+EXCEL_READER_PANDAS = 'pandas'
+EXCEL_READER_STREAM = 'stream'
+EXCEL_READER = os.environ.get('EXCEL_READER', 'auto')
+EXCEL_READER_BACKEND = (EXCEL_READER if EXCEL_READER in (EXCEL_READER_PANDAS, EXCEL_READER_STREAM) else
+                        EXCEL_READER_PANDAS if PANDAS_AVAILABLE else EXCEL_READER_STREAM)
+EXCEL_READER_AVAILABLE = (PANDAS_AVAILABLE if EXCEL_READER_BACKEND == EXCEL_READER_PANDAS else
+                          OPENPYXL_AVAILABLE or XLRD_AVAILABLE)
+
+
+def _pandas():
+    """首次使用时导入pandas"""
+    global pd
+    if pd is None:
+        import pandas
+        pd = pandas
+    return pd
+
+# 可选的brotli压缩库
 try:
-    import pandas as pd
-    PANDAS_AVAILABLE = True
+    import brotli
+    BROTLI_AVAILABLE = True
 except ImportError:
-    PANDAS_AVAILABLE = False
-    logger.warning("pandas未安装，Excel读取功能将不可用。请运行: pip install pandas openpyxl")
+    BROTLI_AVAILABLE = False
+
+# 可选的高性能JSON解析库
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 # 创建Flask应用
 app = Flask(__name__,
@@ -37,363 +90,3598 @@ def add_cors_headers(response):
     response.headers['Access-Control-Allow-Headers'] = 'Content-Type'
     return response
 
-# 全局数据存储
-evaluation_results = []
-excel_dir_path = None  # 保存Excel目录路径
-excel_files_list = []  # 保存扫描到的Excel文件列表
-results_file_path = None  # 保存结果文件路径
-filter_options = {
-    "categories": [],
-    "scenarios": [],
-    "correctness_options": ["correct", "incorrect", "parse_failed"]
-}
+
+# JSON响应压缩：小于该大小的响应不压缩
+COMPRESS_MIN_BYTES = 1024
 
 
-def load_evaluation_results(file_path):
-    """加载评测结果"""
-    global evaluation_results, filter_options
+@app.after_request
+def compress_response(response):
+    """按Accept-Encoding对JSON响应进行brotli/gzip压缩"""
+    if (response.status_code != 200 or response.mimetype != 'application/json' or
+            response.direct_passthrough or response.is_streamed or
+            'Content-Encoding' in response.headers):
+        return response
 
-    results = []
-    categories = set()
-    scenarios = set()
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < COMPRESS_MIN_BYTES:
+        return response
 
-    try:
-        if not Path(file_path).exists():
-            logger.warning(f"文件不存在: {file_path}")
+    accept_encodings = request.accept_encodings
+    if BROTLI_AVAILABLE and accept_encodings['br']:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers['Content-Encoding'] = 'br'
+    elif accept_encodings['gzip']:
+        response.set_data(gzip.compress(data, compresslevel=5))
+        response.headers['Content-Encoding'] = 'gzip'
+    return response
+
+
+# 进程启动标识，与数据版本号一起生成ETag，避免重启后版本号重复导致误判
+PROCESS_EPOCH = uuid.uuid4().hex[:8]
+
+
+def make_etag(*parts):
+    """根据数据版本、请求参数等生成ETag（多进程模式下包含共享状态版本，各worker的ETag可以互认）"""
+    return hashlib.md5(repr((PROCESS_EPOCH, shared_state.applied_version) + parts).encode('utf-8')).hexdigest()[:20]
+
+
+def not_modified(etag):
+    """请求的If-None-Match与ETag匹配时返回304响应，否则返回None"""
+    if request.if_none_match.contains_weak(etag):
+        response = app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    return None
+
+
+def with_etag(response, etag):
+    """为响应设置ETag（弱校验，压缩后仍有效），浏览器每次使用前需重新验证"""
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+CORRECTNESS_OPTIONS = ["correct", "incorrect", "parse_failed"]
+
+
+class Dataset:
+    """数据快照：评测结果、各类索引、筛选选项和Excel映射
+
+    快照创建后不再修改。请求开始时取一次 dataset 引用，之后读到的都是同一版本的数据；
+    加载、扫描、清空时构造新快照并整体替换引用，读取方无需加锁，也不会看到加载了一半的数据。
+    """
+
+    # 结果相关字段，变化时递增version
+    RESULT_FIELDS = ('results', 'alarm_index', 'duplicate_alarm_ids', 'search_index', 'columns', 'metrics',
+                     'summaries', 'categories', 'scenarios', 'results_file_path', 'run_id')
+    # Excel相关字段，变化时递增excel_version
+    EXCEL_FIELDS = ('excel_dir_path', 'excel_files')
+
+    def __init__(self, version=0, excel_version=0, results=(), alarm_index=None, duplicate_alarm_ids=(),
+                 search_index=None, columns=None, metrics=None, summaries=(), categories=(), scenarios=(),
+                 results_file_path=None, run_id=None, excel_dir_path=None, excel_files=(), scenario_index=None):
+        self.version = version  # 数据版本号，每次加载或清空数据时递增
+        self.excel_version = excel_version  # Excel扫描版本号，每次扫描或清空时递增
+        self.results = results  # 评测结果（list 或 LazyResults）
+        self.alarm_index = alarm_index if alarm_index is not None else {}  # alarm_id -> results中的位置
+        self.duplicate_alarm_ids = duplicate_alarm_ids  # 加载时发现的重复alarm_id
+        self.search_index = search_index  # 关键词搜索索引（SearchIndex，mmap模式下为None）
+        self.columns = columns  # 筛选和统计用的列式数据（ResultColumns）
+        self.metrics = metrics  # 混淆矩阵和P/R/F1指标（MetricsEngine）
+        self.summaries = summaries  # 列表页用的结果摘要（与results一一对应，mmap模式下为空）
+        self.categories = categories
+        self.scenarios = scenarios
+        self.results_file_path = results_file_path  # 结果文件路径
+        self.run_id = run_id  # 运行ID（RunRegistry中的键）
+        self.excel_dir_path = excel_dir_path  # Excel目录路径
+        self.excel_files = excel_files  # 扫描到的Excel文件列表
+        self.scenario_index = scenario_index  # scenario_id -> 工作簿/sheet 的解析索引（ScenarioIndex）
+
+    def replace(self, **changes):
+        """返回修改了部分字段的新快照"""
+        fields = dict(vars(self))
+        if any(field in changes for field in self.RESULT_FIELDS):
+            fields['version'] += 1
+            fields['scenario_index'] = None
+        if any(field in changes for field in self.EXCEL_FIELDS):
+            fields['excel_version'] += 1
+            fields['scenario_index'] = None
+        fields.update(changes)
+        return Dataset(**fields)
+
+    @property
+    def scenario_version(self):
+        return (self.version, self.excel_version)
+
+    @property
+    def filter_options(self):
+        return {
+            "categories": list(self.categories),
+            "scenarios": list(self.scenarios),
+            "correctness_options": CORRECTNESS_OPTIONS
+        }
+
+    def get_result(self, alarm_id):
+        """通过alarm_id索引查找结果，不存在时返回None"""
+        position = self.alarm_index.get(alarm_id)
+        if position is None or position >= len(self.results):
+            return None
+        return self.results[position]
+
+    def alarm_id_at(self, position):
+        """返回某一位置结果的alarm_id（mmap模式下无需解码整条记录）"""
+        if isinstance(self.results, LazyResults):
+            return self.results.alarm_id(position)
+        return self.results[position].get('alarm_id')
+
+
+# 当前数据快照（只整体替换，不原地修改）
+dataset = Dataset()
+dataset_lock = threading.Lock()  # 串行化快照替换，读取无需加锁
+
+
+def update_dataset(**changes):
+    """基于当前快照构造新快照并替换，返回新快照"""
+    global dataset
+
+    with dataset_lock:
+        previous = dataset
+        dataset = dataset.replace(**changes)
+        # Excel目录或结果文件变化时记录会话，重启后自动恢复
+        if session_fields(dataset) != session_fields(previous):
+            save_session(dataset)
+        return dataset
+# 结果加载模式：memory 解析后全部常驻内存；mmap 只保留每行的字节范围，访问时从文件读取并解码记录
+
+# 结果加载模式：memory 解析后全部常驻内存；mmap 内存映射文件，按需解码记录
+LOAD_MODE_MEMORY = 'memory'
+LOAD_MODE_MMAP = 'mmap'
+LOAD_MODES = (LOAD_MODE_MEMORY, LOAD_MODE_MMAP)
+DEFAULT_LOAD_MODE = os.environ.get('RESULTS_LOAD_MODE', LOAD_MODE_MEMORY)
+# 并行解析的进程数（1表示串行解析），以及启用并行解析的最小文件大小
+DEFAULT_LOAD_WORKERS = int(os.environ.get('RESULTS_LOAD_WORKERS', 1))
+PARALLEL_LOAD_MIN_BYTES = 16 * 1024 * 1024
+PARALLEL_LOAD_CHUNKS_PER_WORKER = 4
+
+# 关键词搜索覆盖的字段
+SEARCH_FIELDS = ('input', 'expected_output', 'model_output')
+# 候选集合缩小到该规模后不再继续求交集，直接逐条校验
+SEARCH_VERIFY_THRESHOLD = 64
+
+
+def _search_field_text(result, field):
+    """返回用于搜索匹配的小写字段文本"""
+    value = result.get(field, '')
+    return value.lower() if isinstance(value, str) else ''
+
+
+def _match_search(result, search_lower):
+    """判断结果是否包含搜索词（子串匹配，不区分大小写）"""
+    return any(search_lower in _search_field_text(result, field) for field in SEARCH_FIELDS)
+
+
+# 结果摘要中长文本字段的预览长度（字符）
+SUMMARY_PREVIEW_CHARS = 200
+# 列表页展示的告警内容长度（与前端原先的截断规则一致）
+ALARM_CONTENT_CHARS = 100
+ALARM_CONTENT_PREFIX = '告警内容：'
+# 摘要中原样保留的字段
+SUMMARY_FIELDS = ('alarm_id', 'meta', 'predicted_label', 'reference_label', 'correct')
+# 摘要中可能出现的全部字段
+SUMMARY_KEYS = frozenset(SUMMARY_FIELDS + ('alarm_content',) + tuple(f'{field}_preview' for field in SEARCH_FIELDS))
+
+
+def _alarm_content(text):
+    """从模型输入中提取列表页展示的告警内容"""
+    for line in text.split('\n'):
+        if line.startswith(ALARM_CONTENT_PREFIX):
+            content = line.replace(ALARM_CONTENT_PREFIX, '')
+            return content[:ALARM_CONTENT_CHARS] + ('...' if len(line) > ALARM_CONTENT_CHARS else '')
+    return text[:ALARM_CONTENT_CHARS] + '...'
+
+
+def result_summary(result):
+    """列表页用的结果摘要：标签和meta字段，以及长文本字段的截断预览"""
+    summary = {field: result[field] for field in SUMMARY_FIELDS if field in result}
+    text = result.get('input')
+    summary['alarm_content'] = _alarm_content(text) if isinstance(text, str) else ''
+    for field in SEARCH_FIELDS:
+        value = result.get(field)
+        if isinstance(value, str):
+            summary[f'{field}_preview'] = value[:SUMMARY_PREVIEW_CHARS]
+    return summary
+
+
+def project_fields(record, fields):
+    """只保留指定的字段（alarm_id始终保留）"""
+    projected = {'alarm_id': record['alarm_id']} if 'alarm_id' in record else {}
+    projected.update((field, record[field]) for field in fields if field in record)
+    return projected
+
+
+def parse_fields_param(args):
+    """解析fields参数（逗号分隔或重复传参），未指定时返回None"""
+    fields = [f.strip() for value in args.getlist('fields') for f in value.split(',') if f.strip()]
+    return fields or None
+
+
+# 文本索引的构建方式：lazy 首次搜索时在后台构建（未建索引的行逐条扫描），eager 加载完成后立即在后台构建，off 不建索引
+SEARCH_INDEX_MODE = os.environ.get('SEARCH_INDEX', 'lazy')
+# 构建索引时每批处理的字符数，控制构建期间的峰值内存
+SEARCH_INDEX_BATCH_CHARS = 1 << 20
+# 二元组编码：两个字符的码位（不超过21位）拼成一个整数
+GRAM_CHAR_BITS = 21
+
+
+def _gram_codes(text):
+    """文本中二元组的编码（去重、升序）；跨字段、跨行的分隔符\\x00不组成二元组"""
+    chars = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32).astype(np.int64)
+    first, second = chars[:-1], chars[1:]
+    codes = (first << GRAM_CHAR_BITS) | second
+    return np.unique(codes[(first != 0) & (second != 0)])
+
+
+class _SearchSegment:
+    """索引段：覆盖 [start, stop) 行，grams 为升序的二元组编码，positions[offsets[i]:offsets[i+1]] 为 grams[i] 的行位置"""
+
+    __slots__ = ('start', 'stop', 'grams', 'offsets', 'positions')
+
+    def __init__(self, start, stop, grams, offsets, positions):
+        self.start = start
+        self.stop = stop
+        self.grams = grams
+        self.offsets = offsets
+        self.positions = positions
+
+    @classmethod
+    def from_pairs(cls, start, stop, grams, positions):
+        """由按 (二元组, 行位置) 排好序的配对构建"""
+        unique_grams, first_index = np.unique(grams, return_index=True)
+        offsets = np.append(first_index, len(grams)).astype(np.uint32)
+        return cls(start, stop, unique_grams, offsets, positions.astype(np.uint32))
+
+    def expanded_grams(self):
+        return np.repeat(self.grams, np.diff(self.offsets))
+
+    def lookup(self, codes):
+        """返回各二元组的行位置数组；任一二元组不存在时返回None"""
+        index = np.searchsorted(self.grams, codes)
+        if np.any(index >= len(self.grams)) or np.any(self.grams[np.minimum(index, len(self.grams) - 1)] != codes):
+            return None
+        return [self.positions[self.offsets[i]:self.offsets[i + 1]] for i in index.tolist()]
+
+    def nbytes(self):
+        return self.grams.nbytes + self.offsets.nbytes + self.positions.nbytes
+
+
+class SearchIndex:
+    """关键词搜索的二元组倒排索引
+
+    加载时不建索引，由 ensure_built 在后台线程中按批构建并追加索引段，相邻的小段逐步合并，段数保持在对数级别。
+    搜索时只使用已建索引的行，其余的行逐条扫描；索引只负责缩小候选范围，是否命中仍由 _match_search 按子串语义逐条校验。
+    跟踪模式下多个快照共用同一个索引，各自只取自身行数以内的位置。
+    """
+
+    def __init__(self):
+        self.segments = []  # 按行号排列的 _SearchSegment（整体替换，不原地修改）
+        self.indexed_rows = 0  # 已建索引的行数
+        self.building = False
+        self._lock = threading.Lock()
+
+    def __getstate__(self):
+        # 解析快照中不保存索引，恢复后按需重建
+        return {}
+
+    def __setstate__(self, state):
+        self.__init__()
+
+    def ensure_built(self, results):
+        """在后台为results中尚未建索引的行建立索引；正在构建时直接返回"""
+        with self._lock:
+            if self.building or self.indexed_rows >= len(results):
+                return
+            self.building = True
+        threading.Thread(target=self._build, args=(results,), name='search-index', daemon=True).start()
+
+    def _build(self, results):
+        started = time.time()
+        first_row = self.indexed_rows
+        try:
+            texts = []
+            chars = 0
+            for position in range(first_row, len(results)):
+                text = '\x00'.join(_search_field_text(results[position], field) for field in SEARCH_FIELDS)
+                texts.append(text)
+                chars += len(text) + 1
+                if chars >= SEARCH_INDEX_BATCH_CHARS:
+                    self._add_batch(texts)
+                    texts, chars = [], 0
+            if texts:
+                self._add_batch(texts)
+            logger.info(f"搜索索引构建完成：{first_row}-{self.indexed_rows} 行，{len(self.segments)} 个索引段，"
+                        f"{self.nbytes() / 1024 / 1024:.1f}MB，耗时 {time.time() - started:.2f}s")
+        except Exception as e:
+            logger.warning(f"构建搜索索引失败: {e}")
+        finally:
+            with self._lock:
+                self.building = False
+
+    def _add_batch(self, texts):
+        """为紧接已建索引之后的一批行建立索引段"""
+        start = self.indexed_rows
+        chars = np.frombuffer(''.join(text + '\x00' for text in texts).encode('utf-32-le'), dtype=np.uint32)
+        rows = np.repeat(np.arange(len(texts), dtype=np.int64),
+                         np.fromiter((len(text) + 1 for text in texts), dtype=np.int64, count=len(texts)))
+        first, second = chars[:-1].astype(np.int64), chars[1:].astype(np.int64)
+        # (二元组, 批内行号) 拼成一个整数去重排序，批内行数不超过批字符数（小于 2**21）
+        keys = np.unique(((first << GRAM_CHAR_BITS | second) << GRAM_CHAR_BITS | rows[:-1])[(first != 0) & (second != 0)])
+        segment = _SearchSegment.from_pairs(start, start + len(texts), keys >> GRAM_CHAR_BITS,
+                                            (keys & ((1 << GRAM_CHAR_BITS) - 1)) + start)
+        segments = self.segments + [segment]
+        # 前一段不大于新段的两倍时合并
+        while len(segments) > 1 and len(segments[-2].positions) <= 2 * len(segments[-1].positions):
+            segments[-2:] = [self._merge(segments[-2], segments[-1])]
+        self.segments = segments
+        self.indexed_rows = segment.stop
+
+    @staticmethod
+    def _merge(left, right):
+        grams = np.concatenate([left.expanded_grams(), right.expanded_grams()])
+        positions = np.concatenate([left.positions, right.positions])
+        # 稳定排序：同一二元组内前一段的行在前，行位置保持升序
+        order = np.argsort(grams, kind='stable')
+        return _SearchSegment.from_pairs(left.start, right.stop, grams[order], positions[order])
+
+    def candidates(self, search_lower, rows):
+        """返回 (前rows行中可能命中的行位置升序数组, 已建索引的行数)；搜索词过短或尚无索引时返回None"""
+        if len(search_lower) < 2:
+            return None
+        indexed = min(self.indexed_rows, rows)
+        segments = self.segments
+        if indexed == 0:
+            return None
+
+        codes = _gram_codes(search_lower)
+        if not len(codes):
+            return None
+        found = []
+        for segment in segments:
+            if segment.start >= indexed:
+                break
+            postings = segment.lookup(codes)
+            if postings is None:
+                continue
+            # 从最短的倒排列表开始求交集
+            postings.sort(key=len)
+            positions = postings[0]
+            for posting in postings[1:]:
+                if len(positions) <= SEARCH_VERIFY_THRESHOLD:
+                    break
+                positions = np.intersect1d(positions, posting, assume_unique=True)
+            found.append(positions)
+        positions = np.concatenate(found).astype(np.int64) if found else np.zeros(0, dtype=np.int64)
+        return positions[positions < indexed], indexed
+
+    def nbytes(self):
+        return sum(segment.nbytes() for segment in self.segments)
+
+    def stats(self):
+        return {
+            'indexed_rows': self.indexed_rows,
+            'segments': len(self.segments),
+            'bytes': self.nbytes(),
+            'building': self.building
+        }
+
+
+# 预测结果状态位
+STATUS_CORRECT = 1
+STATUS_INCORRECT = 2
+STATUS_PARSE_FAILED = 4
+
+
+def _result_status(result):
+    """计算结果的预测状态位（与筛选条件的判定规则一致）"""
+    parse_failed = result.get('predicted_label') is None
+    status = 0
+    if result.get('correct', False):
+        status |= STATUS_CORRECT
+    if not result.get('correct', True) and not parse_failed:
+        status |= STATUS_INCORRECT
+    if parse_failed:
+        status |= STATUS_PARSE_FAILED
+    return status
+
+
+def _encode_value(value, values, codes_map):
+    """字典编码：返回value的编码，新值追加到values"""
+    code = codes_map.get(value)
+    if code is None:
+        code = codes_map[value] = len(values)
+        values.append(value)
+    return code
+
+
+class ResultColumns:
+    """筛选和统计用的列式数据：每行的分类/场景编码和预测状态掩码
+
+    加载时逐条 add，加载完成后 finalize 转换为NumPy数组，筛选时做向量化的掩码运算。
+    """
+
+    def __init__(self):
+        self.categories = []  # 编码 -> 分类
+        self.scenarios = []  # 编码 -> scenario_id
+        self.labels = []  # 编码 -> 标签（预测标签和参考标签共用）
+        self._category_codes_map = {}  # 分类 -> 编码
+        self._scenario_codes_map = {}  # scenario_id -> 编码
+        self._label_codes_map = {}  # 标签 -> 编码
+        self._category_codes = array('i')
+        self._scenario_codes = array('i')
+        self._predicted_codes = array('i')
+        self._reference_codes = array('i')
+        self._status = array('B')
+        self.category_codes = None
+        self.scenario_codes = None
+        self.predicted_codes = None  # 解析失败（predicted_label为None）时为-1
+        self.reference_codes = None  # 参考标签未知时为-1
+        self.correct = None
+        self.incorrect = None
+        self.parse_failed = None
+        self.join_ids = None  # 按alarm_id排序的alarm_id数组（不同运行之间关联用）
+        self.join_positions = None  # join_ids中每个alarm_id对应的行位置
+        self._stores = {}  # 数组名 -> AppendOnlyArray，上面的各数组是它的视图
+        self.status_counts = {'correct': 0, 'incorrect': 0, 'parse_failed': 0}  # finalize时累加，统计接口直接使用
+
+    def add(self, result):
+        """追加一行"""
+        meta = result.get('meta', {})
+        self._category_codes.append(_encode_value(meta.get('category'), self.categories, self._category_codes_map))
+        self._scenario_codes.append(_encode_value(meta.get('scenario_id'), self.scenarios, self._scenario_codes_map))
+        self._status.append(_result_status(result))
+
+        predicted_label = result.get('predicted_label')
+        reference_label = result.get('reference_label')
+        if reference_label is None and predicted_label is not None and result.get('correct', False):
+            # 没有参考标签但预测正确时，参考标签即预测标签
+            reference_label = predicted_label
+        self._predicted_codes.append(
+            -1 if predicted_label is None else _encode_value(predicted_label, self.labels, self._label_codes_map))
+        self._reference_codes.append(
+            -1 if reference_label is None else _encode_value(reference_label, self.labels, self._label_codes_map))
+
+    def extend(self, other):
+        """追加另一组列式数据中尚未 finalize 的行（合并并行解析的各分块），编码换算为本对象的编码"""
+        for codes, other_codes, values, codes_map, other_values in (
+                (self._category_codes, other._category_codes, self.categories, self._category_codes_map,
+                 other.categories),
+                (self._scenario_codes, other._scenario_codes, self.scenarios, self._scenario_codes_map,
+                 other.scenarios),
+                (self._predicted_codes, other._predicted_codes, self.labels, self._label_codes_map, other.labels),
+                (self._reference_codes, other._reference_codes, self.labels, self._label_codes_map, other.labels)):
+            # 末尾追加-1，标签编码-1（未知）经换算后仍为-1
+            mapping = np.array([_encode_value(value, values, codes_map) for value in other_values] + [-1],
+                               dtype=np.intc)
+            codes.frombytes(mapping[np.frombuffer(other_codes, dtype=np.intc)].tobytes())
+        self._status.extend(other._status)
+        return self
+
+    def finalize(self):
+        """把追加的行转换为NumPy数组（已有数组时追加在后面，跟踪模式下只转换新增的行）"""
+        status = np.array(self._status, dtype=np.uint8)
+        appended = {
+            'category_codes': np.array(self._category_codes, dtype=np.int32),
+            'scenario_codes': np.array(self._scenario_codes, dtype=np.int32),
+            'predicted_codes': np.array(self._predicted_codes, dtype=np.int32),
+            'reference_codes': np.array(self._reference_codes, dtype=np.int32),
+            'correct': (status & STATUS_CORRECT) != 0,
+            'incorrect': (status & STATUS_INCORRECT) != 0,
+            'parse_failed': (status & STATUS_PARSE_FAILED) != 0
+        }
+        # 生成新字典而不是原地修改，已发布快照中的计数保持不变
+        self.status_counts = {name: count + int(np.count_nonzero(appended[name]))
+                              for name, count in self.status_counts.items()}
+        for name, values in appended.items():
+            store = self._stores.get(name)
+            if store is None:
+                store = self._stores[name] = AppendOnlyArray(values.dtype)
+                current = getattr(self, name)
+                if current is not None:
+                    store.extend(current)
+            # 只追加不修改，已发布快照中的视图保持不变
+            store.extend(values)
+            setattr(self, name, store.view())
+        self._category_codes = array('i')
+        self._scenario_codes = array('i')
+        self._predicted_codes = array('i')
+        self._reference_codes = array('i')
+        self._status = array('B')
+        return self
+
+    def __getstate__(self):
+        # 不保存追加用的存储（可能有预留的容量），恢复后再追加时由当前数组重建
+        state = dict(self.__dict__)
+        state['_stores'] = {}
+        return state
+
+    def set_join_keys(self, alarm_index):
+        """按alarm_id排序，预先生成运行对比时关联用的键（重复的alarm_id只取第一次出现的行）"""
+        # 跟踪模式下alarm_index由前后多个快照共用，只取本快照范围内的行
+        count = len(self)
+        items = [(alarm_id, position) for alarm_id, position in list(alarm_index.items()) if position < count]
+        ids = np.array([str(alarm_id) for alarm_id, _ in items], dtype=str)
+        positions = np.array([position for _, position in items], dtype=np.int64)
+        order = np.argsort(ids, kind='stable')
+        self.join_ids = ids[order]
+        self.join_positions = positions[order]
+        return self
+
+    def join_keys(self, alarm_index):
+        """返回 (join_ids, join_positions)；跟踪模式的快照不预先生成，首次对比时生成"""
+        if self.join_ids is None:
+            self.set_join_keys(alarm_index)
+        return self.join_ids, self.join_positions
+
+    def nbytes(self):
+        """列式数据占用的内存（字节）"""
+        arrays = (self.category_codes, self.scenario_codes, self.predicted_codes, self.reference_codes,
+                  self.correct, self.incorrect, self.parse_failed, self.join_ids, self.join_positions)
+        return sum(a.nbytes for a in arrays if a is not None)
+
+    def scenario_of(self, position):
+        """返回某一行的scenario_id（无需解码整条记录）"""
+        return self.scenarios[self.scenario_codes[position]]
+
+    def __len__(self):
+        return len(self.category_codes)
+
+    def correctness_mask(self, correctness):
+        return {
+            'correct': self.correct,
+            'incorrect': self.incorrect,
+            'parse_failed': self.parse_failed
+        }.get(correctness)
+
+    def mask(self, category='', correctness=''):
+        """返回分类和预测结果筛选的布尔掩码，无筛选条件时返回None"""
+        mask = None
+        if category:
+            code = self._category_codes_map.get(category)
+            if code is None:
+                return np.zeros(len(self), dtype=bool)
+            mask = self.category_codes == code
+        correctness_mask = self.correctness_mask(correctness)
+        if correctness_mask is not None:
+            mask = correctness_mask if mask is None else mask & correctness_mask
+        return mask
+
+    def counts(self):
+        """整体的预测结果计数（finalize时已统计，与记录数无关）"""
+        return dict(self.status_counts, total=len(self))
+
+
+def _safe_ratio(numerator, denominator):
+    return float(numerator) / float(denominator) if denominator else 0.0
+
+
+def _f1(precision, recall):
+    return 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+
+
+def _grow_matrix(matrix, shape):
+    """把计数矩阵扩展到新的形状（新增的分类/标签计数为0）"""
+    if matrix.shape == shape:
+        return matrix
+    grown = np.zeros(shape, dtype=np.int64)
+    grown[tuple(slice(0, n) for n in matrix.shape)] = matrix
+    return grown
+
+
+class MetricsEngine:
+    """基于混淆矩阵的指标计算
+
+    加载时用向量化的 bincount 统计 参考标签 x 预测标签 的混淆计数（整体、按分类、按场景），
+    数据追加时只统计新增行并累加。查询指标只与标签数有关，与记录数无关。
+    混淆矩阵最后一列表示解析失败（没有预测标签）。
+    """
+
+    def __init__(self):
+        self.labels = []
+        self.categories = []
+        self.scenarios = []
+        self.confusion = np.zeros((0, 1), dtype=np.int64)  # 参考标签 x (预测标签 + 解析失败)
+        self.by_category = np.zeros((0, 0, 1), dtype=np.int64)
+        self.by_scenario = np.zeros((0, 0, 1), dtype=np.int64)
+
+    @classmethod
+    def from_columns(cls, columns):
+        engine = cls()
+        engine.add_rows(columns, 0, len(columns))
+        return engine
+
+    def add_rows(self, columns, start, stop):
+        """累加列式数据中 [start, stop) 行的混淆计数"""
+        self.labels = list(columns.labels)
+        self.categories = list(columns.categories)
+        self.scenarios = list(columns.scenarios)
+        n_labels = len(self.labels)
+        width = n_labels + 1
+        cells = n_labels * width
+
+        reference = columns.reference_codes[start:stop]
+        known = reference >= 0
+        predicted = columns.predicted_codes[start:stop][known]
+        flat = reference[known].astype(np.int64) * width + np.where(predicted < 0, n_labels, predicted)
+        category = columns.category_codes[start:stop][known].astype(np.int64)
+        scenario = columns.scenario_codes[start:stop][known].astype(np.int64)
+
+        n_categories = len(self.categories)
+        n_scenarios = len(self.scenarios)
+        self.confusion = _grow_matrix(self.confusion, (n_labels, width))
+        self.confusion += np.bincount(flat, minlength=cells).reshape(n_labels, width)
+        self.by_category = _grow_matrix(self.by_category, (n_categories, n_labels, width))
+        self.by_category += np.bincount(category * cells + flat, minlength=n_categories * cells).reshape(
+            n_categories, n_labels, width)
+        self.by_scenario = _grow_matrix(self.by_scenario, (n_scenarios, n_labels, width))
+        self.by_scenario += np.bincount(scenario * cells + flat, minlength=n_scenarios * cells).reshape(
+            n_scenarios, n_labels, width)
+        return self
+
+    def summarize(self, confusion, per_label=False):
+        """由混淆矩阵计算准确率以及micro/macro的精确率、召回率和F1"""
+        n_labels = len(self.labels)
+        true_positive = np.diag(confusion[:, :n_labels]) if n_labels else np.zeros(0, dtype=np.int64)
+        support = confusion.sum(axis=1)
+        predicted = confusion[:, :n_labels].sum(axis=0)
+        total = int(support.sum())
+
+        label_metrics = {}
+        label_scores = []  # 未取整的 (精确率, 召回率, F1)，用于宏平均
+        for i, label in enumerate(self.labels):
+            if not support[i] and not predicted[i]:
+                continue
+            precision = _safe_ratio(true_positive[i], predicted[i])
+            recall = _safe_ratio(true_positive[i], support[i])
+            label_scores.append((precision, recall, _f1(precision, recall)))
+            label_metrics[str(label)] = {
+                'precision': round(precision, 3),
+                'recall': round(recall, 3),
+                'f1_score': round(_f1(precision, recall), 3),
+                'support': int(support[i]),
+                'predicted': int(predicted[i])
+            }
+
+        micro_precision = _safe_ratio(true_positive.sum(), predicted.sum())
+        micro_recall = _safe_ratio(true_positive.sum(), total)
+        macro_precision, macro_recall, macro_f1 = (
+            np.mean(label_scores, axis=0) if label_scores else (0.0, 0.0, 0.0))
+
+        summary = {
+            'total': total,
+            'parse_failures': int(confusion[:, n_labels].sum()) if confusion.size else 0,
+            'accuracy': round(_safe_ratio(true_positive.sum(), total), 3),
+            'micro': {
+                'precision': round(micro_precision, 3),
+                'recall': round(micro_recall, 3),
+                'f1_score': round(_f1(micro_precision, micro_recall), 3)
+            },
+            'macro': {
+                'precision': round(float(macro_precision), 3),
+                'recall': round(float(macro_recall), 3),
+                'f1_score': round(float(macro_f1), 3)
+            }
+        }
+        if per_label:
+            summary['per_label'] = label_metrics
+        return summary
+
+    def overall(self):
+        return self.summarize(self.confusion, per_label=True)
+
+    def confusion_matrix(self):
+        return {
+            'reference_labels': [str(label) for label in self.labels],
+            'predicted_labels': [str(label) for label in self.labels] + ['parse_failed'],
+            'matrix': self.confusion.tolist()
+        }
+
+    def breakdown(self, by):
+        """按分类或场景分组的指标"""
+        names, matrices = (self.categories, self.by_category) if by == 'category' else (self.scenarios, self.by_scenario)
+        return {
+            str(name if name is not None else ''): self.summarize(matrices[i])
+            for i, name in enumerate(names) if matrices[i].any()
+        }
+
+
+class FilterCache:
+    """筛选结果的LRU缓存，缓存内容为结果位置列表，列表页分页和导航共用"""
+
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            positions = self._entries.get(key)
+            if positions is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return positions
+
+    def put(self, key, positions):
+        with self._lock:
+            self._entries[key] = positions
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'max_entries': self.max_entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+filter_cache = FilterCache(int(os.environ.get('FILTER_CACHE_SIZE', 64)))
+
+# 后台加载任务
+MAX_LOAD_JOBS = 20
+load_jobs = OrderedDict()  # job_id -> LoadProgress
+load_jobs_lock = threading.Lock()
+
+
+def _compute_filter_positions(ds, search_lower, category, correctness):
+    """执行筛选，返回升序的结果位置数组"""
+    mask = ds.columns.mask(category, correctness)
+
+    if not search_lower:
+        return np.flatnonzero(mask)
+
+    rows = len(ds.columns)
+    found = ds.search_index.candidates(search_lower, rows) if ds.search_index is not None else None
+    if found is None:
+        positions = np.arange(rows)
+    else:
+        # 已建索引的行取索引候选，其余的行（索引仍在后台构建）逐条扫描
+        candidates, indexed = found
+        positions = np.concatenate([candidates, np.arange(indexed, rows)])
+    if mask is not None:
+        positions = positions[mask[positions]]
+
+    # 先用索引和列式掩码缩小范围，再按子串语义校验搜索词
+    positions = positions.tolist()
+    results = ds.results
+    records = results.records(positions) if isinstance(results, LazyResults) else (results[p] for p in positions)
+    return np.array([p for p, record in zip(positions, records) if _match_search(record, search_lower)],
+                    dtype=np.int64)
+
+
+def filter_positions(ds, search='', category='', correctness=''):
+    """在数据快照ds中按关键词、场景分类和预测结果筛选，返回升序的结果位置列表（列表页和导航共用）"""
+    if correctness not in CORRECTNESS_OPTIONS:
+        correctness = ''
+    key = (ds.version, search.lower(), category, correctness)
+    if not any(key[1:]) or ds.columns is None:
+        return range(len(ds.results))
+
+    positions = filter_cache.get(key)
+    if positions is None:
+        if key[1] and ds.search_index is not None:
+            ds.search_index.ensure_built(ds.results)
+        positions = _compute_filter_positions(ds, *key[1:])
+        filter_cache.put(key, positions)
+    return positions
+
+
+class SharedPrefix(Sequence):
+    """只增长的列表中前length个元素的只读视图
+
+    跟踪模式下各快照共用构建器中的列表，生成快照时不复制；保存快照时按普通列表序列化。
+    """
+
+    __slots__ = ('_items', '_length')
+
+    def __init__(self, items, length=None):
+        self._items = items
+        self._length = len(items) if length is None else length
+
+    def __len__(self):
+        return self._length
+
+    def __getitem__(self, position):
+        if isinstance(position, slice):
+            return self._items[slice(*position.indices(self._length))]
+        if position < 0:
+            position += self._length
+        if not 0 <= position < self._length:
+            raise IndexError('SharedPrefix index out of range')
+        return self._items[position]
+
+    def __iter__(self):
+        return itertools.islice(self._items, self._length)
+
+    def __reduce__(self):
+        return list, (list(self),)
+
+
+class AppendOnlyArray:
+    """只追加的NumPy数组，容量不足时按倍数扩容
+
+    view() 返回已有元素的视图。追加只写在已有元素之后，扩容时换用新数组，已返回的视图不会再被修改，
+    可以由多个快照共用。逐个 append 的值先暂存在列表中，view() 时批量写入。
+    """
+
+    def __init__(self, dtype):
+        self.dtype = np.dtype(dtype)
+        self._data = np.zeros(0, dtype=self.dtype)
+        self._size = 0
+        self._pending = []
+
+    def __len__(self):
+        return self._size + len(self._pending)
+
+    def append(self, value):
+        self._pending.append(value)
+
+    def extend(self, values):
+        self._flush()
+        self._write(np.asarray(values, dtype=self.dtype))
+
+    def view(self, trim=False):
+        """trim为True时释放预留的容量（之后不再追加时使用）"""
+        self._flush()
+        if trim and len(self._data) > self._size:
+            self._data = self._data[:self._size].copy()
+        return self._data[:self._size]
+
+    def _flush(self):
+        if self._pending:
+            self._write(np.array(self._pending, dtype=self.dtype))
+            self._pending = []
+
+    def _write(self, values):
+        end = self._size + len(values)
+        if end > len(self._data):
+            if self._size == 0:
+                # 首次写入直接使用传入的数组（容量等于长度，之后的追加都会先扩容）
+                self._data = values
+                self._size = end
+                return
+            grown = np.empty(max(end, 2 * len(self._data)), dtype=self.dtype)
+            grown[:self._size] = self._data[:self._size]
+            self._data = grown
+        self._data[self._size:end] = values
+        self._size = end
+
+
+# 校验结果文件是否被改写时比对的首尾字节数
+LAZY_RESULTS_FINGERPRINT_BYTES = 4096
+# 批量解码时每隔多少行校验一次结果文件
+LAZY_RESULTS_CHECK_ROWS = 1024
+
+
+class LazyResults:
+    """按需解码的评测结果序列
+
+    内存中只保留每行的字节偏移和alarm_id，访问某一行时才从结果文件读取并解析对应的JSON。
+    筛选所需的字段由 ResultColumns 提供。
+
+    加载后结果文件可能被重新运行的评测任务截断或改写：读取前检查文件大小和已加载范围的首尾字节，
+    不一致时抛出错误，不会读到无关的内容（也不使用内存映射，截断后访问映射会导致进程被SIGBUS终止）。
+    """
+
+    def __init__(self, file_path, offsets, ends, alarm_ids, generated_ids):
+        self.file_path = file_path
+        self._offsets = np.asarray(offsets, dtype=np.int64)
+        self._ends = np.asarray(ends, dtype=np.int64)
+        self._alarm_ids = alarm_ids
+        self._generated_ids = np.asarray(generated_ids, dtype=bool)  # alarm_id是否为加载时生成
+        self._size = int(self._ends[-1]) if len(self._ends) else 0  # 已加载的字节范围
+        self._open_file()
+        self._fingerprint = self._read_fingerprint()
+
+    def _open_file(self):
+        self._file = open(self.file_path, 'rb')
+        self._lock = threading.Lock()
+        self._checked_stamp = None  # 最近一次校验通过时的 (文件大小, 修改时间)
+
+    def _read(self, start, end):
+        if hasattr(os, 'pread'):
+            return os.pread(self._file.fileno(), end - start, start)
+        # 没有pread的平台（Windows）共用文件位置，需要加锁
+        with self._lock:
+            self._file.seek(start)
+            return self._file.read(end - start)
+
+    def _read_fingerprint(self):
+        n = LAZY_RESULTS_FINGERPRINT_BYTES
+        return self._read(0, min(n, self._size)) + self._read(max(self._size - n, 0), self._size)
+
+    def _check_file(self):
+        """文件变化（追加除外）后拒绝读取；文件未再变化时不重复校验"""
+        stat = os.fstat(self._file.fileno())
+        stamp = (stat.st_size, stat.st_mtime_ns)
+        if stamp == self._checked_stamp:
             return
+        if stat.st_size < self._size or self._read_fingerprint() != self._fingerprint:
+            raise RuntimeError(f"结果文件已被截断或改写，请重新加载: {self.file_path}")
+        self._checked_stamp = stamp
 
-        with open(file_path, 'r', encoding='utf-8') as f:
-            for line_num, line in enumerate(f, 1):
-                line = line.strip()
-                if not line:
-                    continue
+    def __getstate__(self):
+        # 保存快照时只保存偏移和alarm_id，文件在恢复时重新打开
+        state = dict(self.__dict__)
+        for name in ('_file', '_lock', '_checked_stamp'):
+            del state[name]
+        return state
 
-                try:
-                    result = json_lib.loads(line)
-                    # 为每个结果生成唯一的 alarm_id（如果不存在）
-                    if 'alarm_id' not in result:
-                        # 使用内容的哈希值生成唯一ID
-                        content_str = json_lib.dumps(result, sort_keys=True)
-                        result['alarm_id'] = hashlib.md5(content_str.encode()).hexdigest()[:16]
-                    results.append(result)
-
-                    # 收集筛选选项
-                    if 'meta' in result:
-                        categories.add(result['meta'].get('category', ''))
-                        scenarios.add(result['meta'].get('scenario_id', ''))
-
-                except json_lib.JSONDecodeError as e:
-                    logger.warning(f"解析第{line_num}行失败: {e}")
-                    continue
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._open_file()
 
-        evaluation_results[:] = results
-        filter_options['categories'] = sorted(list(categories))
-        filter_options['scenarios'] = sorted(list(scenarios))
+    def __del__(self):
+        file = getattr(self, '_file', None)
+        if file is not None:
+            file.close()
 
-        logger.info(f"成功加载 {len(results)} 条评测结果")
+    def __len__(self):
+        return len(self._offsets)
 
-    except Exception as e:
-        logger.error(f"加载评测结果失败: {e}")
+    def __getitem__(self, position):
+        self._check_file()
+        return self._decode(position)
 
+    def _decode(self, position):
+        result = _json_loads(self._read(int(self._offsets[position]), int(self._ends[position])))
+        if self._generated_ids[position]:
+            result['alarm_id'] = self._alarm_ids[position]
+        return result
 
-def scan_excel_files(directory):
-    """扫描Excel文件"""
-    excel_files = []
-    try:
-        if Path(directory).exists():
-            excel_files = list(Path(directory).glob("**/*.xlsx")) + list(Path(directory).glob("**/*.xls"))
-    except Exception as e:
-        logger.warning(f"扫描Excel文件失败: {e}")
+    def records(self, positions):
+        """依次解码多行（筛选扫描用），每 LAZY_RESULTS_CHECK_ROWS 行校验一次文件"""
+        for i, position in enumerate(positions):
+            if i % LAZY_RESULTS_CHECK_ROWS == 0:
+                self._check_file()
+            yield self._decode(position)
 
-    return excel_files
+    def __iter__(self):
+        for position in range(len(self)):
+            yield self[position]
 
+    def alarm_id(self, position):
+        return self._alarm_ids[position]
 
-@app.route('/')
-def index():
-    """主页"""
-    try:
-        # 直接返回HTML文件内容
-        html_path = Path('frontend/dist/index.html')
-        if html_path.exists():
-            with open(html_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        else:
-            # 返回一个简单的HTML页面
-            return '''
-<!DOCTYPE html>
-<html>
-<head>
-    <title>评测结果展示系统</title>
-    <style>
-        body { font-family: Arial, sans-serif; margin: 40px; }
-        .container { max-width: 800px; margin: 0 auto; }
-        .alert { padding: 15px; border-radius: 4px; margin: 15px 0; }
-        .info { background: #e6f7ff; border: 1px solid #91d5ff; color: #1890ff; }
-        .error { background: #fff2f0; border: 1px solid #ffccc7; color: #ff4d4f; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>🔍 评测结果展示系统</h1>
-        <div class="alert error">
-            <strong>错误：</strong>前端文件未找到，请先构建前端应用。
-            <br><br>
-            运行命令：<code>cd frontend && npm run build</code>
-        </div>
-        <div class="alert info">
-            <strong>后端状态：</strong>Flask服务运行正常，可以通过API访问数据。
-        </div>
-    </div>
-</body>
-</html>
-'''
-    except Exception as e:
-        return f'<h1>错误</h1><p>{str(e)}</p>'
+    def nbytes(self):
+        """常驻内存的部分（偏移数组和alarm_id），不含映射的文件内容"""
+        # alarm_id按前 ALARM_ID_SAMPLE 个的平均长度估算，跟踪模式每次发布快照时不必遍历全部
+        sample = [len(str(alarm_id)) for alarm_id in itertools.islice(self._alarm_ids, ALARM_ID_SAMPLE)]
+        average = sum(sample) / len(sample) if sample else 0
+        return (self._offsets.nbytes + self._ends.nbytes + self._generated_ids.nbytes +
+                int(len(self._alarm_ids) * (average + ALARM_ID_OVERHEAD_BYTES)))
 
 
-@app.route('/test')
-def test_page():
-    """API测试页面"""
-    try:
-        test_html_path = Path('test_api.html')
-        if test_html_path.exists():
-            with open(test_html_path, 'r', encoding='utf-8') as f:
-                return f.read()
-        else:
-            return "Test page not found", 404
-    except Exception as e:
-        return f"Error loading test page: {e}", 500
+class LoadProgress:
+    """结果文件加载进度（由解析线程更新，进度接口读取）"""
+
+    def __init__(self, file_path, mode=LOAD_MODE_MEMORY, workers=1, run_id=None, activate=True):
+        self.job_id = uuid.uuid4().hex[:12]
+        self.file_path = file_path
+        self.mode = mode
+        self.workers = workers
+        self.run_id = run_id or default_run_id(file_path)
+        self.activate = activate
+        self.status = 'pending'  # pending / running / done / failed
+        self.bytes_total = 0
+        self.bytes_read = 0
+        self.records = 0
+        self.parse_errors = 0
+        self.error = None
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        elapsed = None
+        eta = None
+        if self.started_at is not None:
+            elapsed = (self.finished_at or time.time()) - self.started_at
+            if self.status == 'running' and self.bytes_read > 0:
+                eta = elapsed * (self.bytes_total - self.bytes_read) / self.bytes_read
+        return {
+            'job_id': self.job_id,
+            'file_path': self.file_path,
+            'mode': self.mode,
+            'workers': self.workers,
+            'run_id': self.run_id,
+            'status': self.status,
+            'bytes_total': self.bytes_total,
+            'bytes_read': self.bytes_read,
+            'percent': round(self.bytes_read * 100 / self.bytes_total, 1) if self.bytes_total else 0.0,
+            'records': self.records,
+            'parse_errors': self.parse_errors,
+            'elapsed_seconds': round(elapsed, 2) if elapsed is not None else None,
+            'eta_seconds': round(eta, 2) if eta is not None else None,
+            'error': self.error
+        }
+
+
+def _json_loads(data):
+    """解析JSON，安装了orjson时优先使用；orjson无法解析时回退到标准库，保证结果和报错一致"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json_lib.loads(data)
+
+
+def _json_dumps(data):
+    """序列化为UTF-8编码的JSON字节串，安装了orjson时优先使用"""
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(data)
+        except TypeError:
+            pass
+    return json_lib.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def _parse_line(raw_line):
+    """解析结果文件的一行，返回 (result, alarm_id是否为生成的)；空行返回 (None, False)"""
+    line = raw_line.decode('utf-8').strip()
+    if not line:
+        return None, False
+
+    result = _json_loads(line)
+    # 为每个结果生成唯一的 alarm_id（如果不存在）
+    generated = 'alarm_id' not in result
+    if generated:
+        # 使用内容的哈希值生成唯一ID
+        content_str = json_lib.dumps(result, sort_keys=True)
+        result['alarm_id'] = hashlib.md5(content_str.encode()).hexdigest()[:16]
+    return result, generated
+
+
+def _parse_chunk(file_path, start, end, lazy):
+    """解析文件 [start, end) 字节范围内的行并完成逐行的派生计算（在进程池中执行）
+
+    返回分块数据，由 _ResultsBuilder.add_chunk 按顺序合并；行号为块内行号（从1开始）。
+    alarm_id 的去重需要全局信息，留给合并时处理。
+    """
+    with open(file_path, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+
+    chunk = {
+        'line_count': 0,
+        'errors': [],  # (行号, 错误信息)
+        'line_nums': array('I'),
+        'alarm_ids': [],
+        'offsets': array('q'),
+        'ends': array('q'),
+        'generated_ids': array('B'),
+        'results': [],
+        'summaries': [],
+        'columns': ResultColumns(),
+        'categories': set(),
+        'scenarios': set()
+    }
+    offset = start
+    line_num = 0
+    for line_num, raw_line in enumerate(io.BytesIO(data), 1):
+        line_start = offset
+        offset += len(raw_line)
+        try:
+            result, generated = _parse_line(raw_line)
+        except json_lib.JSONDecodeError as e:
+            chunk['errors'].append((line_num, str(e)))
+            continue
+        if result is None:
+            continue
+        chunk['line_nums'].append(line_num)
+        chunk['alarm_ids'].append(result['alarm_id'])
+        chunk['columns'].add(result)
+        if lazy:
+            chunk['offsets'].append(line_start)
+            chunk['ends'].append(offset)
+            chunk['generated_ids'].append(generated)
+        else:
+            chunk['results'].append(result)
+            chunk['summaries'].append(result_summary(result))
+        if 'meta' in result:
+            chunk['categories'].add(result['meta'].get('category', ''))
+            chunk['scenarios'].add(result['meta'].get('scenario_id', ''))
+    chunk['line_count'] = line_num
+    return chunk
+
+
+def _split_file_ranges(file_path, parts):
+    """把文件切分为按换行符对齐的字节范围"""
+    size = os.path.getsize(file_path)
+    bounds = [0]
+    with open(file_path, 'rb') as f:
+        for i in range(1, parts):
+            f.seek(size * i // parts)
+            f.readline()
+            boundary = f.tell()
+            if bounds[-1] < boundary < size:
+                bounds.append(boundary)
+    bounds.append(size)
+    return list(zip(bounds[:-1], bounds[1:]))
+
+
+class _ResultsBuilder:
+    """按行号顺序接收解析结果，构建记录列表和各类索引"""
+
+    def __init__(self, file_path, lazy):
+        self.file_path = file_path
+        self.lazy = lazy
+        self.results = []
+        self.offsets = AppendOnlyArray(np.int64)
+        self.ends = AppendOnlyArray(np.int64)
+        self.alarm_ids = []
+        self.generated_ids = AppendOnlyArray(bool)
+        self.count = 0
+        self.index = {}
+        # mmap模式下不在内存中保存全文索引和预览，搜索时逐条解码记录校验，摘要在取页时生成
+        self.text_index = SearchIndex() if SEARCH_INDEX_MODE != 'off' and not lazy else None
+        self.columns = ResultColumns()
+        self.summaries = []
+        self.duplicates = []
+        self.categories = set()
+        self.scenarios = set()
+        self.parse_errors = 0
+
+    def add_error(self, line_num, error):
+        self.parse_errors += 1
+        logger.warning(f"解析第{line_num}行失败: {error}")
+
+    def _index_alarm_id(self, line_num, alarm_id, position):
+        # 建立alarm_id索引，重复的alarm_id保留第一次出现的位置
+        if alarm_id in self.index:
+            self.duplicates.append(alarm_id)
+            logger.warning(f"第{line_num}行的alarm_id重复: {alarm_id}")
+        else:
+            self.index[alarm_id] = position
+
+    def add(self, line_num, line_start, line_end, result, generated):
+        alarm_id = result['alarm_id']
+        self._index_alarm_id(line_num, alarm_id, self.count)
+        self.columns.add(result)
+        self.count += 1
+        if self.lazy:
+            self.offsets.append(line_start)
+            self.ends.append(line_end)
+            self.alarm_ids.append(alarm_id)
+            self.generated_ids.append(generated)
+        else:
+            self.results.append(result)
+            self.summaries.append(result_summary(result))
+
+        # 收集筛选选项
+        if 'meta' in result:
+            self.categories.add(result['meta'].get('category', ''))
+            self.scenarios.add(result['meta'].get('scenario_id', ''))
+
+    def add_chunk(self, line_base, chunk):
+        """合并 _parse_chunk 返回的分块，line_base 为该分块之前的行数"""
+        errors = chunk['errors']
+        error_pos = 0
+        for position, (line_num, alarm_id) in enumerate(zip(chunk['line_nums'], chunk['alarm_ids']), self.count):
+            # 解析错误和重复alarm_id的警告按行号顺序输出，与串行解析一致
+            while error_pos < len(errors) and errors[error_pos][0] < line_num:
+                self.add_error(line_base + errors[error_pos][0], errors[error_pos][1])
+                error_pos += 1
+            self._index_alarm_id(line_base + line_num, alarm_id, position)
+        for line_num, error in errors[error_pos:]:
+            self.add_error(line_base + line_num, error)
+
+        self.count += len(chunk['alarm_ids'])
+        self.columns.extend(chunk['columns'])
+        if self.lazy:
+            self.offsets.extend(np.frombuffer(chunk['offsets'], dtype=np.int64))
+            self.ends.extend(np.frombuffer(chunk['ends'], dtype=np.int64))
+            self.alarm_ids.extend(chunk['alarm_ids'])
+            self.generated_ids.extend(np.frombuffer(chunk['generated_ids'], dtype=np.uint8))
+        else:
+            self.results.extend(chunk['results'])
+            self.summaries.extend(chunk['summaries'])
+        self.categories |= chunk['categories']
+        self.scenarios |= chunk['scenarios']
+
+    def update_progress(self, progress, bytes_read):
+        if progress is not None:
+            progress.bytes_read = bytes_read
+            progress.records = self.count
+            progress.parse_errors = self.parse_errors
+
+    def build(self):
+        loaded = self.snapshot(final=True)
+        loaded['result_columns'].set_join_keys(self.index)
+        return loaded
+
+    def snapshot(self, metrics=None, start=0, final=False):
+        """返回目前已接收数据的快照，追加数据后可再次调用（跟踪模式）
+
+        快照不复制数据：记录列表等是构建器中列表的前缀视图（SharedPrefix），列式数组是只追加数组的视图，
+        alarm_id索引和搜索索引只追加，由各快照按自身的行数使用；之后追加的数据不影响已返回的快照。
+        final为True时不再追加，直接返回构建器中的列表。传入上一个快照的指标时只统计 start 之后新增的行。
+        """
+        def prefix(items):
+            return items if final else SharedPrefix(items)
+
+        results = prefix(self.results)
+        if self.lazy:
+            results = LazyResults(self.file_path, self.offsets.view(final), self.ends.view(final),
+                                  prefix(self.alarm_ids), self.generated_ids.view(final))
+        columns = copy.copy(self.columns.finalize())
+        if metrics is None:
+            metrics = MetricsEngine.from_columns(columns)
+        else:
+            metrics = copy.deepcopy(metrics).add_rows(columns, start, len(columns))
+        return {
+            'results': results,
+            'alarm_index': self.index,
+            'duplicate_alarm_ids': prefix(self.duplicates),
+            'search_index': self.text_index,
+            'result_columns': columns,
+            'metrics': metrics,
+            'summaries': prefix(self.summaries),
+            'categories': sorted(list(self.categories)),
+            'scenarios': sorted(list(self.scenarios))
+        }
+
+
+def parse_results_file(file_path, progress=None, mode=LOAD_MODE_MEMORY, workers=1):
+    """解析评测结果文件并构建索引，返回待切换的数据（不修改全局数据）
+
+    mode为mmap时不保留解析后的记录，只记录每行的字节范围，由 LazyResults 按需解码。
+    workers大于1且文件足够大时，按换行符对齐切块，在进程池中并行解析、计算alarm_id、列式编码和摘要，
+    主进程只按顺序合并分块并建立alarm_id索引；行号、记录顺序和alarm_id与串行解析完全一致。
+    """
+    builder = _ResultsBuilder(file_path, mode == LOAD_MODE_MMAP)
+    file_size = os.path.getsize(file_path)
+    if progress is not None:
+        progress.bytes_total = file_size
+
+    if workers > 1 and file_size >= PARALLEL_LOAD_MIN_BYTES:
+        ranges = _split_file_ranges(file_path, workers * PARALLEL_LOAD_CHUNKS_PER_WORKER)
+        logger.info(f"并行解析结果文件：{len(ranges)} 个分块，{workers} 个进程")
+        line_base = 0
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = executor.map(_parse_chunk, [file_path] * len(ranges), *zip(*ranges),
+                                  [builder.lazy] * len(ranges))
+            for (_, chunk_end), chunk in zip(ranges, chunks):
+                builder.add_chunk(line_base, chunk)
+                line_base += chunk['line_count']
+                builder.update_progress(progress, chunk_end)
+        return builder.build()
+
+    # 以二进制方式读取，便于统计已读取的字节数
+    bytes_read = 0
+    with open(file_path, 'rb') as f:
+        for line_num, raw_line in enumerate(f, 1):
+            line_start = bytes_read
+            bytes_read += len(raw_line)
+            if line_num % 1000 == 0:
+                builder.update_progress(progress, bytes_read)
+
+            try:
+                result, generated = _parse_line(raw_line)
+            except json_lib.JSONDecodeError as e:
+                builder.add_error(line_num, e)
+                continue
+            if result is not None:
+                builder.add(line_num, line_start, bytes_read, result, generated)
+
+    builder.update_progress(progress, bytes_read)
+    return builder.build()
+
+
+def results_fields(loaded, file_path, run_id):
+    """解析结果对应的快照字段"""
+    return {
+        'results': loaded['results'],
+        'alarm_index': loaded['alarm_index'],
+        'duplicate_alarm_ids': loaded['duplicate_alarm_ids'],
+        'search_index': loaded['search_index'],
+        'columns': loaded['result_columns'],
+        'metrics': loaded['metrics'],
+        'summaries': loaded['summaries'],
+        'categories': loaded['categories'],
+        'scenarios': loaded['scenarios'],
+        'results_file_path': file_path,
+        'run_id': run_id
+    }
+
+
+def install_results(fields):
+    """切换到新加载的数据（解析完成后一次性替换快照，解析期间旧数据继续提供服务），返回新快照"""
+    ds = update_dataset(**fields)
+    # 旧版本的筛选结果不会再命中，直接释放
+    filter_cache.clear()
+    return ds
+
+
+def default_run_id(file_path):
+    """未指定运行ID时使用结果文件名（不含扩展名）加完整路径的短哈希，不同目录下的同名文件不会互相覆盖"""
+    path = Path(file_path).resolve()
+    return f'{path.stem}-{hashlib.sha1(str(path).encode()).hexdigest()[:8]}'
+
+
+# 结果文件解析快照目录：加载成功后保存解析结果（记录、生成的alarm_id、各类索引），
+# 同一文件（路径、大小、修改时间不变）再次加载或重启恢复时直接读取，跳过JSON解析。设为空字符串时关闭
+RESULTS_SNAPSHOT_DIR = os.environ.get('RESULTS_SNAPSHOT_DIR', '.results_cache')
+RESULTS_SNAPSHOT_FORMAT = 4
+# 启动时是否恢复上次使用的Excel目录和结果文件
+RESTORE_SESSION = os.environ.get('RESTORE_SESSION', '1') != '0'
+
+
+def _results_key(file_path):
+    """结果文件快照键：路径 + 修改时间 + 文件大小"""
+    path = Path(file_path)
+    stat = path.stat()
+    return (str(path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+def _snapshot_path(results_key, mode):
+    name = hashlib.md5(f'{results_key[0]}|{mode}'.encode('utf-8')).hexdigest()[:16]
+    return Path(RESULTS_SNAPSHOT_DIR) / f'{name}.pkl'
+
+
+def _snapshot_header(results_key, mode):
+    return {'format': RESULTS_SNAPSHOT_FORMAT, 'key': list(results_key), 'mode': mode}
+
+
+def read_results_snapshot(results_key, mode):
+    """读取结果文件的解析快照，文件已变化或没有快照时返回None"""
+    if not RESULTS_SNAPSHOT_DIR:
+        return None
+    path = _snapshot_path(results_key, mode)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'rb') as f:
+            # 文件头单独序列化，校验不通过时无需读取整个快照
+            if pickle.load(f) != _snapshot_header(results_key, mode):
+                return None
+            return pickle.load(f)
+    except Exception as e:
+        logger.warning(f"读取结果快照失败 {path}: {e}")
+        return None
+
+
+def write_results_snapshot(results_key, mode, loaded):
+    """写入结果文件的解析快照（先写临时文件再替换）"""
+    path = _snapshot_path(results_key, mode)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f'{path.name}.tmp-{uuid.uuid4().hex[:8]}')
+    try:
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(_snapshot_header(results_key, mode), f, protocol=pickle.HIGHEST_PROTOCOL)
+            pickle.dump(loaded, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+    except Exception:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+def _save_results_snapshot(results_key, mode, loaded):
+    started = time.time()
+    try:
+        write_results_snapshot(results_key, mode, loaded)
+        logger.info(f"已保存结果快照 {results_key[0]}，耗时 {time.time() - started:.2f}s")
+    except Exception as e:
+        logger.warning(f"保存结果快照失败 {results_key[0]}: {e}")
+
+
+def session_fields(ds):
+    """需要在重启后恢复的会话信息"""
+    results = None
+    if ds.results_file_path and ds.run_id:
+        mode = LOAD_MODE_MMAP if isinstance(ds.results, LazyResults) else LOAD_MODE_MEMORY
+        results = {'path': ds.results_file_path, 'mode': mode, 'run_id': ds.run_id}
+    return {'excel_dir': ds.excel_dir_path, 'results': results}
+
+
+def _session_path():
+    return Path(RESULTS_SNAPSHOT_DIR) / 'session.json'
+
+
+def save_session(ds):
+    if not RESULTS_SNAPSHOT_DIR:
+        return
+    path = _session_path()
+    tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+    try:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json_lib.dump(session_fields(ds), f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+    except OSError as e:
+        logger.warning(f"保存会话失败: {e}")
+
+
+def read_session():
+    """读取上次的会话信息，没有时返回None"""
+    if not RESULTS_SNAPSHOT_DIR:
+        return None
+    try:
+        with open(_session_path(), 'r', encoding='utf-8') as f:
+            return json_lib.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def restore_session():
+    """启动时恢复上次使用的Excel目录和结果文件（结果文件未变化时从快照读取）"""
+    session = read_session()
+    if not session:
+        return
+    excel_dir = session.get('excel_dir')
+    if excel_dir and Path(excel_dir).exists():
+        ds = update_dataset(excel_dir_path=excel_dir, excel_files=excel_scanner.scan(excel_dir)[0])
+        logger.info(f"已恢复Excel目录 {excel_dir}：{len(ds.excel_files)} 个文件")
+    results = session.get('results')
+    if results and Path(results['path']).exists():
+        load_evaluation_results(results['path'], mode=results['mode'], run_id=results.get('run_id'))
+    rebuild_scenario_index(dataset)
+
+
+def load_evaluation_results(file_path, progress=None, mode=LOAD_MODE_MEMORY, workers=1, run_id=None, activate=True):
+    """加载评测结果并登记为一个运行，activate为True时同时切换为当前数据；成功返回True
+
+    文件未变化且有解析快照时直接读取快照，否则解析文件并保存快照（多进程模式下保存完成后才返回）。
+    """
+    try:
+        if not Path(file_path).exists():
+            logger.warning(f"文件不存在: {file_path}")
+            return False
+
+        run_id = run_id or default_run_id(file_path)
+        # 解析前取快照键，解析期间文件被修改时快照不会被误用
+        results_key = _results_key(file_path)
+        loaded = read_results_snapshot(results_key, mode)
+        if loaded is not None:
+            logger.info(f"结果文件未变化，从快照恢复: {file_path}")
+            if progress is not None:
+                progress.bytes_total = progress.bytes_read = results_key[2]
+                progress.records = len(loaded['results'])
+        else:
+            loaded = parse_results_file(file_path, progress, mode, workers)
+            if RESULTS_SNAPSHOT_DIR and shared_state.enabled:
+                # 多进程模式下写完快照再返回（之后才通知其他worker），其他worker直接读取快照，不必重新解析
+                _save_results_snapshot(results_key, mode, loaded)
+            elif RESULTS_SNAPSHOT_DIR:
+                threading.Thread(target=_save_results_snapshot, args=(results_key, mode, loaded),
+                                 name='results-snapshot', daemon=True).start()
+        fields = results_fields(loaded, file_path, run_id)
+        run_registry.put(run_id, Dataset(**fields), {'path': file_path, 'mode': mode})
+        if activate:
+            rebuild_scenario_index(install_results(fields))
+        if SEARCH_INDEX_MODE == 'eager' and fields['search_index'] is not None:
+            fields['search_index'].ensure_built(fields['results'])
+
+        logger.info(f"成功加载 {len(loaded['results'])} 条评测结果（{mode}模式，运行 {run_id}）")
+        if loaded['duplicate_alarm_ids']:
+            logger.warning(f"发现 {len(loaded['duplicate_alarm_ids'])} 个重复的alarm_id，详情/导航将使用第一次出现的记录")
+        return True
+
+    except Exception as e:
+        logger.error(f"加载评测结果失败: {e}")
+        if progress is not None:
+            progress.error = str(e)
+        return False
+
+
+def _run_load_job(progress):
+    """后台加载线程"""
+    progress.status = 'running'
+    progress.started_at = time.time()
+    if shared_state.enabled:
+        threading.Thread(target=_publish_job_progress, args=(progress,), daemon=True).start()
+    if load_evaluation_results(progress.file_path, progress, progress.mode, progress.workers,
+                               progress.run_id, progress.activate):
+        # 先通知其他worker再标记完成；其他worker在后台读取快照并切换，切换前的请求仍返回旧数据
+        publish_loaded_run(progress.run_id, progress.activate)
+        progress.finished_at = time.time()
+        progress.status = 'done'
+    else:
+        progress.error = progress.error or f'文件不存在: {progress.file_path}'
+        progress.finished_at = time.time()
+        progress.status = 'failed'
+
+
+def start_load_job(file_path, mode=LOAD_MODE_MEMORY, workers=1, run_id=None, activate=True):
+    """启动后台加载任务，已有任务在运行时返回None"""
+    with load_jobs_lock:
+        if any(job.status in ('pending', 'running') for job in load_jobs.values()):
+            return None
+        progress = LoadProgress(file_path, mode, workers, run_id, activate)
+        load_jobs[progress.job_id] = progress
+        # 只保留最近的任务记录
+        while len(load_jobs) > MAX_LOAD_JOBS:
+            load_jobs.popitem(last=False)
+
+    threading.Thread(target=_run_load_job, args=(progress,), name=f'load-{progress.job_id}', daemon=True).start()
+    return progress
+
+
+# ==================== 跟踪模式 ====================
+# 评测任务运行期间会持续向结果文件追加记录。跟踪模式记住已读取的字节偏移，定期只解析新增的完整行，
+# 增量更新记录、索引、筛选选项和指标后替换快照，并通过SSE通知前端刷新
+
+# 检查结果文件是否有新增内容的间隔（秒）
+FOLLOW_INTERVAL = float(os.environ.get('FOLLOW_INTERVAL', 1.0))
+# 每次读取新增内容的块大小（字节），一次追加大量数据时限制读取缓冲的内存
+FOLLOW_READ_BYTES = 8 * 1024 * 1024
+# SSE连接空闲时发送心跳的间隔（秒），避免被代理断开
+FOLLOW_HEARTBEAT_INTERVAL = 15.0
+# 浏览器断线后重连的等待时间（毫秒）
+FOLLOW_RETRY_MS = 3000
+
+
+class FollowEvents:
+    """跟踪模式的新数据通知：跟踪线程发布事件，SSE连接等待新事件"""
+
+    def __init__(self):
+        self.condition = threading.Condition()
+        self.sequence = 0
+        self.event = None
+
+    def notify(self, event):
+        with self.condition:
+            self.sequence += 1
+            self.event = event
+            self.condition.notify_all()
+
+    def wait(self, sequence, timeout):
+        """等待序号不同于sequence的事件，返回 (序号, 最新事件)；超时时序号不变"""
+        with self.condition:
+            self.condition.wait_for(lambda: self.sequence != sequence, timeout)
+            return self.sequence, self.event
+
+
+follow_events = FollowEvents()
+
+
+class ResultsFollower:
+    """跟踪一个仍在追加的结果文件，每次只解析上次读取之后新增的完整行"""
+
+    def __init__(self, file_path, mode=LOAD_MODE_MEMORY, run_id=None, interval=FOLLOW_INTERVAL):
+        self.file_path = file_path
+        self.mode = mode
+        self.run_id = run_id or default_run_id(file_path)
+        self.interval = interval
+        self.started_at = time.time()
+        self.updated_at = None
+        self.error = None
+        self.stop_event = threading.Event()
+        self._reset()
+
+    def _reset(self):
+        self.builder = _ResultsBuilder(self.file_path, self.mode == LOAD_MODE_MMAP)
+        self.file_id = None  # (st_dev, st_ino)，文件被替换时从头读取
+        self.offset = 0  # 已解析的字节数，总是位于换行符之后
+        self.line_num = 0
+        self.records = 0  # 已发布快照中的记录数
+        self.metrics = None  # 已发布快照的指标，追加时在此基础上累加
+
+    def poll(self):
+        """解析新增的完整行，有新记录（或首次读取）时发布新快照，返回新增的记录数"""
+        stat = os.stat(self.file_path)
+        file_id = (stat.st_dev, stat.st_ino)
+        if self.file_id is not None and (file_id != self.file_id or stat.st_size < self.offset):
+            logger.info(f"结果文件被替换或截断，重新读取: {self.file_path}")
+            self._reset()
+        self.file_id = file_id
+        first = self.metrics is None
+        if stat.st_size <= self.offset and not first:
+            return 0
+
+        # 按块读取新增内容；最后一行可能还没写完，只解析到最后一个换行符，剩余部分下次再读
+        with open(self.file_path, 'rb') as f:
+            f.seek(self.offset)
+            remaining = stat.st_size - self.offset
+            partial = []  # 跨块的未完成行
+            while remaining > 0:
+                block = f.read(min(FOLLOW_READ_BYTES, remaining))
+                if not block:
+                    break
+                remaining -= len(block)
+                for raw_line in io.BytesIO(block):
+                    if not raw_line.endswith(b'\n'):
+                        partial.append(raw_line)
+                        continue
+                    if partial:
+                        raw_line = b''.join(partial + [raw_line])
+                        partial = []
+                    self._add_line(raw_line)
+
+        appended = self.builder.count - self.records
+        if appended == 0 and not first:
+            return 0
+        loaded = self.builder.snapshot(self.metrics, self.records)
+        self.metrics = loaded['metrics']
+        self.records = self.builder.count
+        self._publish(loaded, appended, first)
+        return appended
+
+    def _add_line(self, raw_line):
+        self.line_num += 1
+        line_start = self.offset
+        self.offset += len(raw_line)
+        try:
+            result, generated = _parse_line(raw_line)
+        except json_lib.JSONDecodeError as e:
+            self.builder.add_error(self.line_num, e)
+        else:
+            if result is not None:
+                self.builder.add(self.line_num, line_start, self.offset, result, generated)
+
+    def _publish(self, loaded, appended, first):
+        if self.stop_event.is_set():
+            return
+        previous = dataset
+        fields = results_fields(loaded, self.file_path, self.run_id)
+        run_registry.put(self.run_id, Dataset(**fields), {'path': self.file_path, 'mode': self.mode})
+        # 开始跟踪时切换为当前数据；之后用户切换到其他运行时只更新登记的数据
+        if first or previous.run_id == self.run_id:
+            ds = install_results(fields)
+            if first or not reuse_scenario_index(previous, ds):
+                rebuild_scenario_index(ds)
+        self.updated_at = time.time()
+        if appended:
+            logger.info(f"跟踪模式：{self.file_path} 新增 {appended} 条记录，共 {self.records} 条")
+        follow_events.notify({
+            'run_id': self.run_id,
+            'appended': appended,
+            'total': self.records,
+            'version': dataset.version,
+            'categories': loaded['categories']
+        })
+
+    def run(self):
+        while not self.stop_event.is_set():
+            try:
+                self.poll()
+                self.error = None
+            except Exception as e:
+                if self.error != str(e):
+                    logger.warning(f"跟踪结果文件失败: {e}")
+                self.error = str(e)
+            self.stop_event.wait(self.interval)
+
+    def stop(self):
+        self.stop_event.set()
+
+    def to_dict(self):
+        return {
+            'status': 'stopped' if self.stop_event.is_set() else 'following',
+            'file_path': self.file_path,
+            'run_id': self.run_id,
+            'mode': self.mode,
+            'interval': self.interval,
+            'offset': self.offset,
+            'lines': self.line_num,
+            'records': self.records,
+            'parse_errors': self.builder.parse_errors,
+            'started_at': self.started_at,
+            'updated_at': self.updated_at,
+            'error': self.error
+        }
+
+
+# 当前的跟踪任务（同一时间只跟踪一个结果文件）
+follower = None
+follower_lock = threading.Lock()
+
+
+def start_follow(file_path, mode=LOAD_MODE_MEMORY, run_id=None, interval=FOLLOW_INTERVAL):
+    """开始跟踪结果文件，已有跟踪任务时先停止，返回新的跟踪任务"""
+    global follower
+
+    with follower_lock:
+        if follower is not None:
+            follower.stop()
+        follower = ResultsFollower(file_path, mode, run_id, interval)
+        threading.Thread(target=follower.run, name='results-follow', daemon=True).start()
+        return follower
+
+
+def stop_follow():
+    """停止跟踪，返回被停止的跟踪任务（没有时返回None）"""
+    global follower
+
+    with follower_lock:
+        stopped, follower = follower, None
+    if stopped is not None:
+        stopped.stop()
+    return stopped
+
+
+# 常驻内存的运行数据总预算（MB），超出时淘汰最久未使用的运行
+RUN_REGISTRY_MAX_MB = int(os.environ.get('RUN_REGISTRY_MAX_MB', 1024))
+# 估算内存占用用：memory模式下解析后的记录约为JSON文本大小的倍数；每个alarm_id/索引项的额外开销
+RESULTS_MEMORY_FACTOR = 4
+ALARM_ID_OVERHEAD_BYTES = 100
+ALARM_ID_SAMPLE = 1000
+
+
+def estimate_dataset_bytes(ds):
+    """估算一个运行常驻内存的大小（字节）"""
+    size = len(ds.alarm_index) * ALARM_ID_OVERHEAD_BYTES
+    size += len(ds.summaries) * (SUMMARY_PREVIEW_CHARS * len(SEARCH_FIELDS) + ALARM_ID_OVERHEAD_BYTES)
+    if ds.columns is not None:
+        size += ds.columns.nbytes()
+    if ds.search_index is not None:
+        size += ds.search_index.nbytes()
+    if isinstance(ds.results, LazyResults):
+        size += ds.results.nbytes()
+    elif ds.results_file_path:
+        try:
+            size += os.path.getsize(ds.results_file_path) * RESULTS_MEMORY_FACTOR
+        except OSError:
+            pass
+    return size
+
+
+class RunRegistry:
+    """常驻内存的多个运行（结果文件），按run_id索引
+
+    总大小超出预算时按LRU淘汰（当前正在使用的运行除外）。被淘汰的运行仍保留来源路径，
+    再次用到时重新加载。
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.runs = OrderedDict()  # run_id -> (Dataset, 估算字节数)，按最近使用排序
+        self.sources = {}  # run_id -> {'path': ..., 'mode': ...}
+        self.lock = threading.Lock()
+        self.evictions = 0
+        self.reloads = 0
+
+    def put(self, run_id, ds, source):
+        size = estimate_dataset_bytes(ds)
+        with self.lock:
+            self.runs[run_id] = (ds, size)
+            self.runs.move_to_end(run_id)
+            self.sources[run_id] = source
+            self._evict(keep=run_id)
+
+    def _evict(self, keep):
+        total = sum(size for _, size in self.runs.values())
+        for run_id in list(self.runs):
+            if total <= self.max_bytes:
+                break
+            # 当前数据对应的运行仍被引用，淘汰也不能释放内存
+            if run_id == keep or run_id == dataset.run_id:
+                continue
+            total -= self.runs.pop(run_id)[1]
+            self.evictions += 1
+            logger.info(f"运行 {run_id} 超出内存预算，已从内存中淘汰")
+
+    def get(self, run_id):
+        with self.lock:
+            entry = self.runs.get(run_id)
+            if entry is None:
+                return None
+            self.runs.move_to_end(run_id)
+            return entry[0]
+
+    def add_sources(self, sources):
+        """登记其他进程加载的运行来源（不立即加载）"""
+        with self.lock:
+            self.sources.update(sources)
+
+    def remove(self, run_id):
+        """移除运行，运行不存在时返回False"""
+        with self.lock:
+            known = self.sources.pop(run_id, None) is not None
+            return self.runs.pop(run_id, None) is not None or known
+
+    def clear(self):
+        with self.lock:
+            self.runs.clear()
+            self.sources.clear()
+
+    def list_runs(self):
+        with self.lock:
+            runs = []
+            for run_id, source in self.sources.items():
+                entry = self.runs.get(run_id)
+                runs.append({
+                    'run_id': run_id,
+                    'file_path': source['path'],
+                    'mode': source['mode'],
+                    'resident': entry is not None,
+                    'records': len(entry[0].results) if entry else None,
+                    'estimated_bytes': entry[1] if entry else 0
+                })
+            return runs
+
+    def stats(self):
+        with self.lock:
+            return {
+                'runs': len(self.sources),
+                'resident': len(self.runs),
+                'bytes': sum(size for _, size in self.runs.values()),
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions,
+                'reloads': self.reloads
+            }
+
+
+run_registry = RunRegistry(RUN_REGISTRY_MAX_MB * 1024 * 1024)
+
+
+def get_run(run_id):
+    """返回运行的数据快照；已被淘汰时按来源重新加载，未知运行返回None"""
+    ds = run_registry.get(run_id)
+    if ds is not None:
+        return ds
+    if run_id == dataset.run_id:
+        return dataset
+    source = run_registry.sources.get(run_id)
+    if source is None:
+        return None
+    run_registry.reloads += 1
+    if not load_evaluation_results(source['path'], mode=source['mode'], run_id=run_id, activate=False):
+        return None
+    return run_registry.get(run_id)
+
+
+def activate_run(run_id):
+    """将已登记的运行切换为当前数据（常驻时无需重新解析），返回新快照，未知运行返回None"""
+    run = get_run(run_id)
+    if run is None:
+        return None
+    ds = install_results({field: getattr(run, field) for field in Dataset.RESULT_FIELDS})
+    rebuild_scenario_index(ds)
+    return ds
+
+
+def publish_loaded_run(run_id, activate=True):
+    """多进程模式下通知其他worker：登记新运行，需要时切换当前数据"""
+    changes = {'runs': dict(run_registry.sources)}
+    if activate:
+        changes['results'] = dict(run_registry.sources[run_id], run_id=run_id)
+    shared_state.publish(**changes)
+
+
+def _label_name(columns, code):
+    return columns.labels[code] if code >= 0 else None
+
+
+def compare_runs(base, target, limit=100):
+    """按alarm_id关联两个运行，返回回退（基准正确、目标错误）、修复（基准错误、目标正确）和按分类的变化
+
+    关联和比较都在预先生成的列式数据上做向量化计算，不解码记录。分类按基准运行计。
+    """
+    base_columns = base.columns
+    target_columns = target.columns
+    base_ids, base_join_positions = base_columns.join_keys(base.alarm_index)
+    target_ids, target_join_positions = target_columns.join_keys(target.alarm_index)
+    _, base_index, target_index = np.intersect1d(base_ids, target_ids, assume_unique=True, return_indices=True)
+    # 按基准运行中的顺序排列
+    order = np.argsort(base_join_positions[base_index], kind='stable')
+    base_positions = base_join_positions[base_index][order]
+    target_positions = target_join_positions[target_index][order]
+
+    base_correct = base_columns.correct[base_positions]
+    target_correct = target_columns.correct[target_positions]
+    regressions = base_correct & ~target_correct
+    fixes = ~base_correct & target_correct
+
+    # 两个运行的标签编码不同，先把目标运行的预测标签映射到基准运行的编码再比较
+    base_label_codes = {label: code for code, label in enumerate(base_columns.labels)}
+    label_map = np.array([base_label_codes.get(label, -2) for label in target_columns.labels] + [-1], dtype=np.int32)
+    base_predicted = base_columns.predicted_codes[base_positions]
+    target_predicted = label_map[target_columns.predicted_codes[target_positions]]
+    label_changes = int(np.count_nonzero(base_predicted != target_predicted))
+
+    # 按分类统计
+    category_codes = base_columns.category_codes[base_positions]
+    n = len(base_columns.categories)
+    matched_counts = np.bincount(category_codes, minlength=n)
+    base_correct_counts = np.bincount(category_codes, weights=base_correct, minlength=n)
+    target_correct_counts = np.bincount(category_codes, weights=target_correct, minlength=n)
+    regression_counts = np.bincount(category_codes, weights=regressions, minlength=n)
+    fix_counts = np.bincount(category_codes, weights=fixes, minlength=n)
+    by_category = []
+    for code in np.flatnonzero(matched_counts):
+        base_accuracy = _safe_ratio(base_correct_counts[code], matched_counts[code])
+        target_accuracy = _safe_ratio(target_correct_counts[code], matched_counts[code])
+        by_category.append({
+            'category': base_columns.categories[code],
+            'matched': int(matched_counts[code]),
+            'base_accuracy': round(base_accuracy, 4),
+            'target_accuracy': round(target_accuracy, 4),
+            'accuracy_delta': round(target_accuracy - base_accuracy, 4),
+            'regressions': int(regression_counts[code]),
+            'fixes': int(fix_counts[code])
+        })
+    by_category.sort(key=lambda item: item['accuracy_delta'])
+
+    def changed_rows(mask):
+        rows = []
+        for base_position, target_position in zip(base_positions[mask][:limit].tolist(),
+                                                  target_positions[mask][:limit].tolist()):
+            rows.append({
+                'alarm_id': base.alarm_id_at(base_position),
+                'category': base_columns.categories[base_columns.category_codes[base_position]],
+                'scenario_id': base_columns.scenario_of(base_position),
+                'reference_label': _label_name(base_columns, base_columns.reference_codes[base_position]),
+                'base_predicted_label': _label_name(base_columns, base_columns.predicted_codes[base_position]),
+                'target_predicted_label': _label_name(target_columns, target_columns.predicted_codes[target_position])
+            })
+        return rows
+
+    matched = len(base_positions)
+    base_accuracy = _safe_ratio(np.count_nonzero(base_correct), matched)
+    target_accuracy = _safe_ratio(np.count_nonzero(target_correct), matched)
+    return {
+        'base_run_id': base.run_id,
+        'target_run_id': target.run_id,
+        'summary': {
+            'matched': matched,
+            'only_in_base': len(base_ids) - matched,
+            'only_in_target': len(target_ids) - matched,
+            'base_accuracy': round(base_accuracy, 4),
+            'target_accuracy': round(target_accuracy, 4),
+            'accuracy_delta': round(target_accuracy - base_accuracy, 4),
+            'regressions': int(np.count_nonzero(regressions)),
+            'fixes': int(np.count_nonzero(fixes)),
+            'label_changes': label_changes
+        },
+        'by_category': by_category,
+        'regressions': changed_rows(regressions),
+        'fixes': changed_rows(fixes)
+    }
+
+
+# Excel文件扩展名（与原先的 glob("**/*.xlsx") / glob("**/*.xls") 一致）
+EXCEL_SUFFIXES = ('.xlsx', '.xls')
+
+
+class ExcelDirectoryScanner:
+    """Excel目录扫描器
+
+    使用 os.scandir 单次遍历目录树，子目录由线程池并行扫描；每个目录保留一份清单
+    （目录修改时间、子目录、Excel文件的大小和修改时间）。再次扫描同一目录时，
+    修改时间未变的目录不再列目录，只检查已知文件，并报告新增、删除和变化的工作簿。
+    """
+
+    def __init__(self, workers):
+        self.workers = max(workers, 1)
+        self._manifests = {}  # 根目录 -> {'dirs': {...}, 'files': {...}, 'scanned_at': ...}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _scan_directory(dir_path, previous_dirs):
+        """扫描单个目录，返回 (目录, 目录标识, 目录清单, {文件: (大小, 修改时间)})"""
+        dir_stat = os.stat(dir_path)
+        previous = previous_dirs.get(dir_path)
+        files = {}
+        if previous is not None and previous[0] == dir_stat.st_mtime_ns:
+            # 目录内容未增删，只需检查已知文件是否被修改
+            _, subdirs, names = previous
+            for name in names:
+                path = os.path.join(dir_path, name)
+                try:
+                    file_stat = os.stat(path)
+                except OSError:
+                    continue
+                files[path] = (file_stat.st_size, file_stat.st_mtime_ns)
+        else:
+            subdirs = []
+            names = []
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            subdirs.append(entry.path)
+                        elif entry.is_file() and os.path.normcase(entry.name).endswith(EXCEL_SUFFIXES):
+                            file_stat = entry.stat()
+                            names.append(entry.name)
+                            files[entry.path] = (file_stat.st_size, file_stat.st_mtime_ns)
+                    except OSError:
+                        continue
+        dir_key = (dir_stat.st_dev, dir_stat.st_ino)
+        return dir_path, dir_key, (dir_stat.st_mtime_ns, tuple(subdirs), tuple(names)), files
+
+    def _walk(self, root, previous_dirs):
+        dirs = {}
+        files = {}
+        visited = set()  # 防止符号链接造成重复或循环
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            pending = {executor.submit(self._scan_directory, root, previous_dirs)}
+            while pending:
+                done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    try:
+                        dir_path, dir_key, dir_entry, dir_files = future.result()
+                    except OSError as e:
+                        logger.warning(f"扫描目录失败: {e}")
+                        continue
+                    if dir_key in visited:
+                        continue
+                    visited.add(dir_key)
+                    dirs[dir_path] = dir_entry
+                    files.update(dir_files)
+                    for subdir in dir_entry[1]:
+                        pending.add(executor.submit(self._scan_directory, subdir, previous_dirs))
+        return dirs, files
+
+    @staticmethod
+    def _sorted_files(files):
+        # xlsx在前、xls在后，各自按路径排序
+        return sorted(files, key=lambda path: (not os.path.normcase(path).endswith('.xlsx'), path))
+
+    def scan(self, directory):
+        """扫描目录，返回 (Excel文件列表, 变化情况)；首次扫描时变化情况为None"""
+        root = os.path.abspath(directory)
+        with self._lock:
+            previous = self._manifests.get(root)
+
+        dirs, files = self._walk(root, previous['dirs'] if previous else {})
+        with self._lock:
+            self._manifests[root] = {'dirs': dirs, 'files': files, 'scanned_at': time.time()}
+
+        changes = None
+        if previous is not None:
+            old_files = previous['files']
+            changes = {
+                'added': self._sorted_files(files.keys() - old_files.keys()),
+                'removed': self._sorted_files(old_files.keys() - files.keys()),
+                'changed': self._sorted_files(p for p in files.keys() & old_files.keys() if files[p] != old_files[p])
+            }
+        return self._sorted_files(files), changes
+
+    def cached(self, directory):
+        """返回已缓存的扫描结果，未扫描过时返回None"""
+        with self._lock:
+            manifest = self._manifests.get(os.path.abspath(directory))
+        return self._sorted_files(manifest['files']) if manifest else None
+
+
+excel_scanner = ExcelDirectoryScanner(int(os.environ.get('EXCEL_SCAN_WORKERS', 8)))
+
+
+def scan_excel_files(directory, use_cache=False):
+    """扫描Excel文件，返回路径列表；use_cache为True时优先使用之前的扫描结果"""
+    excel_files = []
+    try:
+        if Path(directory).exists():
+            cached = excel_scanner.cached(directory) if use_cache else None
+            excel_files = cached if cached is not None else excel_scanner.scan(directory)[0]
+    except Exception as e:
+        logger.warning(f"扫描Excel文件失败: {e}")
+
+    return excel_files
+
+
+# 前端构建产物目录
+FRONTEND_DIST_DIR = Path('frontend/dist')
+# 文件名带内容哈希的构建产物（如 js/app.d6e81413.js），内容变化时文件名也会变化，可永久缓存
+HASHED_ASSET_PATTERN = re.compile(r'\.[0-9a-f]{8,}\.[A-Za-z0-9]+(\.map)?$')
+# 值得预压缩的静态文件类型
+COMPRESSIBLE_SUFFIXES = {'.html', '.js', '.css', '.map', '.json', '.svg', '.txt', '.ico'}
+
+
+class StaticAsset:
+    """内存中的静态文件，包含原始内容和预压缩的gzip/brotli版本"""
+
+    def __init__(self, rel_path, data):
+        self.rel_path = rel_path
+        self.data = data
+        self.mimetype = mimetypes.guess_type(rel_path)[0] or 'application/octet-stream'
+        self.immutable = bool(HASHED_ASSET_PATTERN.search(rel_path))
+        self.etag = hashlib.md5(data).hexdigest()[:20]
+        self.encodings = {}
+        if Path(rel_path).suffix.lower() in COMPRESSIBLE_SUFFIXES and len(data) >= COMPRESS_MIN_BYTES:
+            # 只保留确实变小的压缩版本
+            gzipped = gzip.compress(data, compresslevel=9)
+            if len(gzipped) < len(data):
+                self.encodings['gzip'] = gzipped
+            if BROTLI_AVAILABLE:
+                compressed = brotli.compress(data, quality=11)
+                if len(compressed) < len(data):
+                    self.encodings['br'] = compressed
+
+    def select(self, accept_encodings):
+        """按客户端Accept-Encoding选择编码，返回 (编码名或None, 内容)"""
+        for encoding in ('br', 'gzip'):
+            if encoding in self.encodings and accept_encodings[encoding]:
+                return encoding, self.encodings[encoding]
+        return None, self.data
+
+    def response(self):
+        """构造响应：带哈希的文件长期缓存，其余文件（如index.html）每次通过ETag重新验证"""
+        encoding, body = self.select(request.accept_encodings)
+        # 不同编码的内容不同，ETag也需区分
+        etag = f'{self.etag}-{encoding}' if encoding else self.etag
+        if request.if_none_match.contains(etag):
+            response = app.response_class(status=304)
+        else:
+            response = app.response_class(body, mimetype=self.mimetype)
+            if encoding:
+                response.headers['Content-Encoding'] = encoding
+        response.set_etag(etag)
+        if self.encodings:
+            response.vary.add('Accept-Encoding')
+        if self.immutable:
+            response.headers['Cache-Control'] = 'public, max-age=31536000, immutable'
+        else:
+            response.headers['Cache-Control'] = 'no-cache'
+        return response
+
+
+class StaticAssetStore:
+    """启动时将前端dist目录一次性读入内存，之后的页面请求不再访问磁盘"""
+
+    def __init__(self, root):
+        self.root = Path(root)
+        self.assets = {}
+        self.total_bytes = 0
+
+    def load(self):
+        assets = {}
+        total_bytes = 0
+        if self.root.is_dir():
+            for file_path in self.root.rglob('*'):
+                if not file_path.is_file():
+                    continue
+                rel_path = file_path.relative_to(self.root).as_posix()
+                try:
+                    asset = StaticAsset(rel_path, file_path.read_bytes())
+                except OSError as e:
+                    logger.warning(f"读取静态文件失败 {file_path}: {e}")
+                    continue
+                assets[rel_path] = asset
+                total_bytes += len(asset.data)
+        self.assets = assets
+        self.total_bytes = total_bytes
+        if assets:
+            logger.info(f"已加载 {len(assets)} 个前端静态文件到内存，共 {total_bytes / 1024:.1f}KB")
+        return self
+
+    def get(self, rel_path):
+        return self.assets.get(rel_path)
+
+
+static_assets = StaticAssetStore(FRONTEND_DIST_DIR).load()
+
+
+@app.route('/')
+def index():
+    """主页"""
+    try:
+        # 直接返回内存中的index.html
+        asset = static_assets.get('index.html')
+        if asset is not None:
+            return asset.response()
+        else:
+            # 返回一个简单的HTML页面
+            return '''
+<!DOCTYPE html>
+<html>
+<head>
+    <title>评测结果展示系统</title>
+    <style>
+        body { font-family: Arial, sans-serif; margin: 40px; }
+        .container { max-width: 800px; margin: 0 auto; }
+        .alert { padding: 15px; border-radius: 4px; margin: 15px 0; }
+        .info { background: #e6f7ff; border: 1px solid #91d5ff; color: #1890ff; }
+        .error { background: #fff2f0; border: 1px solid #ffccc7; color: #ff4d4f; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>🔍 评测结果展示系统</h1>
+        <div class="alert error">
+            <strong>错误：</strong>前端文件未找到，请先构建前端应用。
+            <br><br>
+            运行命令：<code>cd frontend && npm run build</code>
+        </div>
+        <div class="alert info">
+            <strong>后端状态：</strong>Flask服务运行正常，可以通过API访问数据。
+        </div>
+    </div>
+</body>
+</html>
+'''
+    except Exception as e:
+        return f'<h1>错误</h1><p>{str(e)}</p>'
+
+
+@app.route('/test')
+def test_page():
+    """API测试页面"""
+    try:
+        test_html_path = Path('test_api.html')
+        if test_html_path.exists():
+            with open(test_html_path, 'r', encoding='utf-8') as f:
+                return f.read()
+        else:
+            return "Test page not found", 404
+    except Exception as e:
+        return f"Error loading test page: {e}", 500
+
+
+@app.route('/<path:filename>')
+def serve_static(filename):
+    """提供静态文件"""
+    try:
+        # 首先从内存中的前端构建产物提供
+        asset = static_assets.get(filename)
+        if asset is not None:
+            return asset.response()
+        # 启动后新增的文件，回退到从磁盘读取
+        frontend_path = FRONTEND_DIST_DIR / filename
+        if frontend_path.exists():
+            return send_from_directory(FRONTEND_DIST_DIR, filename)
+        # 然后尝试默认的静态文件夹
+        return send_from_directory(app.static_folder, filename)
+    except Exception as e:
+        logger.error(f"提供静态文件失败 {filename}: {e}")
+        return "File not found", 404
+
+
+# 文件上传功能已移除，改为路径扫描方式
+
+@app.route('/api/scan/excel', methods=['POST'])
+def scan_excel():
+    """扫描Excel文件（只返回文件名列表，不读取内容）"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': '无效的请求数据'}), 400
+
+        excel_dir = data.get('excel_dir', '').strip()
+        if not excel_dir:
+            return jsonify({'error': '必须提供Excel目录路径'}), 400
+
+        # 扫描Excel文件（同一目录再次扫描时为增量扫描）
+        if not Path(excel_dir).exists():
+            excel_file_paths, changes = [], None
+        else:
+            excel_file_paths, changes = excel_scanner.scan(excel_dir)
+        
+        # 保存Excel目录路径和文件列表，文件有变化时重建scenario索引
+        ds = dataset
+        files_changed = (excel_dir != ds.excel_dir_path or excel_file_paths != list(ds.excel_files) or
+                         changes is None or any(changes.values()))
+        if files_changed:
+            rebuild_scenario_index(update_dataset(excel_dir_path=excel_dir, excel_files=excel_file_paths))
+            shared_state.publish(excel={'dir': excel_dir})
+
+        response = {
+            'message': f'扫描完成，找到 {len(excel_file_paths)} 个Excel文件',
+            'excel_files': excel_file_paths,
+            'count': len(excel_file_paths),
+            'incremental': changes is not None,
+            'changes': changes
+        }
+
+        # 可选：后台将工作簿转换为二进制缓存，加快之后（包括重启后）的首次读取
+        if data.get('build_sidecars') and PANDAS_AVAILABLE and EXCEL_READER_BACKEND == EXCEL_READER_PANDAS:
+            # 已有转换任务在运行时返回该任务的进度
+            progress = start_sidecar_build(excel_file_paths) or sidecar_build
+            response['sidecar_build'] = progress.to_dict()
+
+        return jsonify(response)
+
+    except Exception as e:
+        logger.error(f"扫描Excel文件失败: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/scan/excel/sidecars')
+def get_sidecar_build():
+    """获取Excel转换缓存的构建进度"""
+    if sidecar_build is None:
+        return jsonify({'status': 'idle', 'cache_dir': str(Path(EXCEL_SIDECAR_DIR).resolve())})
+    return jsonify(sidecar_build.to_dict())
+
+
+@app.route('/api/scan/scenarios')
+def get_scenario_index():
+    """获取scenario_id到Excel工作簿的匹配情况（未匹配、多个候选、sheet不存在）"""
+    ds = dataset
+    index = ds.scenario_index
+    if index is None or index.version != ds.scenario_version:
+        return jsonify({'status': 'building' if ds.excel_files and ds.columns is not None else 'unavailable'})
+    return jsonify(dict(index.report(), status='ready'))
+
+
+@app.route('/api/load/results', methods=['POST'])
+def load_results():
+    """加载评测结果文件"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': '无效的请求数据'}), 400
+
+        results_path = data.get('results_path', '').strip()
+        if not results_path:
+            return jsonify({'error': '必须提供评测结果文件路径'}), 400
+
+        mode = data.get('mode') or DEFAULT_LOAD_MODE
+        if mode not in LOAD_MODES:
+            return jsonify({'error': f'不支持的加载模式: {mode}，可选: {", ".join(LOAD_MODES)}'}), 400
+        workers = int(data.get('workers') or DEFAULT_LOAD_WORKERS)
+        # 可同时加载多个运行：run_id默认为文件名，activate为False时只加载不切换当前数据
+        run_id = str(data.get('run_id') or '').strip() or default_run_id(results_path)
+        activate = bool(data.get('activate', True))
+
+        # 跟踪模式：文件仍在追加时持续读取新增的行，通过 /api/follow/events 通知新数据
+        if data.get('follow'):
+            if not Path(results_path).exists():
+                return jsonify({'error': f'文件不存在: {results_path}'}), 400
+            interval = float(data.get('interval') or FOLLOW_INTERVAL)
+            started = start_follow(results_path, mode, run_id, interval)
+            shared_state.publish(follow={'path': results_path, 'mode': mode, 'run_id': run_id, 'interval': interval})
+            return jsonify({
+                'message': '已开始跟踪结果文件',
+                'follow': started.to_dict()
+            }), 202
+
+        # 重新加载正在跟踪的运行时停止跟踪，避免跟踪线程覆盖新加载的数据
+        if follower is not None and follower.run_id == run_id:
+            stop_follow()
+            shared_state.publish(follow=None)
+
+        # 异步模式：立即返回任务ID，由后台线程解析文件
+        if data.get('async'):
+            if not Path(results_path).exists():
+                return jsonify({'error': f'文件不存在: {results_path}'}), 400
+            progress = start_load_job(results_path, mode, workers, run_id, activate)
+            if progress is None:
+                return jsonify({'error': '已有加载任务正在进行，请稍后再试'}), 409
+            return jsonify({
+                'message': '已开始后台加载',
+                'job_id': progress.job_id,
+                'progress': progress.to_dict()
+            }), 202
+
+        # 加载评测结果（成功时新快照中同时保存结果文件路径）
+        if load_evaluation_results(results_path, mode=mode, workers=workers, run_id=run_id, activate=activate):
+            publish_loaded_run(run_id, activate)
+        ds = dataset if activate else (run_registry.get(run_id) or Dataset())
+        results_count = len(ds.results)
+
+        # 收集分类信息（直接取列式数据中的分类，无需遍历记录）
+        categories = set()
+        if ds.columns is not None:
+            categories = {c for c in ds.columns.categories if c is not None}
+
+        return jsonify({
+            'message': f'文件加载成功，共 {results_count} 条记录',
+            'total_records': results_count,
+            'mode': mode,
+            'run_id': run_id,
+            'active': activate,
+            'duplicate_alarm_ids': len(ds.duplicate_alarm_ids),
+            'categories': sorted(list(categories))
+        })
+
+    except Exception as e:
+        logger.error(f"加载评测结果文件失败: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/load/jobs/<job_id>')
+def get_load_job(job_id):
+    """获取后台加载任务的进度"""
+    progress = load_jobs.get(job_id)
+    if progress is None:
+        # 多进程模式下任务可能由其他worker执行
+        job = shared_state.read_job(job_id)
+        if job is None:
+            return jsonify({'error': '加载任务不存在'}), 404
+        return jsonify(job)
+    return jsonify(progress.to_dict())
+
+
+@app.route('/api/follow')
+def get_follow_status():
+    """获取跟踪任务的状态"""
+    current = follower
+    if current is None:
+        return jsonify({'status': 'idle'})
+    return jsonify(current.to_dict())
+
+
+@app.route('/api/follow', methods=['DELETE'])
+def stop_follow_endpoint():
+    """停止跟踪（已加载的数据保留）"""
+    try:
+        stopped = stop_follow()
+        shared_state.publish(follow=None)
+        if stopped is None:
+            return jsonify({'message': '当前没有跟踪任务'})
+        return jsonify({'message': '已停止跟踪', 'follow': stopped.to_dict()})
+
+    except Exception as e:
+        logger.error(f"停止跟踪失败: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+def _follow_event_stream():
+    """SSE事件流：有新记录时发送 rows 事件，空闲时发送心跳注释"""
+    sequence = follow_events.sequence
+    yield f'retry: {FOLLOW_RETRY_MS}\n\n'
+    while True:
+        new_sequence, event = follow_events.wait(sequence, FOLLOW_HEARTBEAT_INTERVAL)
+        if new_sequence == sequence:
+            yield ': keep-alive\n\n'
+            continue
+        sequence = new_sequence
+        yield f"event: rows\ndata: {_json_dumps(event).decode('utf-8')}\n\n"
+
+
+@app.route('/api/follow/events')
+def follow_events_stream():
+    """跟踪模式的新数据通知（Server-Sent Events），前端收到后刷新，无需轮询"""
+    response = app.response_class(_follow_event_stream(), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # 关闭反向代理的缓冲，事件立即送达
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+
+@app.route('/api/analysis/start', methods=['POST'])
+def start_analysis():
+    """开始分析（Excel已扫描，结果已加载）"""
+    try:
+        data = request.get_json()
+        if not data:
+            return jsonify({'error': '无效的请求数据'}), 400
+
+        # 此时数据已经加载，只需要确认
+        ds = dataset
+        results_count = len(ds.results)
+        
+        # 获取Excel文件列表（如果之前扫描过，直接使用扫描结果）
+        excel_dir = data.get('excel_dir', '').strip()
+        excel_files = []
+        if excel_dir:
+            if excel_dir == ds.excel_dir_path:
+                excel_files = ds.excel_files
+            else:
+                excel_files = scan_excel_files(excel_dir, use_cache=True)
+
+        return jsonify({
+            'message': '分析完成',
+            'results_count': results_count,
+            'excel_files_count': len(excel_files)
+        })
+
+    except Exception as e:
+        logger.error(f"开始分析失败: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+# /api/scan/load API已废弃，改为分步骤的API：
+# 1. /api/scan/excel - 扫描Excel文件
+# 2. /api/load/results - 加载结果文件
+# 3. /api/analysis/start - 开始分析
+
+
+def page_records(ds, positions, view='full', fields=None):
+    """取出一页结果：摘要或完整记录，可按字段投影
+
+    只请求摘要中已有的字段时直接使用加载时生成的摘要；mmap模式下不保存摘要，由本页解码的记录生成。
+    """
+    use_summary = view == 'summary' or (fields is not None and SUMMARY_KEYS.issuperset(fields))
+    if use_summary and len(ds.summaries) == len(ds.results):
+        records = [ds.summaries[p] for p in positions]
+    elif use_summary:
+        records = [result_summary(ds.results[p]) for p in positions]
+    else:
+        records = [ds.results[p] for p in positions]
+    if fields is not None:
+        records = [project_fields(record, fields) for record in records]
+    return records
+
+
+# 列表接口可返回的分面统计，分类和场景最多返回的取值数（按数量从多到少）
+FACET_NAMES = ('category', 'scenario', 'correctness')
+FACET_MAX_VALUES = 200
+
+
+def parse_facets_param(args):
+    """解析facets参数：1/true/all 返回全部分面，也可逗号分隔指定（如 category,correctness）"""
+    value = args.get('facets', '').strip().lower()
+    if value in ('', '0', 'false'):
+        return ()
+    if value in ('1', 'true', 'all'):
+        return FACET_NAMES
+    requested = {name.strip() for name in value.split(',')}
+    return tuple(name for name in FACET_NAMES if name in requested)
+
+
+def _facet_values(codes, mask, values):
+    """按编码计数，返回数量最多的取值 [{'value': ..., 'count': ...}]"""
+    counts = np.bincount(codes if mask is None else codes[mask], minlength=len(values))
+    nonzero = np.flatnonzero(counts)
+    order = nonzero[np.argsort(-counts[nonzero], kind='stable')][:FACET_MAX_VALUES]
+    return [{'value': values[code], 'count': int(counts[code])} for code in order.tolist()]
+
+
+def compute_facets(ds, facets, search='', category='', correctness=''):
+    """统计当前筛选条件下各分类、场景和预测结果的数量，每个分面的计数不应用该分面自身的筛选条件
+
+    只按关键词筛选一次（有筛选缓存），之后在列式数据上叠加其他条件的掩码做 bincount，不访问记录。
+    """
+    columns = ds.columns
+    if columns is None:
+        return {name: ({option: 0 for option in CORRECTNESS_OPTIONS} if name == 'correctness' else [])
+                for name in facets}
+    if correctness not in CORRECTNESS_OPTIONS:
+        correctness = ''
+
+    rows = slice(None)
+    if search:
+        rows = np.asarray(filter_positions(ds, search), dtype=np.int64)
+    category_mask = columns.mask(category)[rows] if category else None
+    status_masks = {option: columns.correctness_mask(option)[rows] for option in CORRECTNESS_OPTIONS}
+    correctness_mask = status_masks.get(correctness)
+
+    def combine(*masks):
+        masks = [mask for mask in masks if mask is not None]
+        if not masks:
+            return None
+        return masks[0] if len(masks) == 1 else np.logical_and.reduce(masks)
+
+    result = {}
+    if 'category' in facets:
+        result['category'] = _facet_values(columns.category_codes[rows], correctness_mask, list(columns.categories))
+    if 'scenario' in facets:
+        result['scenario'] = _facet_values(columns.scenario_codes[rows], combine(category_mask, correctness_mask),
+                                           list(columns.scenarios))
+    if 'correctness' in facets:
+        result['correctness'] = {
+            option: int(np.count_nonzero(mask if category_mask is None else mask & category_mask))
+            for option, mask in status_masks.items()
+        }
+    return result
+
+
+def make_cursor(ds, position):
+    """游标分页的游标：数据版本 + 上一页最后一条结果的位置"""
+    return f'{ds.version}:{position}'
+
+
+def parse_cursor(value):
+    """解析游标，返回 (数据版本, 位置)；未传时返回None，第一页（空字符串）返回 (None, None)，格式错误时抛出ValueError"""
+    if value is None:
+        return None
+    if not value.strip():
+        return None, None
+    version, sep, position = value.strip().partition(':')
+    if not sep:
+        raise ValueError(value)
+    return int(version), int(position)
+
+
+@app.route('/api/results')
+def get_results():
+    """获取评测结果列表
+
+    支持两种分页方式：page/size 页码分页；cursor 游标分页（传入上一页返回的 next_cursor，
+    第一页传空字符串），游标分页直接二分定位起点，翻到很深的位置也不会变慢。游标包含数据版本，
+    数据重新加载或切换运行后旧游标失效（返回409）。
+    facets=1（或逗号分隔的 category,scenario,correctness）时同时返回各分面的计数。
+    """
+    try:
+        page = int(request.args.get('page', 1))
+        size = int(request.args.get('size', 20))
+        cursor = parse_cursor(request.args.get('cursor'))
+    except ValueError:
+        return jsonify({'error': 'page和size必须为整数，cursor必须为上一页返回的next_cursor'}), 400
+
+    try:
+        search = request.args.get('search', '').strip()
+        category = request.args.get('category', '').strip()
+        correctness = request.args.get('correctness', '').strip()
+        # view=summary 返回摘要（截断的文本预览），fields 指定返回的字段
+        view = request.args.get('view', 'full').strip()
+        fields = parse_fields_param(request.args)
+        facets = parse_facets_param(request.args)
+
+        ds = dataset
+        etag = make_etag(ds.version, sorted(request.args.items(multi=True)))
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
+        # 筛选数据
+        positions = filter_positions(ds, search, category, correctness)
+        extra = {}
+        if facets:
+            extra['facets'] = compute_facets(ds, facets, search, category, correctness)
+
+        if cursor is not None:
+            cursor_version, cursor_position = cursor
+            if cursor_version is not None and cursor_version != ds.version:
+                return jsonify({'error': '数据已更新，游标已失效，请从第一页重新获取'}), 409
+            # 从上一页最后一条结果之后开始取
+            start_idx = bisect_right(positions, cursor_position) if cursor_position is not None else 0
+            page_positions = positions[start_idx:start_idx + size]
+            has_more = start_idx + size < len(positions)
+            return with_etag(jsonify({
+                'results': page_records(ds, page_positions, view, fields),
+                'pagination': {
+                    'size': size,
+                    'total': len(positions),
+                    'cursor': request.args.get('cursor'),
+                    'next_cursor': make_cursor(ds, int(page_positions[-1])) if has_more else None
+                },
+                'filters': {
+                    'search': search,
+                    'category': category,
+                    'correctness': correctness
+                },
+                **extra
+            }), etag)
+
+        # 分页
+        start_idx = (page - 1) * size
+        end_idx = start_idx + size
+        paginated_results = page_records(ds, positions[start_idx:end_idx], view, fields)
+
+        return with_etag(jsonify({
+            'results': paginated_results,
+            'pagination': {
+                'page': page,
+                'size': size,
+                'total': len(positions),
+                'pages': (len(positions) + size - 1) // size
+            },
+            'filters': {
+                'search': search,
+                'category': category,
+                'correctness': correctness
+            },
+            **extra
+        }), etag)
+
+    except Exception as e:
+        logger.error(f"获取结果列表失败: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+class ExcelSheetCache:
+    """已解析Excel工作表的进程级LRU缓存
+
+    以 (文件路径, sheet名, 修改时间, 文件大小) 为键缓存清理后的DataFrame，
+    文件被修改后键随之变化，旧条目自然淘汰；总内存超过预算时按LRU淘汰。
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self._entries = OrderedDict()  # key -> (DataFrame, 估算字节数)
+        self._sheet_names = {}  # (路径, 修改时间, 文件大小) -> 工作表名列表
+        self._lock = threading.Lock()
+        self.current_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.sidecar_reads = 0  # 未命中内存缓存、从转换缓存读取的次数
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+
+    def put(self, key, df):
+        size = int(df.memory_usage(index=True, deep=True).sum())
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self.current_bytes -= old[1]
+            self._entries[key] = (df, size)
+            self.current_bytes += size
+            while self.current_bytes > self.max_bytes and self._entries:
+                _, (_, evicted_size) = self._entries.popitem(last=False)
+                self.current_bytes -= evicted_size
+                self.evictions += 1
+
+    def contains(self, key):
+        """是否已缓存（不计入命中统计，也不调整LRU顺序）"""
+        with self._lock:
+            return key in self._entries
+
+    def count_sidecar_read(self):
+        with self._lock:
+            self.sidecar_reads += 1
+
+    def get_sheet_names(self, workbook_key):
+        with self._lock:
+            return self._sheet_names.get(workbook_key)
+
+    def put_sheet_names(self, workbook_key, sheet_names):
+        with self._lock:
+            self._sheet_names[workbook_key] = list(sheet_names)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._sheet_names.clear()
+            self.current_bytes = 0
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'bytes': self.current_bytes,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'sidecar_reads': self.sidecar_reads,
+                'hit_rate': round(self.hits / lookups, 3) if lookups else 0.0
+            }
+
+
+excel_cache = ExcelSheetCache(int(float(os.environ.get('EXCEL_CACHE_MAX_MB', 256)) * 1024 * 1024))
+
+
+def _workbook_key(excel_path):
+    """工作簿缓存键：路径 + 修改时间 + 文件大小"""
+    stat = excel_path.stat()
+    return (str(excel_path.resolve()), stat.st_mtime_ns, stat.st_size)
+
+
+# Excel转换缓存目录：扫描时可将工作簿转换为二进制文件，重启后无需再解析xlsx/xls
+EXCEL_SIDECAR_DIR = os.environ.get('EXCEL_SIDECAR_DIR', '.excel_cache')
+
+
+def _sidecar_dir(workbook_key):
+    return Path(EXCEL_SIDECAR_DIR) / hashlib.md5(workbook_key[0].encode('utf-8')).hexdigest()[:16]
+
+
+def read_sidecar_manifest(workbook_key):
+    """读取工作簿的转换缓存清单，不存在或源文件已变化（大小/修改时间不一致）时返回None"""
+    try:
+        with open(_sidecar_dir(workbook_key) / 'manifest.json', 'r', encoding='utf-8') as f:
+            manifest = json_lib.load(f)
+    except (OSError, ValueError):
+        return None
+    if (manifest.get('source'), manifest.get('mtime_ns'), manifest.get('size')) != workbook_key:
+        return None
+    return manifest
+
+
+def read_sidecar_sheet(workbook_key, manifest, sheet_name):
+    """从转换缓存读取工作表"""
+    sheet = next(s for s in manifest['sheets'] if s['name'] == sheet_name)
+    return _pandas().read_pickle(_sidecar_dir(workbook_key) / sheet['file'])
+
+
+def write_sidecar(workbook_key, frames):
+    """写入工作簿的转换缓存（每个sheet一个文件，清单最后写入，整体替换旧缓存）
+
+    使用pandas pickle格式：按列存储的NumPy数据块，读回的DataFrame与解析结果完全一致。
+    """
+    target = _sidecar_dir(workbook_key)
+    staging = target.with_name(f'{target.name}.tmp-{uuid.uuid4().hex[:8]}')
+    staging.mkdir(parents=True)
+    try:
+        sheets = []
+        for i, (name, df) in enumerate(frames.items()):
+            file_name = f'sheet_{i}.pkl'
+            df.to_pickle(staging / file_name)
+            sheets.append({'name': name, 'file': file_name})
+        with open(staging / 'manifest.json', 'w', encoding='utf-8') as f:
+            json_lib.dump({
+                'source': workbook_key[0],
+                'mtime_ns': workbook_key[1],
+                'size': workbook_key[2],
+                'format': 'pandas-pickle',
+                'sheets': sheets
+            }, f, ensure_ascii=False)
+        if target.exists():
+            shutil.rmtree(target)
+        os.replace(staging, target)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+
+def _parse_workbook(excel_path, required_sheet=None):
+    """解析工作簿的全部sheet，返回 {sheet名: DataFrame}；required_sheet不存在时直接报错"""
+    with _pandas().ExcelFile(excel_path) as workbook:
+        if required_sheet is not None and required_sheet not in workbook.sheet_names:
+            raise ValueError(f"Worksheet named '{required_sheet}' not found")
+        return {name: workbook.parse(name).fillna('') for name in workbook.sheet_names}
+
+
+class SidecarBuildProgress:
+    """Excel转换缓存的后台构建进度"""
+
+    def __init__(self, excel_files):
+        self.excel_files = list(excel_files)
+        self.status = 'pending'  # pending / running / done
+        self.converted = 0
+        self.skipped = 0
+        self.failed = 0
+        self.started_at = None
+        self.finished_at = None
+
+    def to_dict(self):
+        return {
+            'status': self.status,
+            'total': len(self.excel_files),
+            'converted': self.converted,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'cache_dir': str(Path(EXCEL_SIDECAR_DIR).resolve()),
+            'elapsed_seconds': round((self.finished_at or time.time()) - self.started_at, 2) if self.started_at else None
+        }
+
+
+sidecar_build = None  # 最近一次的转换任务（SidecarBuildProgress）
+sidecar_build_lock = threading.Lock()
+
+
+def _run_sidecar_build(progress):
+    """后台转换线程：逐个工作簿转换，已有新鲜缓存的跳过"""
+    progress.status = 'running'
+    progress.started_at = time.time()
+    for excel_file in progress.excel_files:
+        try:
+            workbook_key = _workbook_key(Path(excel_file))
+            if read_sidecar_manifest(workbook_key) is not None:
+                progress.skipped += 1
+                continue
+            frames = _parse_workbook(Path(excel_file))
+            write_sidecar(workbook_key, frames)
+            progress.converted += 1
+        except Exception as e:
+            progress.failed += 1
+            logger.warning(f"转换Excel文件失败 {excel_file}: {e}")
+    progress.status = 'done'
+    progress.finished_at = time.time()
+    logger.info(f"Excel转换缓存构建完成: {progress.to_dict()}")
+
+
+def start_sidecar_build(excel_files):
+    """启动后台转换任务，已有任务在运行时返回None"""
+    global sidecar_build
+
+    with sidecar_build_lock:
+        if sidecar_build is not None and sidecar_build.status != 'done':
+            return None
+        sidecar_build = SidecarBuildProgress(excel_files)
+
+    threading.Thread(target=_run_sidecar_build, args=(sidecar_build,), name='excel-sidecar', daemon=True).start()
+    return sidecar_build
+
+
+def load_excel_frame(excel_path, sheet_name=None):
+    """读取工作表为DataFrame（NaN已替换为空字符串），优先使用缓存
+
+    多sheet的工作簿会一次性解析全部sheet并放入缓存，同一工作簿的其他sheet无需再次解析。
+    """
+    workbook_key = _workbook_key(excel_path)
+
+    # sheet_name为空时读取第一个工作表
+    if sheet_name is None:
+        sheet_names = excel_cache.get_sheet_names(workbook_key)
+        if sheet_names:
+            sheet_name = sheet_names[0]
+    if sheet_name is not None:
+        df = excel_cache.get(workbook_key + (sheet_name,))
+        if df is not None:
+            return df
+
+    # 其次读取新鲜的转换缓存
+    manifest = read_sidecar_manifest(workbook_key)
+    if manifest is not None:
+        sheet_names = [sheet['name'] for sheet in manifest['sheets']]
+        excel_cache.put_sheet_names(workbook_key, sheet_names)
+        if sheet_name is None:
+            sheet_name = sheet_names[0]
+        if sheet_name in sheet_names:
+            try:
+                df = read_sidecar_sheet(workbook_key, manifest, sheet_name)
+                excel_cache.count_sidecar_read()
+                excel_cache.put(workbook_key + (sheet_name,), df)
+                return df
+            except Exception as e:
+                logger.warning(f"读取Excel转换缓存失败 {excel_path}: {e}")
+
+    # 最后解析原始文件
+    frames = _parse_workbook(excel_path, sheet_name)
+    excel_cache.put_sheet_names(workbook_key, frames.keys())
+    if sheet_name is None:
+        sheet_name = next(iter(frames))
+
+    # 请求的sheet最后放入，避免被同一工作簿的其他sheet挤出缓存
+    for name, frame in frames.items():
+        if name != sheet_name:
+            excel_cache.put(workbook_key + (name,), frame)
+    excel_cache.put(workbook_key + (sheet_name,), frames[sheet_name])
+    return frames[sheet_name]
+
+
+# 预取Excel上下文的线程数（为0时关闭预取）和前后各预取的告警条数
+EXCEL_PREFETCH_WORKERS = int(os.environ.get('EXCEL_PREFETCH_WORKERS', 2))
+EXCEL_PREFETCH_NEIGHBORS = int(os.environ.get('EXCEL_PREFETCH_NEIGHBORS', 2))
+# 记录的已预取、尚未被请求的工作表数量上限（用于统计命中率）
+EXCEL_PREFETCH_TRACK_MAX = 1024
+
+
+class ExcelPrefetcher:
+    """Excel工作表的后台预取和读取去重
+
+    获取导航信息时，在线程池中预先解析筛选顺序中前后几条告警对应的工作表并放入 excel_cache。
+    同一工作簿同一时间只读取一次：请求或预取发现该工作簿正在读取时等待其完成，再从缓存取结果。
+    """
+
+    def __init__(self, workers, neighbors):
+        self.workers = workers
+        self.neighbors = neighbors
+        self.max_pending = workers * 4  # 排队的预取任务上限，超出时不再预取
+        self._executor = None  # 首次预取时创建（多进程模式下在各worker内创建）
+        self._inflight = {}  # 工作簿缓存键 -> (Future, 是否为预取)
+        self._queued = set()  # 已提交、尚未完成的 (工作簿缓存键, sheet名)
+        self._prefetched = OrderedDict()  # 预取完成、尚未被请求的 (工作簿缓存键, sheet名)
+        self._lock = threading.Lock()
+        self.scheduled = 0
+        self.completed = 0
+        self.failed = 0
+        self.dropped = 0
+        self.requests = 0
+        self.hits = 0  # 请求的工作表已由预取读入缓存，或正由预取读取
+        self.waits = 0  # 请求等待了正在进行的读取
+
+    def load(self, excel_path, sheet_name=None, prefetch=False):
+        """读取工作表（同 load_excel_frame），同一工作簿正在读取时等待其完成而不重复解析"""
+        workbook_key = _workbook_key(excel_path)
+        with self._lock:
+            entry = self._inflight.get(workbook_key)
+            if not prefetch:
+                self.requests += 1
+                prefetched = self._prefetched.pop((workbook_key, sheet_name), None) is not None
+                if prefetched or (entry is not None and entry[1]):
+                    self.hits += 1
+                if entry is not None:
+                    self.waits += 1
+            if entry is None:
+                future = Future()
+                self._inflight[workbook_key] = (future, prefetch)
+
+        if entry is not None:
+            try:
+                entry[0].result()
+            except Exception:
+                pass  # 由当前线程重新读取并报告错误
+            return load_excel_frame(excel_path, sheet_name)
+
+        try:
+            df = load_excel_frame(excel_path, sheet_name)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(None)
+        finally:
+            with self._lock:
+                self._inflight.pop(workbook_key, None)
+        return df
+
+    def schedule(self, ds, positions):
+        """在后台预取快照ds中这些位置的结果对应的工作表（已缓存、正在读取或已排队的跳过）"""
+        if self.workers <= 0 or EXCEL_READER_BACKEND != EXCEL_READER_PANDAS or not PANDAS_AVAILABLE or not ds.excel_files:
+            return
+        for position in positions:
+            excel_file_path, sheet_name = locate_excel_file(ds, ds.results[position])
+            if not excel_file_path:
+                continue
+            try:
+                workbook_key = _workbook_key(Path(excel_file_path))
+            except OSError:
+                continue
+            key = (workbook_key, sheet_name)
+            with self._lock:
+                if (key in self._queued or workbook_key in self._inflight or
+                        excel_cache.contains(workbook_key + (sheet_name,))):
+                    continue
+                if len(self._queued) >= self.max_pending:
+                    self.dropped += 1
+                    continue
+                self._queued.add(key)
+                self.scheduled += 1
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='excel-prefetch')
+            self._executor.submit(self._prefetch, excel_file_path, sheet_name, key)
+
+    def _prefetch(self, excel_file_path, sheet_name, key):
+        try:
+            self.load(Path(excel_file_path), sheet_name, prefetch=True)
+        except Exception as e:
+            logger.debug(f"预取Excel失败 {excel_file_path}: {e}")
+            with self._lock:
+                self.failed += 1
+        else:
+            with self._lock:
+                self.completed += 1
+                self._prefetched[key] = True
+                while len(self._prefetched) > EXCEL_PREFETCH_TRACK_MAX:
+                    self._prefetched.popitem(last=False)
+        finally:
+            with self._lock:
+                self._queued.discard(key)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'neighbors': self.neighbors,
+                'scheduled': self.scheduled,
+                'completed': self.completed,
+                'failed': self.failed,
+                'dropped': self.dropped,
+                'queued': len(self._queued),
+                'requests': self.requests,
+                'hits': self.hits,
+                'waits': self.waits,
+                'hit_rate': round(self.hits / self.requests, 3) if self.requests else 0.0
+            }
+
+
+excel_prefetcher = ExcelPrefetcher(EXCEL_PREFETCH_WORKERS, EXCEL_PREFETCH_NEIGHBORS)
+
+
+def neighbor_positions(positions, index, count):
+    """筛选结果中第index条前后各count条的位置，由近及远、下一条优先"""
+    neighbors = []
+    for distance in range(1, count + 1):
+        for i in (index + distance, index - distance):
+            if 0 <= i < len(positions):
+                neighbors.append(positions[i])
+    return neighbors
+
+
+# infer_dtype结果为这些类型的object列中不含时间值，转换时无需逐格检查
+EXCEL_PLAIN_INFERRED_TYPES = ('string', 'integer', 'floating', 'mixed-integer-float', 'boolean', 'empty', 'decimal')
+
+
+def _frame_to_records(df):
+    """将DataFrame转换为可JSON序列化的字典列表（按列向量化处理，不逐行逐格遍历）"""
+    pd = _pandas()
+    frame = df.astype(object)
+    frame = frame.where(df.notna(), '')
+    for col in frame.columns:
+        # 时间类型转换为字符串；纯数值/字符串列无需处理
+        if df[col].dtype.kind == 'M' or (
+                df[col].dtype == object and
+                pd.api.types.infer_dtype(df[col], skipna=True) not in EXCEL_PLAIN_INFERRED_TYPES):
+            frame[col] = frame[col].map(lambda value: str(value) if isinstance(value, pd.Timestamp) else value)
+    return frame.to_dict('records')
+
+
+# pandas默认按缺失值处理的文本，流式读取时同样视为空值
+EXCEL_NA_VALUES = frozenset({'', '#N/A', '#N/A N/A', '#NA', '-1.#IND', '-1.#QNAN', '-NaN', '-nan', '1.#IND', '1.#QNAN',
+                             '<NA>', 'N/A', 'NA', 'NULL', 'NaN', 'None', 'n/a', 'nan', 'null'})
+# 公式出错的单元格（openpyxl只读模式下为错误文本）
+EXCEL_ERROR_VALUES = frozenset({'#NULL!', '#DIV/0!', '#VALUE!', '#REF!', '#NAME?', '#NUM!', '#N/A', '#GETTING_DATA'})
+INTEGER_TEXT_PATTERN = re.compile(r'\s*[+-]?\d+\s*')
+
+
+def _xlsx_cell_value(value):
+    """openpyxl单元格值：整数值的数字转为int，错误值为None（与pandas的转换一致）"""
+    if isinstance(value, float):
+        return int(value) if value.is_integer() else value
+    if isinstance(value, str) and value in EXCEL_ERROR_VALUES:
+        return None
+    return value
+
+
+def _xls_cell_value(cell, datemode, xlrd):
+    """xlrd单元格值：日期转为datetime（只有时间时为time），整数值的数字转为int，空单元格和错误值为None"""
+    if cell.ctype in (xlrd.XL_CELL_EMPTY, xlrd.XL_CELL_BLANK, xlrd.XL_CELL_ERROR):
+        return None
+    if cell.ctype == xlrd.XL_CELL_DATE:
+        value = xlrd.xldate.xldate_as_datetime(cell.value, datemode)
+        return value.time() if value.year == 1899 else value
+    if cell.ctype == xlrd.XL_CELL_BOOLEAN:
+        return bool(cell.value)
+    if cell.ctype == xlrd.XL_CELL_NUMBER:
+        return int(cell.value) if float(cell.value).is_integer() else cell.value
+    return cell.value
+
+
+class ExcelRowReader:
+    """流式读取工作表的行，不依赖pandas：xlsx使用openpyxl只读模式，xls使用xlrd按需加载
+
+    rows() 逐行产出单元格值列表（末尾的空单元格已去掉），空单元格为None。
+    """
+
+    def __init__(self, excel_path, sheet_name=None):
+        self.excel_path = Path(excel_path)
+        self.sheet_name = sheet_name
+        self._workbook = None
+        self._sheet = None
+        self._xlrd = None
+
+    def _sheet_to_read(self, sheet_names):
+        if self.sheet_name is None:
+            return sheet_names[0]
+        if self.sheet_name not in sheet_names:
+            raise ValueError(f"Worksheet named '{self.sheet_name}' not found")
+        return self.sheet_name
+
+    def __enter__(self):
+        if self.excel_path.suffix.lower() == '.xls':
+            import xlrd
+            self._xlrd = xlrd
+            self._workbook = xlrd.open_workbook(str(self.excel_path), on_demand=True)
+            self._sheet = self._workbook.sheet_by_name(self._sheet_to_read(self._workbook.sheet_names()))
+        else:
+            import openpyxl
+            self._workbook = openpyxl.load_workbook(self.excel_path, read_only=True, data_only=True, keep_links=False)
+            self._sheet = self._workbook[self._sheet_to_read(self._workbook.sheetnames)]
+            # 与pandas一致，按实际内容读取，不使用声明的尺寸
+            self._sheet.reset_dimensions()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._xlrd is not None:
+            self._workbook.release_resources()
+        else:
+            self._workbook.close()
+
+    def rows(self):
+        if self._xlrd is not None:
+            rows = ([_xls_cell_value(cell, self._workbook.datemode, self._xlrd) for cell in self._sheet.row(r)]
+                    for r in range(self._sheet.nrows))
+        else:
+            rows = ([_xlsx_cell_value(value) for value in row] for row in self._sheet.iter_rows(values_only=True))
+        for values in rows:
+            while values and values[-1] is None:
+                values.pop()
+            yield values
+
+
+def _stream_column_names(header):
+    """按pandas的规则生成列名：空表头为 Unnamed: 序号，重复的列名依次加 .1 .2 后缀"""
+    names = []
+    counts = {}
+    for i, value in enumerate(header):
+        name = f'Unnamed: {i}' if value is None or value == '' else value
+        count = counts.get(name, 0)
+        while count > 0:
+            counts[name] = count + 1
+            name = f'{name}.{count}'
+            count = counts.get(name, 0)
+        counts[name] = count + 1
+        names.append(name)
+    return names
+
+
+def _is_number_text(value):
+    if not isinstance(value, str) or '_' in value:
+        return False
+    try:
+        float(value)
+    except ValueError:
+        return False
+    return True
+
+
+class _ColumnProfile:
+    """一列在整个工作表中的取值概况，用于按pandas的规则推断列类型"""
+
+    __slots__ = ('count', 'present', 'missing', 'all_bool', 'all_number', 'any_float', 'all_datetime')
+
+    def __init__(self):
+        self.count = 0  # 统计过的单元格数（短于该列的行不计入）
+        self.present = False
+        self.missing = False
+        self.all_bool = True
+        self.all_number = True  # 全为数字或数字文本
+        self.any_float = False
+        self.all_datetime = True
+
+    def add(self, value):
+        self.count += 1
+        if value is None or (isinstance(value, str) and value in EXCEL_NA_VALUES):
+            self.missing = True
+            return
+        self.present = True
+        is_bool = isinstance(value, bool)
+        self.all_bool = self.all_bool and is_bool
+        self.all_datetime = self.all_datetime and isinstance(value, datetime.datetime)
+        if is_bool or not (isinstance(value, (int, float)) or _is_number_text(value)):
+            self.all_number = False
+        elif isinstance(value, float) or (isinstance(value, str) and not INTEGER_TEXT_PATTERN.fullmatch(value)):
+            self.any_float = True
+
+
+class _SheetProfile:
+    """流式读取的工作表概况：数据行数和各列的取值概况（首次读取时完整扫描一遍得到，之后分页读够即停止）"""
+
+    def __init__(self):
+        self.total_rows = 0
+        self.columns = []
+
+    def add_row(self, values):
+        while len(self.columns) < len(values):
+            self.columns.append(_ColumnProfile())
+        for column, value in zip(self.columns, values):
+            column.add(value)
+        self.total_rows += 1
+
+    def finish(self, header):
+        while len(self.columns) < len(header):
+            self.columns.append(_ColumnProfile())
+        for column in self.columns:
+            # 较短的行和中间的空行在该列为缺失值
+            column.missing = column.missing or column.count < self.total_rows
+        return self
+
+    @property
+    def width(self):
+        return len(self.columns)
+
+
+# 流式读取时缓存的工作表概况数量，键为工作簿缓存键 + sheet名，文件变化后自动失效
+EXCEL_STREAM_PROFILE_CACHE_SIZE = 256
+excel_stream_profiles = OrderedDict()
+excel_stream_profiles_lock = threading.Lock()
+
+
+def _stream_column_values(values, profile):
+    """按整列的概况以pandas的类型推断整理本次读取的值（缺失值为None）
+
+    全为数字（含数字文本）时，有缺失值或小数则统一为float；全为布尔值且有缺失值时转为1.0/0.0；
+    全为日期时转为字符串；其他列保持原值。
+    """
+    values = [None if isinstance(value, str) and value in EXCEL_NA_VALUES else value for value in values]
+    if not profile.present:
+        return values
+
+    if profile.all_bool:
+        return [None if value is None else float(value) for value in values] if profile.missing else values
+    if profile.all_number:
+        numbers = [value if not isinstance(value, str) else
+                   int(value) if INTEGER_TEXT_PATTERN.fullmatch(value) else float(value) for value in values]
+        if profile.missing or profile.any_float:
+            return [None if value is None else float(value) for value in numbers]
+        return numbers
+    if profile.all_datetime:
+        return [None if value is None else str(value) for value in values]
+    return values
+
+
+def read_excel_window_stream(excel_path, sheet_name=None, offset=0, limit=None, columns=None):
+    """不经过pandas流式读取工作表的部分行和列，返回格式与 read_excel_window 相同
+
+    首次读取某个工作表时完整扫描一遍，统计总行数和各列的类型概况并缓存；之后读够 offset+limit 行即停止。
+    列类型按整个工作表推断，各页的类型一致，与pandas的结果相同。
+    """
+    profile_key = _workbook_key(excel_path) + (sheet_name,)
+    with excel_stream_profiles_lock:
+        profile = excel_stream_profiles.get(profile_key)
+    scanning = profile is None
+    if scanning:
+        profile = _SheetProfile()
+
+    with ExcelRowReader(excel_path, sheet_name) as reader:
+        rows = reader.rows()
+        header = next(rows, None)
+        if header is None:
+            return {'records': [], 'total_rows': 0, 'columns': []}
+
+        stop = offset + limit if limit is not None else None
+        window = []
+        row_num = 0
+        blank_rows = 0
+        for values in rows:
+            # 中间的空行保留为空记录（与pandas一致），末尾的空行丢弃
+            if not values:
+                blank_rows += 1
+                continue
+            for row in [[]] * blank_rows + [values]:
+                if row_num >= offset and (stop is None or row_num < stop):
+                    window.append(row)
+                if scanning:
+                    profile.add_row(row)
+                row_num += 1
+            blank_rows = 0
+            if not scanning and stop is not None and row_num >= stop:
+                break
+
+    if scanning:
+        profile.finish(header)
+        with excel_stream_profiles_lock:
+            excel_stream_profiles[profile_key] = profile
+            while len(excel_stream_profiles) > EXCEL_STREAM_PROFILE_CACHE_SIZE:
+                excel_stream_profiles.popitem(last=False)
+
+    width = profile.width
+    names = _stream_column_names(header + [None] * (width - len(header)))
+    selected = range(width)
+    if columns:
+        column_lookup = {str(name): i for i, name in enumerate(names)}
+        selected = [column_lookup[c] for c in columns if c in column_lookup]
+
+    column_values = [_stream_column_values([row[i] if i < len(row) else None for row in window], profile.columns[i])
+                     for i in selected]
+    records = [
+        {names[i]: ('' if values[r] is None else values[r]) for i, values in zip(selected, column_values)}
+        for r in range(len(window))
+    ] if selected else []
+    return {
+        'records': records,
+        'total_rows': profile.total_rows,
+        'columns': [str(name) for name in names]
+    }
+
+
+def read_excel_window(excel_file_path, sheet_name=None, offset=0, limit=None, columns=None):
+    """读取Excel工作表的部分行和列
+
+    返回 {'records': 行数据, 'total_rows': 工作表总行数, 'columns': 全部列名}，读取失败返回None。
+    columns为空时返回全部列；limit为空时返回offset之后的全部行。
+    """
+    if not EXCEL_READER_AVAILABLE:
+        return None
+
+    try:
+        excel_path = Path(excel_file_path)
+        if not excel_path.exists():
+            logger.warning(f"Excel文件不存在: {excel_file_path}")
+            return None
+
+        if EXCEL_READER_BACKEND == EXCEL_READER_STREAM:
+            return read_excel_window_stream(excel_path, sheet_name, offset, limit, columns)
+
+        # 读取Excel文件（NaN值已替换为空字符串，以便JSON序列化；正在预取时等待预取完成）
+        df = excel_prefetcher.load(excel_path, sheet_name)
+
+        # 只转换请求的行和列
+        window = df.iloc[offset:offset + limit if limit is not None else None]
+        if columns:
+            column_lookup = {str(col): col for col in df.columns}
+            window = window[[column_lookup[c] for c in columns if c in column_lookup]]
+
+        return {
+            'records': _frame_to_records(window),
+            'total_rows': len(df),
+            'columns': [str(col) for col in df.columns]
+        }
+
+    except Exception as e:
+        logger.warning(f"读取Excel文件失败 {excel_file_path}: {e}")
+        return None
+
+
+def read_excel_sheet(excel_file_path, sheet_name=None):
+    """读取Excel文件的工作表"""
+    window = read_excel_window(excel_file_path, sheet_name)
+    return window['records'] if window is not None else None
 
 
-@app.route('/<path:filename>')
-def serve_static(filename):
-    """提供静态文件"""
-    try:
-        # 首先尝试从前端dist目录提供
-        frontend_path = Path('frontend/dist') / filename
-        if frontend_path.exists():
-            return send_from_directory('frontend/dist', filename)
-        # 然后尝试默认的静态文件夹
-        return send_from_directory(app.static_folder, filename)
-    except Exception as e:
-        logger.error(f"提供静态文件失败 {filename}: {e}")
-        return "File not found", 404
+def _split_scenario_id(scenario_id):
+    """解析scenario_id: 格式为 "Excel文件名_Sheet名"（从最后一个下划线拆分）
 
+    例如："冷塔加减机_BJ4-25年BA报警-冷却塔加减机52个-AIOS_4.7-1"
+    Excel文件名：冷塔加减机_BJ4-25年BA报警-冷却塔加减机52个-AIOS
+    Sheet名：4.7-1
+    不包含下划线时整体作为Excel文件名，Sheet名为None
+    """
+    last_underscore_index = scenario_id.rfind('_')
+    if last_underscore_index > 0:
+        return scenario_id[:last_underscore_index], scenario_id[last_underscore_index + 1:]
+    return scenario_id, None
 
-# 文件上传功能已移除，改为路径扫描方式
 
-@app.route('/api/scan/excel', methods=['POST'])
-def scan_excel():
-    """扫描Excel文件（只返回文件名列表，不读取内容）"""
-    global excel_dir_path, excel_files_list
-    
+def read_workbook_sheet_names(excel_file_path):
+    """读取工作簿的sheet名列表（只读元数据，不解析单元格），失败返回None"""
+    excel_path = Path(excel_file_path)
     try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': '无效的请求数据'}), 400
+        workbook_key = _workbook_key(excel_path)
+        sheet_names = excel_cache.get_sheet_names(workbook_key)
+        if sheet_names is not None:
+            return sheet_names
 
-        excel_dir = data.get('excel_dir', '').strip()
-        if not excel_dir:
-            return jsonify({'error': '必须提供Excel目录路径'}), 400
+        manifest = read_sidecar_manifest(workbook_key)
+        if manifest is not None:
+            sheet_names = [sheet['name'] for sheet in manifest['sheets']]
+        elif excel_path.suffix.lower() == '.xlsx':
+            import openpyxl
+            workbook = openpyxl.load_workbook(excel_path, read_only=True, keep_links=False)
+            try:
+                sheet_names = list(workbook.sheetnames)
+            finally:
+                workbook.close()
+        elif excel_path.suffix.lower() == '.xls':
+            import xlrd
+            workbook = xlrd.open_workbook(str(excel_path), on_demand=True)
+            try:
+                sheet_names = workbook.sheet_names()
+            finally:
+                workbook.release_resources()
+        else:
+            return None
 
-        # 扫描Excel文件
-        excel_files = scan_excel_files(excel_dir)
-        excel_file_paths = [str(f) for f in excel_files]
-        
-        # 保存Excel目录路径和文件列表
-        excel_dir_path = excel_dir
-        excel_files_list = excel_file_paths
+        excel_cache.put_sheet_names(workbook_key, sheet_names)
+        return sheet_names
+    except Exception as e:
+        logger.warning(f"读取Excel工作表名失败 {excel_file_path}: {e}")
+        return None
 
-        return jsonify({
-            'message': f'扫描完成，找到 {len(excel_file_paths)} 个Excel文件',
-            'excel_files': excel_file_paths,
-            'count': len(excel_file_paths)
-        })
 
-    except Exception as e:
-        logger.error(f"扫描Excel文件失败: {e}")
-        return jsonify({'error': str(e)}), 500
+def _resolve_scenario(scenario_id, workbook_stems):
+    """将scenario_id解析到工作簿和sheet
 
+    候选工作簿为文件名（不含扩展名）包含Excel文件名部分的文件。有多个候选时，
+    优先选择确实包含该sheet的工作簿，其次选择文件名完全一致的，最后按扫描顺序取第一个。
+    """
+    excel_file_name, sheet_name = _split_scenario_id(scenario_id)
+    candidates = [path for path, stem in workbook_stems if excel_file_name in stem]
 
-@app.route('/api/load/results', methods=['POST'])
-def load_results():
-    """加载评测结果文件"""
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': '无效的请求数据'}), 400
+    resolution = {
+        'excel_file': None,
+        'sheet_name': sheet_name,
+        'sheet_verified': None,  # 是否确认工作簿中存在该sheet，无法读取sheet名时为None
+        'candidates': candidates
+    }
+    if not candidates:
+        return resolution
 
-        results_path = data.get('results_path', '').strip()
-        if not results_path:
-            return jsonify({'error': '必须提供评测结果文件路径'}), 400
+    def rank(candidate):
+        path, order = candidate
+        sheet_names = read_workbook_sheet_names(path) if sheet_name is not None and len(candidates) > 1 else None
+        has_sheet = sheet_names is not None and sheet_name in sheet_names
+        return (not has_sheet, Path(path).stem != excel_file_name, order)
 
-        # 保存结果文件路径
-        global results_file_path
-        results_file_path = results_path
+    excel_file = min(((path, order) for order, path in enumerate(candidates)), key=rank)[0]
+    resolution['excel_file'] = excel_file
+    if sheet_name is not None:
+        sheet_names = read_workbook_sheet_names(excel_file)
+        if sheet_names is not None:
+            resolution['sheet_verified'] = sheet_name in sheet_names
+    return resolution
 
-        # 加载评测结果
-        load_evaluation_results(results_path)
-        results_count = len(evaluation_results)
 
-        # 收集分类信息
-        categories = set()
-        for result in evaluation_results:
-            if 'meta' in result and 'category' in result['meta']:
-                categories.add(result['meta']['category'])
+class ScenarioIndex:
+    """scenario_id -> (工作簿, sheet) 的解析索引，扫描和加载都完成后构建一次，之后O(1)查询"""
 
-        return jsonify({
-            'message': f'文件加载成功，共 {results_count} 条记录',
-            'total_records': results_count,
-            'categories': sorted(list(categories))
-        })
+    def __init__(self, excel_files, scenario_ids, version):
+        self.version = version  # 构建时的 (数据版本, Excel扫描版本)
+        self.built_at = time.time()
+        workbook_stems = [(path, Path(path).stem) for path in excel_files]
+        self.entries = {scenario_id: _resolve_scenario(scenario_id, workbook_stems) for scenario_id in scenario_ids}
 
-    except Exception as e:
-        logger.error(f"加载评测结果文件失败: {e}")
-        return jsonify({'error': str(e)}), 500
+    def get(self, scenario_id):
+        return self.entries.get(scenario_id)
 
+    def report(self):
+        unmatched = sorted(sid for sid, entry in self.entries.items() if not entry['excel_file'])
+        ambiguous = {sid: entry['candidates'] for sid, entry in self.entries.items() if len(entry['candidates']) > 1}
+        missing_sheet = sorted(sid for sid, entry in self.entries.items() if entry['sheet_verified'] is False)
+        return {
+            'scenarios': len(self.entries),
+            'resolved': len(self.entries) - len(unmatched),
+            'unmatched': unmatched,
+            'ambiguous': ambiguous,
+            'missing_sheet': missing_sheet,
+            'built_at': self.built_at
+        }
 
-@app.route('/api/analysis/start', methods=['POST'])
-def start_analysis():
-    """开始分析（Excel已扫描，结果已加载）"""
-    try:
-        data = request.get_json()
-        if not data:
-            return jsonify({'error': '无效的请求数据'}), 400
 
-        # 此时数据已经加载，只需要确认
-        results_count = len(evaluation_results)
-        
-        # 获取Excel文件列表（如果之前扫描过）
-        excel_dir = data.get('excel_dir', '').strip()
-        excel_files = []
-        if excel_dir:
-            excel_files = [str(f) for f in scan_excel_files(excel_dir)]
+def _build_scenario_index(version, excel_files, scenario_ids):
+    global dataset
 
-        return jsonify({
-            'message': '分析完成',
-            'results_count': results_count,
-            'excel_files_count': len(excel_files)
-        })
+    started = time.time()
+    index = ScenarioIndex(excel_files, scenario_ids, version)
+    with dataset_lock:
+        # 构建期间数据或扫描结果已变化时丢弃
+        if version != dataset.scenario_version:
+            return
+        dataset = dataset.replace(scenario_index=index)
+    report = index.report()
+    logger.info(f"scenario索引构建完成：{report['resolved']}/{report['scenarios']} 个已匹配，"
+                f"{len(report['unmatched'])} 个未匹配，{len(report['ambiguous'])} 个有多个候选，"
+                f"耗时 {time.time() - started:.2f}s")
 
-    except Exception as e:
-        logger.error(f"开始分析失败: {e}")
-        return jsonify({'error': str(e)}), 500
 
+def rebuild_scenario_index(ds):
+    """扫描和加载都完成后，在后台线程中为快照ds构建scenario索引"""
+    if not ds.excel_files or ds.columns is None:
+        return
+    scenario_ids = [sid for sid in ds.columns.scenarios if isinstance(sid, str)]
+    threading.Thread(
+        target=_build_scenario_index,
+        args=(ds.scenario_version, list(ds.excel_files), scenario_ids),
+        name='scenario-index', daemon=True
+    ).start()
 
-# /api/scan/load API已废弃，改为分步骤的API：
-# 1. /api/scan/excel - 扫描Excel文件
-# 2. /api/load/results - 加载结果文件
-# 3. /api/analysis/start - 开始分析
 
+def reuse_scenario_index(previous, ds):
+    """追加结果后场景没有变化时，为快照ds沿用上一个快照的scenario索引，返回是否沿用"""
+    global dataset
 
-@app.route('/api/results')
-def get_results():
-    """获取评测结果列表"""
-    try:
-        page = int(request.args.get('page', 1))
-        size = int(request.args.get('size', 20))
-        search = request.args.get('search', '').strip()
-        category = request.args.get('category', '').strip()
-        correctness = request.args.get('correctness', '').strip()
+    index = previous.scenario_index
+    if (index is None or index.version != previous.scenario_version or
+            previous.excel_version != ds.excel_version or list(previous.scenarios) != list(ds.scenarios)):
+        return False
+    index = copy.copy(index)
+    index.version = ds.scenario_version
+    with dataset_lock:
+        if dataset is ds:
+            dataset = dataset.replace(scenario_index=index)
+    return True
 
-        # 筛选数据
-        filtered_results = evaluation_results
 
-        if search:
-            search_lower = search.lower()
-            filtered_results = [
-                r for r in filtered_results
-                if search_lower in r.get('input', '').lower() or
-                   search_lower in r.get('expected_output', '').lower() or
-                   search_lower in r.get('model_output', '').lower()
-            ]
+def resolve_scenario(ds, scenario_id):
+    """查询scenario_id对应的工作簿和sheet；索引尚未就绪时直接匹配"""
+    index = ds.scenario_index
+    if index is not None and index.version == ds.scenario_version:
+        entry = index.get(scenario_id)
+        if entry is not None:
+            return entry
+    return _resolve_scenario(scenario_id, [(path, Path(path).stem) for path in ds.excel_files])
 
-        if category:
-            filtered_results = [
-                r for r in filtered_results
-                if r.get('meta', {}).get('category') == category
-            ]
-
-        if correctness:
-            if correctness == "correct":
-                filtered_results = [r for r in filtered_results if r.get('correct', False)]
-            elif correctness == "incorrect":
-                filtered_results = [r for r in filtered_results if not r.get('correct', True) and r.get('predicted_label') is not None]
-            elif correctness == "parse_failed":
-                filtered_results = [r for r in filtered_results if r.get('predicted_label') is None]
 
-        # 分页
-        start_idx = (page - 1) * size
-        end_idx = start_idx + size
-        paginated_results = filtered_results[start_idx:end_idx]
+def locate_excel_file(ds, result):
+    """根据结果的meta信息定位Excel文件和sheet，返回 (Excel文件路径, sheet名)，未找到时路径为None"""
+    excel_file_path = None
+    sheet_name = None
 
-        return jsonify({
-            'results': paginated_results,
-            'pagination': {
-                'page': page,
-                'size': size,
-                'total': len(filtered_results),
-                'pages': (len(filtered_results) + size - 1) // size
-            },
-            'filters': {
-                'search': search,
-                'category': category,
-                'correctness': correctness
-            }
-        })
+    if 'meta' in result:
+        meta = result['meta']
+        # 尝试从meta中获取Excel文件路径
+        if 'excel_file_path' in meta:
+            excel_file_path = meta['excel_file_path']
+        elif 'scenario_id' in meta:
+            # 根据scenario_id匹配Excel文件（scenario_id格式: Excel文件名_Sheet名）
+            scenario_id = meta['scenario_id']
+            resolution = resolve_scenario(ds, scenario_id)
+            excel_file_path = resolution['excel_file']
+            if len(resolution['candidates']) > 1:
+                logger.info(f"scenario_id {scenario_id} 匹配到多个Excel文件，使用: {excel_file_path}")
 
-    except Exception as e:
-        logger.error(f"获取结果列表失败: {e}")
-        return jsonify({'error': str(e)}), 500
+        # 如果scenario_id包含下划线，读取对应的sheet（从最后一个下划线拆分），否则读取第一个sheet
+        if 'scenario_id' in meta:
+            sheet_name = _split_scenario_id(meta['scenario_id'])[1]
 
+    return excel_file_path, sheet_name
 
-def read_excel_sheet(excel_file_path, sheet_name=None):
-    """读取Excel文件的工作表"""
-    if not PANDAS_AVAILABLE:
-        return None
-    
-    try:
-        excel_path = Path(excel_file_path)
-        if not excel_path.exists():
-            logger.warning(f"Excel文件不存在: {excel_file_path}")
-            return None
-        
-        # 读取Excel文件
-        if sheet_name:
-            df = pd.read_excel(excel_path, sheet_name=sheet_name)
-        else:
-            # 读取第一个工作表
-            df = pd.read_excel(excel_path, sheet_name=0)
-        
-        # 将NaN值替换为None，以便JSON序列化
-        df = df.fillna('')
-        
-        # 转换为字典列表，确保所有值都是可序列化的
-        records = []
-        for _, row in df.iterrows():
-            record = {}
-            for col in df.columns:
-                value = row[col]
-                # 处理pandas的特殊类型
-                if pd.isna(value):
-                    record[col] = ''
-                elif isinstance(value, (pd.Timestamp, pd.DatetimeTZDtype)):
-                    record[col] = str(value)
-                else:
-                    record[col] = value
-            records.append(record)
-        
-        return records
-    
-    except Exception as e:
-        logger.warning(f"读取Excel文件失败 {excel_file_path}: {e}")
-        return None
 
+def get_excel_context_for_alarm(ds, alarm_id, result, offset=0, limit=None, columns=None):
+    """根据告警ID和结果信息，从快照ds对应的Excel文件中读取上下文（可指定行窗口和列）"""
+    excel_dir_path = ds.excel_dir_path
+    excel_files_list = ds.excel_files
 
-def get_excel_context_for_alarm(alarm_id, result):
-    """根据告警ID和结果信息，从Excel文件中读取上下文"""
-    global excel_dir_path, excel_files_list
-    
     if not excel_dir_path or not excel_files_list:
         return {
             'error': 'Excel文件路径未配置或未扫描到Excel文件。请先在列表页配置Excel文件路径。',
@@ -401,62 +3689,21 @@ def get_excel_context_for_alarm(alarm_id, result):
             'excel_files_count': len(excel_files_list) if excel_files_list else 0
         }
     
-    if not PANDAS_AVAILABLE:
+    if not EXCEL_READER_AVAILABLE:
         return {
-            'error': 'pandas未安装，无法读取Excel文件',
+            'error': 'pandas或openpyxl/xlrd未安装，无法读取Excel文件',
             'excel_files_available': excel_files_list
         }
     
     try:
-        # 根据结果的meta信息找到对应的Excel文件
-        excel_file_path = None
-        
-        if 'meta' in result:
-            meta = result['meta']
-            # 尝试从meta中获取Excel文件路径
-            if 'excel_file_path' in meta:
-                excel_file_path = meta['excel_file_path']
-            elif 'scenario_id' in meta:
-                # 根据scenario_id匹配Excel文件
-                # scenario_id格式: Excel文件名_Sheet名
-                scenario_id = meta['scenario_id']
-                logger.info(f"查找Excel文件，scenario_id: {scenario_id}")
-                
-                # 解析scenario_id: 格式为 "Excel文件名_Sheet名"（从最后一个下划线拆分）
-                # 例如："冷塔加减机_BJ4-25年BA报警-冷却塔加减机52个-AIOS_4.7-1"
-                # Excel文件名：冷塔加减机_BJ4-25年BA报警-冷却塔加减机52个-AIOS
-                # Sheet名：4.7-1
-                last_underscore_index = scenario_id.rfind('_')
-                if last_underscore_index > 0:
-                    excel_file_name = scenario_id[:last_underscore_index]  # 获取Excel文件名部分
-                    sheet_name = scenario_id[last_underscore_index + 1:]  # 获取Sheet名部分
-                    logger.info(f"解析scenario_id - Excel文件名: {excel_file_name}, Sheet名: {sheet_name}")
-                else:
-                    excel_file_name = scenario_id
-                    sheet_name = None
-                    logger.info(f"scenario_id不包含下划线，使用完整名称: {excel_file_name}")
-                
-                # 匹配Excel文件
-                for excel_file in excel_files_list:
-                    excel_file_path_obj = Path(excel_file)
-                    excel_file_stem = excel_file_path_obj.stem  # 文件名（不含扩展名）
-                    
-                    # 匹配逻辑：文件名包含excel_file_name，或者stem等于excel_file_name
-                    if excel_file_name in excel_file_stem or excel_file_stem == excel_file_name:
-                        excel_file_path = excel_file
-                        logger.info(f"找到匹配的Excel文件: {excel_file_path}")
-                        break
+        # 根据结果的meta信息找到对应的Excel文件和sheet
+        excel_file_path, sheet_name_to_read = locate_excel_file(ds, result)
         
         if not excel_file_path:
             # 如果没有找到匹配的Excel文件，返回错误信息
             excel_file_name_hint = ''
             if 'meta' in result and 'scenario_id' in result['meta']:
-                scenario_id = result['meta']['scenario_id']
-                last_underscore_index = scenario_id.rfind('_')
-                if last_underscore_index > 0:
-                    excel_file_name_hint = scenario_id[:last_underscore_index]
-                else:
-                    excel_file_name_hint = scenario_id
+                excel_file_name_hint = _split_scenario_id(result['meta']['scenario_id'])[0]
             
             return {
                 'error': f'未找到匹配的Excel文件。期望的文件名包含: {excel_file_name_hint}',
@@ -465,24 +3712,15 @@ def get_excel_context_for_alarm(alarm_id, result):
                 'excel_files_count': len(excel_files_list)
             }
         
-        # 读取Excel文件内容（读取整个sheet，不限制行数）
-        # 如果scenario_id包含下划线，尝试读取对应的sheet（从最后一个下划线拆分）
-        sheet_name_to_read = None
-        if 'meta' in result and 'scenario_id' in result['meta']:
-            scenario_id = result['meta']['scenario_id']
-            last_underscore_index = scenario_id.rfind('_')
-            if last_underscore_index > 0:
-                sheet_name_to_read = scenario_id[last_underscore_index + 1:]
-                logger.info(f"尝试读取Sheet: {sheet_name_to_read}")
+        excel_window = read_excel_window(excel_file_path, sheet_name_to_read, offset, limit, columns)
         
-        excel_data = read_excel_sheet(excel_file_path, sheet_name=sheet_name_to_read)
-        
-        if excel_data:
+        if excel_window and excel_window['total_rows'] > 0:
             return {
                 'excel_file': excel_file_path,
                 'excel_dir': excel_dir_path,
-                'data': excel_data,  # 返回所有数据
-                'total_rows': len(excel_data)
+                'data': excel_window['records'],
+                'total_rows': excel_window['total_rows'],
+                'columns': excel_window['columns']
             }
         else:
             return {
@@ -499,16 +3737,107 @@ def get_excel_context_for_alarm(alarm_id, result):
         }
 
 
+def excel_context_etag(ds, result, offset, limit, columns):
+    """计算Excel上下文响应的ETag，无法定位Excel文件时返回None"""
+    if not ds.excel_dir_path or not ds.excel_files:
+        return None
+    excel_file_path, sheet_name = locate_excel_file(ds, result)
+    if not excel_file_path:
+        return None
+    try:
+        workbook_key = _workbook_key(Path(excel_file_path))
+    except OSError:
+        return None
+    return make_etag(ds.excel_version, ds.excel_dir_path, workbook_key, sheet_name, offset, limit, columns)
+
+
+# 导出时每批序列化的记录数（内存占用与批大小有关，与导出总数无关）
+EXPORT_BATCH_SIZE = 500
+# CSV导出的列，嵌套在meta中的字段单独成列
+EXPORT_CSV_FIELDS = ('alarm_id', 'category', 'scenario_id', 'predicted_label', 'reference_label', 'correct',
+                     'input', 'expected_output', 'model_output')
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+
+def _csv_row(result):
+    meta = result.get('meta') or {}
+    row = []
+    for field in EXPORT_CSV_FIELDS:
+        value = meta.get(field) if field in ('category', 'scenario_id') else result.get(field)
+        if isinstance(value, (dict, list)):
+            value = json_lib.dumps(value, ensure_ascii=False)
+        row.append('' if value is None else value)
+    return row
+
+
+def _export_chunks(ds, positions, export_format, fields=None):
+    """逐批生成导出内容（NDJSON可按字段投影）"""
+    if export_format == 'csv':
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        # 带BOM，Excel打开时能正确识别UTF-8
+        buffer.write('\ufeff')
+        writer.writerow(EXPORT_CSV_FIELDS)
+        for start in range(0, len(positions), EXPORT_BATCH_SIZE):
+            for position in positions[start:start + EXPORT_BATCH_SIZE]:
+                writer.writerow(_csv_row(ds.results[position]))
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue().encode('utf-8')
+    else:
+        for start in range(0, len(positions), EXPORT_BATCH_SIZE):
+            batch = [ds.results[position] for position in positions[start:start + EXPORT_BATCH_SIZE]]
+            if fields is not None:
+                batch = [project_fields(result, fields) for result in batch]
+            yield b''.join(_json_dumps(result) + b'\n' for result in batch)
+
+
+@app.route('/api/results/export')
+def export_results():
+    """按当前筛选条件流式导出结果（format=ndjson 或 csv，NDJSON可用fields指定字段）"""
+    try:
+        search = request.args.get('search', '').strip()
+        category = request.args.get('category', '').strip()
+        correctness = request.args.get('correctness', '').strip()
+        export_format = request.args.get('format', 'ndjson').strip().lower()
+        if export_format not in EXPORT_FORMATS:
+            return jsonify({'error': f'不支持的导出格式: {export_format}，可选: {", ".join(EXPORT_FORMATS)}'}), 400
+
+        # 导出过程中数据被重新加载也不影响，始终导出同一个快照
+        ds = dataset
+        positions = filter_positions(ds, search, category, correctness)
+        mimetype = 'text/csv' if export_format == 'csv' else 'application/x-ndjson'
+        filename = f'{re.sub(r"[^A-Za-z0-9_.-]", "_", ds.run_id or "results")}.{export_format}'
+        fields = parse_fields_param(request.args)
+        response = app.response_class(stream_with_context(_export_chunks(ds, positions, export_format, fields)),
+                                      mimetype=mimetype)
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+        response.headers['X-Total-Count'] = str(len(positions))
+        return response
+
+    except Exception as e:
+        logger.error(f"导出结果失败: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/results/<alarm_id>')
 def get_result_detail(alarm_id):
     """获取单个结果详情（不自动加载Excel）"""
     try:
-        result = next((r for r in evaluation_results if r.get('alarm_id') == alarm_id), None)
+        ds = dataset
+        result = ds.get_result(alarm_id)
         if not result:
             return jsonify({'error': '结果不存在'}), 404
 
+        etag = make_etag(ds.version, alarm_id)
+        cached_response = not_modified(etag)
+        if cached_response is not None:
+            return cached_response
+
         # 直接返回结果，不加载Excel（Excel通过单独的API加载）
-        return jsonify(result)
+        return with_etag(jsonify(result), etag)
 
     except Exception as e:
         logger.error(f"获取结果详情失败: {e}")
@@ -517,22 +3846,46 @@ def get_result_detail(alarm_id):
 
 @app.route('/api/results/<alarm_id>/excel-context')
 def get_excel_context(alarm_id):
-    """获取Excel上下文（按需加载）"""
+    """获取Excel上下文（按需加载）
+
+    可选参数：offset/limit 指定返回的行窗口，columns 指定返回的列（逗号分隔或重复传参），
+    不传时返回整个sheet。total_rows 始终为整个sheet的行数，便于前端分页。
+    """
+    try:
+        offset = max(int(request.args.get('offset', 0)), 0)
+        limit = request.args.get('limit')
+        limit = max(int(limit), 0) if limit not in (None, '') else None
+        columns = [c.strip() for value in request.args.getlist('columns') for c in value.split(',') if c.strip()]
+    except ValueError:
+        return jsonify({'error': 'offset和limit必须为整数'}), 400
+
     try:
-        result = next((r for r in evaluation_results if r.get('alarm_id') == alarm_id), None)
+        ds = dataset
+        result = ds.get_result(alarm_id)
         if not result:
             return jsonify({'error': '结果不存在'}), 404
 
+        # Excel内容的ETag由工作簿缓存键（路径、修改时间、大小）、sheet和请求的窗口决定
+        etag = excel_context_etag(ds, result, offset, limit, columns)
+        if etag is not None:
+            cached_response = not_modified(etag)
+            if cached_response is not None:
+                return cached_response
+
         # 读取Excel上下文
-        excel_context = get_excel_context_for_alarm(alarm_id, result)
+        excel_context = get_excel_context_for_alarm(ds, alarm_id, result, offset, limit, columns or None)
         
         if excel_context and 'data' in excel_context:
-            return jsonify({
+            response = jsonify({
                 'data': excel_context['data'],
                 'total_rows': excel_context.get('total_rows', len(excel_context['data'])),
+                'offset': offset,
+                'limit': limit,
+                'columns': excel_context.get('columns'),
                 'excel_file': excel_context.get('excel_file'),
                 'excel_dir': excel_context.get('excel_dir')
             })
+            return with_etag(response, etag) if etag is not None else response
         elif excel_context and 'error' in excel_context:
             # 返回详细的错误信息
             error_response = {'error': excel_context['error']}
@@ -562,34 +3915,17 @@ def get_navigation_info(alarm_id):
         correctness = request.args.get('correctness', '').strip()
         
         # 应用相同的筛选逻辑
-        filtered_results = evaluation_results
-
-        if search:
-            search_lower = search.lower()
-            filtered_results = [
-                r for r in filtered_results
-                if search_lower in r.get('input', '').lower() or
-                   search_lower in r.get('expected_output', '').lower() or
-                   search_lower in r.get('model_output', '').lower()
-            ]
+        ds = dataset
+        positions = filter_positions(ds, search, category, correctness)
 
-        if category:
-            filtered_results = [
-                r for r in filtered_results
-                if r.get('meta', {}).get('category') == category
-            ]
-
-        if correctness:
-            if correctness == "correct":
-                filtered_results = [r for r in filtered_results if r.get('correct', False)]
-            elif correctness == "incorrect":
-                filtered_results = [r for r in filtered_results if not r.get('correct', True) and r.get('predicted_label') is not None]
-            elif correctness == "parse_failed":
-                filtered_results = [r for r in filtered_results if r.get('predicted_label') is None]
-
-        # 在筛选后的结果中查找当前告警
-        total = len(filtered_results)
-        current_index = next((i for i, r in enumerate(filtered_results) if r.get('alarm_id') == alarm_id), -1)
+        # 在筛选后的结果中查找当前告警（位置列表升序，二分查找）
+        total = len(positions)
+        current_position = ds.alarm_index.get(alarm_id)
+        current_index = -1
+        if current_position is not None:
+            i = bisect_left(positions, current_position)
+            if i < total and positions[i] == current_position:
+                current_index = i
 
         if current_index == -1:
             return jsonify({
@@ -605,10 +3941,13 @@ def get_navigation_info(alarm_id):
                 }
             })
 
+        # 预取前后几条告警的Excel上下文，上下条切换时无需等待解析
+        excel_prefetcher.schedule(ds, neighbor_positions(positions, current_index, excel_prefetcher.neighbors))
+
         return jsonify({
             'current': alarm_id,
-            'previous': filtered_results[current_index - 1].get('alarm_id') if current_index > 0 else None,
-            'next': filtered_results[current_index + 1].get('alarm_id') if current_index < total - 1 else None,
+            'previous': ds.alarm_id_at(positions[current_index - 1]) if current_index > 0 else None,
+            'next': ds.alarm_id_at(positions[current_index + 1]) if current_index < total - 1 else None,
             'total': total,
             'current_index': current_index + 1,
             'filters': {
@@ -627,7 +3966,8 @@ def get_navigation_info(alarm_id):
 def get_overview_stats():
     """获取整体统计信息"""
     try:
-        if not evaluation_results:
+        ds = dataset
+        if not ds.results:
             return jsonify({
                 'total_results': 0,
                 'correct_predictions': 0,
@@ -639,15 +3979,18 @@ def get_overview_stats():
                 'f1_score': 0.0
             })
 
-        total = len(evaluation_results)
-        correct = sum(1 for r in evaluation_results if r.get('correct', False))
-        incorrect = sum(1 for r in evaluation_results if not r.get('correct', True) and r.get('predicted_label') is not None)
-        parse_failures = sum(1 for r in evaluation_results if r.get('predicted_label') is None)
+        counts = ds.columns.counts()
+        total = counts['total']
+        correct = counts['correct']
+        incorrect = counts['incorrect']
+        parse_failures = counts['parse_failed']
 
+        # 精确率、召回率和F1为各标签的宏平均（基于混淆矩阵）
         accuracy = correct / total if total > 0 else 0.0
-        precision = accuracy  # 简化计算
-        recall = accuracy
-        f1_score = accuracy
+        macro = ds.metrics.overall()['macro']
+        precision = macro['precision']
+        recall = macro['recall']
+        f1_score = macro['f1_score']
 
         return jsonify({
             'total_results': total,
@@ -665,35 +4008,152 @@ def get_overview_stats():
         return jsonify({'error': str(e)}), 500
 
 
+@app.route('/api/stats/metrics')
+def get_metrics_stats():
+    """获取详细指标：micro/macro精确率、召回率、F1，各标签指标，混淆矩阵，以及按分类/场景的分组指标
+
+    可选参数 breakdown=category,scenario 指定返回哪些分组（默认两者都返回）。
+    """
+    try:
+        engine = dataset.metrics
+        if engine is None:
+            return jsonify({'error': '尚未加载评测结果'}), 404
+
+        breakdowns = request.args.get('breakdown', 'category,scenario').split(',')
+        response = {
+            'overall': engine.overall(),
+            'confusion_matrix': engine.confusion_matrix()
+        }
+        if 'category' in breakdowns:
+            response['by_category'] = engine.breakdown('category')
+        if 'scenario' in breakdowns:
+            response['by_scenario'] = engine.breakdown('scenario')
+        return jsonify(response)
+
+    except Exception as e:
+        logger.error(f"获取指标统计失败: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
 @app.route('/api/filters/options')
 def get_filter_options():
     """获取筛选选项"""
-    return jsonify(filter_options)
+    return jsonify(dataset.filter_options)
+
+
+@app.route('/api/stats/cache')
+def get_cache_stats():
+    """获取缓存命中统计"""
+    return jsonify({
+        'dataset_version': dataset.version,
+        'filter_cache': filter_cache.stats(),
+        'search_index': dataset.search_index.stats() if dataset.search_index is not None else None,
+        'excel_cache': excel_cache.stats(),
+        'excel_prefetch': excel_prefetcher.stats(),
+        'run_registry': run_registry.stats()
+    })
+
+
+@app.route('/api/runs')
+def list_runs():
+    """列出已加载的运行及内存占用"""
+    return jsonify({
+        'active_run_id': dataset.run_id,
+        'runs': run_registry.list_runs(),
+        'memory': run_registry.stats()
+    })
+
+
+@app.route('/api/runs/<run_id>/activate', methods=['POST'])
+def activate_run_endpoint(run_id):
+    """切换当前使用的运行"""
+    try:
+        ds = activate_run(run_id)
+        if ds is None:
+            return jsonify({'error': f'运行不存在: {run_id}'}), 404
+        publish_loaded_run(run_id)
+        return jsonify({
+            'message': f'已切换到运行 {run_id}',
+            'run_id': run_id,
+            'total_records': len(ds.results),
+            'results_file_path': ds.results_file_path
+        })
+
+    except Exception as e:
+        logger.error(f"切换运行失败: {e}")
+        return jsonify({'error': str(e)}), 500
+
+
+@app.route('/api/runs/<run_id>', methods=['DELETE'])
+def delete_run(run_id):
+    """从内存中移除运行（当前使用的运行不能移除）"""
+    if run_id == dataset.run_id:
+        return jsonify({'error': '不能移除当前正在使用的运行'}), 409
+    if not run_registry.remove(run_id):
+        return jsonify({'error': f'运行不存在: {run_id}'}), 404
+    shared_state.publish(runs=dict(run_registry.sources))
+    return jsonify({'message': f'已移除运行 {run_id}'})
+
+
+@app.route('/api/runs/compare')
+def compare_runs_endpoint():
+    """按alarm_id对比两个运行：base为基准运行，target为对比运行，limit限制返回的回退/修复明细条数"""
+    base_id = request.args.get('base', '').strip()
+    target_id = request.args.get('target', '').strip()
+    if not base_id or not target_id:
+        return jsonify({'error': '必须提供base和target两个运行ID'}), 400
+    try:
+        limit = max(int(request.args.get('limit', 100)), 0)
+    except ValueError:
+        return jsonify({'error': 'limit必须为整数'}), 400
+
+    try:
+        base = get_run(base_id)
+        target = get_run(target_id)
+        missing = [run_id for run_id, run in ((base_id, base), (target_id, target)) if run is None]
+        if missing:
+            return jsonify({'error': f'运行不存在: {", ".join(missing)}'}), 404
+        return jsonify(compare_runs(base, target, limit))
+
+    except Exception as e:
+        logger.error(f"对比运行失败: {e}")
+        return jsonify({'error': str(e)}), 500
 
 
 @app.route('/api/config/paths')
 def get_config_paths():
     """获取当前配置的路径信息"""
-    global excel_dir_path, results_file_path, excel_files_list
+    ds = dataset
     return jsonify({
-        'excel_dir_path': excel_dir_path,
-        'results_file_path': results_file_path,
-        'excel_files_count': len(excel_files_list) if excel_files_list else 0,
-        'results_count': len(evaluation_results)
+        'excel_dir_path': ds.excel_dir_path,
+        'results_file_path': ds.results_file_path,
+        'excel_files_count': len(ds.excel_files),
+        'results_count': len(ds.results)
     })
 
 
+def clear_loaded_data():
+    """清空已加载的结果和Excel扫描结果并停止跟踪（保留结果文件路径）"""
+    global dataset
+
+    stop_follow()
+    with dataset_lock:
+        dataset = Dataset(
+            version=dataset.version + 1,
+            excel_version=dataset.excel_version + 1,
+            results_file_path=dataset.results_file_path
+        )
+    filter_cache.clear()
+    run_registry.clear()
+    save_session(dataset)
+
+
 @app.route('/api/data', methods=['DELETE'])
 def clear_data():
     """清空数据"""
-    global excel_dir_path, excel_files_list
-    
     try:
-        evaluation_results.clear()
-        excel_dir_path = None
-        excel_files_list = []
-        filter_options['scenarios'] = []
-        filter_options['categories'] = []
+        clear_loaded_data()
+        shared_state.publish(results=None, excel=None, runs={}, follow=None)
 
         return jsonify({'message': '数据已清空'})
 
@@ -702,6 +4162,271 @@ def clear_data():
         return jsonify({'error': str(e)}), 500
 
 
+# ==================== 多进程（预fork）服务模式 ====================
+# 启动前加载好数据再fork出多个worker，worker之间以写时复制方式共享解析后的数据；
+# 任一worker重新加载数据后写入带版本号的状态文件，其他worker在处理请求时检测到版本变化，在后台线程中加载
+# （多数情况下直接读取解析快照），加载完成前这些worker上的请求仍返回旧数据
+
+SERVER_STATE_DIR = os.environ.get('SERVER_STATE_DIR', '.server_state')
+# 子进程异常退出后的重启间隔（秒）
+WORKER_RESTART_DELAY = 1.0
+# 后台加载任务进度写入状态目录的间隔（秒），供其他worker的进度接口读取
+JOB_PUBLISH_INTERVAL = 0.5
+
+
+class SharedState:
+    """多进程模式下各worker共享的数据状态（Excel目录、结果文件路径），单进程模式下不做任何事"""
+
+    def __init__(self, state_dir):
+        self.state_dir = Path(state_dir)
+        self.path = self.state_dir / 'state.json'
+        self.enabled = False
+        self.applied_version = 0
+        self.applied_stamp = None
+        self.syncing = False  # 后台同步线程是否在运行
+        self.sync_lock = threading.Lock()
+
+    def enable(self):
+        (self.state_dir / 'jobs').mkdir(parents=True, exist_ok=True)
+        self.enabled = True
+
+    def read(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json_lib.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _write_json(self, path, data):
+        """先写临时文件再替换，读取方不会读到写了一半的内容"""
+        tmp_path = path.with_name(f'{path.name}.{os.getpid()}.{threading.get_ident()}.tmp')
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json_lib.dump(data, f, ensure_ascii=False)
+        os.replace(tmp_path, path)
+
+    def publish(self, **changes):
+        """本进程的数据发生变化后写入新版本的状态，changes为 excel={'dir': ...} / results={'path': ..., 'mode': ...}"""
+        if not self.enabled:
+            return
+        import fcntl
+
+        with open(self.state_dir / 'state.lock', 'w') as lock_file:
+            # 多个worker同时发布时串行化，保证版本号递增
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            state = self.read() or {'version': 0, 'excel': None, 'results': None, 'changed': {}}
+            state.update(changes)
+            state['version'] += 1
+            state['pid'] = os.getpid()
+            # 记录每项数据最后一次变化时的版本，同一路径重新扫描/加载也能被其他worker识别
+            state['changed'].update({key: state['version'] for key in changes})
+            self._write_json(self.path, state)
+        self.applied_version = max(self.applied_version, state['version'])
+        logger.info(f"已发布共享数据状态 v{state['version']}: {', '.join(changes)}")
+
+    def _stamp(self):
+        try:
+            stat = self.path.stat()
+        except OSError:
+            return None
+        return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+
+    def sync(self):
+        """状态文件有变化时，在后台线程中加载新的数据
+
+        加载（重新解析或读取快照）期间请求继续使用旧的数据快照，不会阻塞，加载完成后整体切换。
+        """
+        if not self.enabled:
+            return
+        stamp = self._stamp()
+        if stamp is None or stamp == self.applied_stamp:
+            return
+
+        with self.sync_lock:
+            if self.syncing:
+                return
+            self.syncing = True
+        threading.Thread(target=self._sync, name='shared-state-sync', daemon=True).start()
+
+    def _sync(self):
+        try:
+            # 同步期间状态再次变化时继续同步，直到与状态文件一致
+            while True:
+                stamp = self._stamp()
+                if stamp is None or stamp == self.applied_stamp:
+                    break
+                state = self.read()
+                if state is not None and state['version'] > self.applied_version:
+                    self._apply(state)
+                    self.applied_version = max(self.applied_version, state['version'])
+                self.applied_stamp = stamp
+        except Exception as e:
+            logger.error(f"同步共享数据状态失败: {e}")
+        finally:
+            with self.sync_lock:
+                self.syncing = False
+
+    def _apply(self, state):
+        logger.info(f"同步共享数据状态 v{state['version']}（由进程 {state.get('pid')} 发布）")
+        changed = {key: version > self.applied_version for key, version in state.get('changed', {}).items()}
+        excel = state.get('excel')
+        results = state.get('results')
+
+        # 清空数据时两项同时置空
+        if changed.get('results') and results is None:
+            clear_loaded_data()
+
+        if changed.get('excel') and excel is not None:
+            excel_files = excel_scanner.scan(excel['dir'])[0] if Path(excel['dir']).exists() else []
+            rebuild_scenario_index(update_dataset(excel_dir_path=excel['dir'], excel_files=excel_files))
+
+        if changed.get('runs'):
+            run_registry.add_sources(state.get('runs') or {})
+
+        if changed.get('results') and results is not None:
+            run_id = results.get('run_id')
+            # 本进程已有该运行时直接切换，否则重新加载
+            if run_registry.get(run_id) is None or activate_run(run_id) is None:
+                load_evaluation_results(results['path'], mode=results['mode'], run_id=run_id)
+
+        # 跟踪模式：每个worker各自跟踪同一个文件
+        if changed.get('follow'):
+            follow = state.get('follow')
+            if follow is None:
+                stop_follow()
+            else:
+                start_follow(follow['path'], follow['mode'], follow['run_id'], follow['interval'])
+
+    def publish_job(self, progress):
+        """将后台加载任务的进度写入状态目录"""
+        if self.enabled:
+            self._write_json(self.state_dir / 'jobs' / f'{progress.job_id}.json', progress.to_dict())
+
+    def read_job(self, job_id):
+        if not self.enabled or not job_id.isalnum():
+            return None
+        try:
+            with open(self.state_dir / 'jobs' / f'{job_id}.json', 'r', encoding='utf-8') as f:
+                return json_lib.load(f)
+        except (OSError, ValueError):
+            return None
+
+
+shared_state = SharedState(SERVER_STATE_DIR)
+
+
+@app.before_request
+def sync_shared_state():
+    """多进程模式下处理请求前同步其他worker加载的数据"""
+    shared_state.sync()
+
+
+def _publish_job_progress(progress):
+    """任务运行期间定期写入进度，任务结束后写入最终状态"""
+    while progress.status in ('pending', 'running'):
+        shared_state.publish_job(progress)
+        time.sleep(JOB_PUBLISH_INTERVAL)
+    shared_state.publish_job(progress)
+
+
+def preload_data(excel_dir=None, results_path=None, mode=DEFAULT_LOAD_MODE, workers=DEFAULT_LOAD_WORKERS):
+    """fork之前加载Excel目录和结果文件，并等待scenario索引构建完成"""
+    state = {}
+    if excel_dir:
+        if Path(excel_dir).exists():
+            ds = update_dataset(excel_dir_path=excel_dir, excel_files=excel_scanner.scan(excel_dir)[0])
+            state['excel'] = {'dir': excel_dir}
+            logger.info(f"预加载Excel目录 {excel_dir}：{len(ds.excel_files)} 个文件")
+        else:
+            logger.warning(f"Excel目录不存在: {excel_dir}")
+    if results_path:
+        if load_evaluation_results(results_path, mode=mode, workers=workers):
+            state['results'] = {'path': results_path, 'mode': mode, 'run_id': dataset.run_id}
+            state['runs'] = dict(run_registry.sources)
+    rebuild_scenario_index(dataset)
+
+    # fork只复制当前线程，必须在fork前等后台线程结束，否则子进程拿不到索引且可能继承被占用的锁；
+    # SEARCH_INDEX=eager 时搜索索引也在后台构建，子进程会继承“正在构建”的标记而永远不再构建
+    for thread in threading.enumerate():
+        if thread.name in ('scenario-index', 'search-index'):
+            thread.join()
+    return state
+
+
+def serve_prefork(host, port, num_workers, excel_dir=None, results_path=None):
+    """预fork多进程服务：主进程加载数据并监听端口，子进程共享监听socket处理请求"""
+    import gc
+    import signal
+    import socket
+    from werkzeug.serving import make_server
+
+    shared_state.enable()
+    mode = DEFAULT_LOAD_MODE
+    session = read_session() if RESTORE_SESSION and not excel_dir and not results_path else None
+    if session:
+        # 未指定预加载数据时恢复上次的会话
+        excel_dir = session.get('excel_dir')
+        if session.get('results'):
+            results_path = session['results']['path']
+            mode = session['results']['mode']
+    state = preload_data(excel_dir, results_path, mode)
+    # 以预加载的数据作为初始状态，之前运行遗留的状态文件被覆盖
+    shared_state.publish(excel=state.get('excel'), results=state.get('results'), runs=state.get('runs', {}))
+
+    listen_socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    listen_socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    listen_socket.bind((host, port))
+    listen_socket.listen(128)
+    listen_socket.set_inheritable(True)
+
+    # 将已加载的对象移出GC跟踪，避免子进程的垃圾回收触碰这些对象导致内存页被复制
+    gc.collect()
+    gc.freeze()
+
+    def start_worker():
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            try:
+                server = make_server(host, port, app, threaded=True, fd=listen_socket.fileno())
+                server.serve_forever()
+            finally:
+                os._exit(0)
+        return pid
+
+    children = {start_worker() for _ in range(num_workers)}
+    print(f"🚀 多进程模式已启动: {num_workers} 个worker (端口{port}, 主进程 {os.getpid()})")
+
+    stopping = False
+
+    def stop(signum, frame):
+        nonlocal stopping
+        stopping = True
+        for child in list(children):
+            try:
+                os.kill(child, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        except InterruptedError:
+            continue
+        children.discard(pid)
+        if not stopping:
+            # worker异常退出时重新fork，新worker在第一个请求前会同步到最新的共享状态
+            logger.warning(f"worker {pid} 已退出（状态 {status}），重新启动")
+            time.sleep(WORKER_RESTART_DELAY)
+            children.add(start_worker())
+    listen_socket.close()
+
+
 if __name__ == '__main__':
     # 禁用dotenv以避免权限问题
     import os
@@ -709,6 +4434,25 @@ if __name__ == '__main__':
 
     # 支持环境变量指定端口
     port = int(os.environ.get('PORT', 5000))
+    # SERVER_WORKERS大于1时使用多进程模式，可通过EXCEL_DIR、RESULTS_PATH在启动时预加载数据
+    server_workers = int(os.environ.get('SERVER_WORKERS', 1))
+
+    if server_workers > 1 and hasattr(os, 'fork'):
+        try:
+            serve_prefork('0.0.0.0', port, server_workers,
+                          excel_dir=os.environ.get('EXCEL_DIR'),
+                          results_path=os.environ.get('RESULTS_PATH'))
+        except OSError as e:
+            print(f"❌ 端口绑定失败: {e}")
+            print("💡 请尝试使用其他端口：PORT=8000 python app.py")
+            exit(1)
+        exit(0)
+    elif server_workers > 1:
+        print("⚠️  当前系统不支持fork，使用单进程模式启动")
+
+    if RESTORE_SESSION:
+        # 后台恢复上次的Excel目录和结果文件，不影响服务启动
+        threading.Thread(target=restore_session, name='restore-session', daemon=True).start()
 
     print(f"🚀 启动Flask服务器 (端口{port})...")
 
@@ -1,5 +1,8 @@
 import axios from 'axios'
 
+// 跟踪模式的新数据通知（Server-Sent Events）
+let followSource = null
+
 export default {
   namespaced: true,
 
@@ -68,6 +71,8 @@ export default {
         const params = {
           page,
           size: 20,
+          // 列表只展示预览，完整内容在详情页单独获取
+          view: 'summary',
           ...filters
         }
 
@@ -135,6 +140,24 @@ export default {
       }
     },
 
+    subscribeFollow({ dispatch, state }) {
+      if (followSource || typeof EventSource === 'undefined') return
+      followSource = new EventSource(`${axios.defaults.baseURL}/follow/events`)
+      // 结果文件有新增记录时刷新筛选选项、统计和当前页，无需轮询
+      followSource.addEventListener('rows', () => {
+        dispatch('fetchFilterOptions')
+        dispatch('fetchStats')
+        dispatch('fetchResults', state.pagination.page)
+      })
+    },
+
+    unsubscribeFollow() {
+      if (followSource) {
+        followSource.close()
+        followSource = null
+      }
+    },
+
     async clearData({ commit }) {
       try {
         await axios.delete('/data')
@@ -0,0 +1,41 @@
+"""前端源码哈希：启动脚本用它判断 frontend/dist 是否按最新的前端源码构建
+
+    python frontend_hash.py           # 输出前端源码（src、public、package.json）的哈希
+    python frontend_hash.py --check   # dist/.source-hash 与源码一致时返回0，否则返回1
+    python frontend_hash.py --write   # 构建成功后写入 dist/.source-hash
+"""
+import hashlib
+import sys
+from pathlib import Path
+
+FRONTEND_DIR = Path(__file__).resolve().parent / 'frontend'
+SOURCE_HASH_FILE = FRONTEND_DIR / 'dist' / '.source-hash'
+
+
+def frontend_source_hash(root=FRONTEND_DIR):
+    """计算前端源码的哈希（统一换行符，Windows下检出的CRLF文件与提交的哈希一致）"""
+    paths = sorted(path for name in ('src', 'public') for path in (root / name).rglob('*') if path.is_file())
+    digest = hashlib.sha1()
+    for path in paths + [root / 'package.json']:
+        digest.update(path.relative_to(root).as_posix().encode('utf-8'))
+        digest.update(path.read_bytes().replace(b'\r\n', b'\n'))
+    return digest.hexdigest()
+
+
+def main(argv):
+    source_hash = frontend_source_hash()
+    if '--write' in argv:
+        SOURCE_HASH_FILE.write_text(source_hash + '\n', encoding='utf-8')
+    elif '--check' in argv:
+        try:
+            built_hash = SOURCE_HASH_FILE.read_text(encoding='utf-8').strip()
+        except OSError:
+            built_hash = None
+        return 0 if built_hash == source_hash else 1
+    else:
+        print(source_hash)
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main(sys.argv[1:]))
@@ -82,48 +82,80 @@ if %errorlevel% equ 0 (
 )
 echo ✅ 端口 %PORT% 可用
 
-REM 检查前端
+REM 检查前端：dist不存在时必须构建；源码在上次构建之后有变化（frontend_hash.py 比较源码与 dist\.source-hash）时重新构建，
+REM 无法构建时继续使用现有的dist
 echo.
 echo 🎨 检查前端构建...
-if exist "frontend\dist" (
-    echo ✅ 前端已构建
+set FRONTEND_BUILD=
+if not exist "frontend\dist" (
+    set FRONTEND_BUILD=required
+) else if /i "%REBUILD_FRONTEND%"=="true" (
+    set FRONTEND_BUILD=forced
 ) else (
-    echo ⚠️  前端未构建，检查Node.js...
-    where node >nul 2>&1
-    if %errorlevel% neq 0 (
-        echo ❌ 未找到Node.js，无法构建前端
-        echo 💡 请安装Node.js 16+，或使用已包含dist目录的版本
-        pause
-        exit /b 1
-    )
-    
-    echo ✅ 检测到Node.js
-    if not exist "frontend\node_modules" (
-        echo 📦 安装前端依赖...
-        cd frontend
-        call npm install --no-fund --no-audit
-        if !errorlevel! neq 0 (
-            echo ❌ 前端依赖安装失败
-            cd ..
-            pause
-            exit /b 1
-        )
-        cd ..
-    )
-    
-    echo 🔨 构建前端应用...
-    cd frontend
-    call npm run build
-    if !errorlevel! neq 0 (
-        echo ❌ 前端构建失败
+    %PYTHON_CMD% frontend_hash.py --check >nul 2>&1
+    if !errorlevel! neq 0 set FRONTEND_BUILD=stale
+)
+if "%FRONTEND_BUILD%"=="" (
+    echo ✅ 前端已构建
+    goto start_server
+)
+if "%FRONTEND_BUILD%"=="stale" echo ⚠️  前端源码已更新，检查Node.js...
+if "%FRONTEND_BUILD%"=="forced" echo 🔨 强制重新构建前端，检查Node.js...
+if "%FRONTEND_BUILD%"=="required" echo ⚠️  前端未构建，检查Node.js...
+
+where node >nul 2>&1
+if %errorlevel% neq 0 (
+    echo ❌ 未找到Node.js，无法构建前端
+    goto frontend_build_failed
+)
+for /f "tokens=1 delims=v." %%i in ('node --version') do set NODE_MAJOR=%%i
+if %NODE_MAJOR% lss 16 (
+    echo ❌ Node.js版本过低，需要Node.js 16+，当前版本: %NODE_MAJOR%
+    goto frontend_build_failed
+)
+echo ✅ 检测到Node.js
+
+cd frontend
+REM npm安装完成后才写入 node_modules\.package-lock.json，没有该文件说明上次没有装完
+if not exist "node_modules\.package-lock.json" (
+    echo 📦 安装前端依赖...
+    call npm install --no-fund --no-audit
+    if not exist "node_modules\.package-lock.json" (
+        echo ❌ 前端依赖安装失败
+        if exist node_modules rmdir /s /q node_modules
         cd ..
-        pause
-        exit /b 1
+        goto frontend_build_failed
     )
+)
+
+REM 先构建到 dist.build，成功后再替换 dist，构建失败时原有的dist保持不变
+echo 🔨 构建前端应用...
+if exist dist.build rmdir /s /q dist.build
+call npm run build -- --dest dist.build
+if %errorlevel% neq 0 (
+    echo ❌ 前端构建失败
+    if exist dist.build rmdir /s /q dist.build
     cd ..
-    echo ✅ 前端构建成功
+    goto frontend_build_failed
 )
+if exist dist rmdir /s /q dist
+move dist.build dist >nul
+cd ..
+%PYTHON_CMD% frontend_hash.py --write
+echo ✅ 前端构建成功
+goto start_server
+
+:frontend_build_failed
+if "%FRONTEND_BUILD%"=="stale" (
+    echo ⚠️  前端未能重新构建，继续使用现有的dist（新版前端的功能不可用）
+    echo 💡 可稍后手动构建: cd frontend ^&^& npm install ^&^& npm run build ^&^& cd .. ^&^& %PYTHON_CMD% frontend_hash.py --write
+    goto start_server
+)
+echo 💡 请安装Node.js 16+后构建: cd frontend ^&^& npm install ^&^& npm run build ^&^& cd .. ^&^& %PYTHON_CMD% frontend_hash.py --write
+pause
+exit /b 1
 
+:start_server
 REM 启动服务
 echo.
 echo 🌐 启动Flask服务 (端口 %PORT%)...
@@ -99,59 +99,83 @@ if ($portInUse) {
 }
 Print-Success "端口 $PORT 可用"
 
-# 检查前端
+# 检查前端：dist不存在或强制重建时必须构建；源码在上次构建之后有变化（frontend_hash.py 比较源码与 dist\.source-hash）时
+# 重新构建，无法构建时继续使用现有的dist
 Print-Info "检查前端构建..."
-if (Test-Path "frontend\dist") {
-    if ($REBUILD_FRONTEND) {
-        Print-Info "强制重新构建前端..."
-        Remove-Item -Recurse -Force "frontend\dist"
+$frontendBuild = $null
+if (-not (Test-Path "frontend\dist")) {
+    $frontendBuild = "required"
+} elseif ($REBUILD_FRONTEND) {
+    Print-Info "强制重新构建前端..."
+    $frontendBuild = "forced"
+} else {
+    & $pythonCmd frontend_hash.py --check
+    if ($LASTEXITCODE -ne 0) {
+        Print-Info "前端源码已更新，需要重新构建..."
+        $frontendBuild = "stale"
     } else {
         Print-Success "前端已构建"
     }
 }
 
-if (-not (Test-Path "frontend\dist") -or $REBUILD_FRONTEND) {
-    Print-Info "需要构建前端，检查Node.js环境..."
-    
+# 安装依赖并构建前端，失败时返回原因：先构建到 dist.build，成功后再替换 dist，构建失败时原有的dist保持不变
+function Build-Frontend {
     if (-not (Get-Command node -ErrorAction SilentlyContinue)) {
-        Print-Error "未找到Node.js，无法构建前端"
-        Print-Info "请安装Node.js 16+，或使用已包含dist目录的版本"
-        exit 1
+        return "未找到Node.js"
     }
-    
     $nodeVersion = node --version
+    if ([int]($nodeVersion.TrimStart("v").Split(".")[0]) -lt 16) {
+        return "Node.js版本过低，需要Node.js 16+，当前版本: $nodeVersion"
+    }
     Print-Success "Node.js版本: $nodeVersion"
-    
+
     if (-not (Get-Command npm -ErrorAction SilentlyContinue)) {
-        Print-Error "未找到npm，请确保npm已安装"
-        exit 1
+        return "未找到npm"
     }
-    
     Print-Success "npm版本: $(npm --version)"
-    
-    if (-not (Test-Path "frontend\node_modules")) {
-        Print-Info "安装前端依赖..."
-        Set-Location frontend
-        npm install --no-fund --no-audit
+
+    Set-Location frontend
+    try {
+        # npm安装完成后才写入 node_modules\.package-lock.json，没有该文件说明上次没有装完
+        if (-not (Test-Path "node_modules\.package-lock.json")) {
+            Print-Info "安装前端依赖..."
+            npm install --no-fund --no-audit | Out-Host
+            if (-not (Test-Path "node_modules\.package-lock.json")) {
+                if (Test-Path "node_modules") { Remove-Item -Recurse -Force "node_modules" }
+                return "前端依赖安装失败"
+            }
+            Print-Success "前端依赖安装完成"
+        }
+
+        Print-Info "构建前端应用（这可能需要几分钟）..."
+        if (Test-Path "dist.build") { Remove-Item -Recurse -Force "dist.build" }
+        npm run build -- --dest dist.build | Out-Host
         if ($LASTEXITCODE -ne 0) {
-            Print-Error "前端依赖安装失败"
-            Set-Location ..
-            exit 1
+            if (Test-Path "dist.build") { Remove-Item -Recurse -Force "dist.build" }
+            return "前端构建失败"
         }
+        if (Test-Path "dist") { Remove-Item -Recurse -Force "dist" }
+        Move-Item "dist.build" "dist"
+    } finally {
         Set-Location ..
-        Print-Success "前端依赖安装完成"
     }
-    
-    Print-Info "构建前端应用（这可能需要几分钟）..."
-    Set-Location frontend
-    npm run build
-    if ($LASTEXITCODE -ne 0) {
-        Print-Error "前端构建失败"
-        Set-Location ..
+    & $pythonCmd frontend_hash.py --write
+    return $null
+}
+
+if ($frontendBuild) {
+    $failure = Build-Frontend
+    if (-not $failure) {
+        Print-Success "前端构建成功"
+    } elseif ($frontendBuild -eq "stale") {
+        # 只是源码有更新时不影响启动（如未安装Node.js或离线无法安装依赖）
+        Print-Warning "前端未能重新构建（$failure），继续使用现有的dist（新版前端的功能不可用）"
+        Print-Info "可稍后手动构建: cd frontend; npm install; npm run build; cd ..; $pythonCmd frontend_hash.py --write"
+    } else {
+        Print-Error $failure
+        Print-Info "请安装Node.js 16+后构建: cd frontend; npm install; npm run build; cd ..; $pythonCmd frontend_hash.py --write"
         exit 1
     }
-    Set-Location ..
-    Print-Success "前端构建成功"
 }
 
 # 启动服务
@@ -44,6 +44,8 @@ show_help() {
     echo "  PORT=8000 ./start.sh          # 使用指定端口启动"
     echo "  REBUILD_FRONTEND=true ./start.sh  # 强制重新构建前端"
     echo "  PORT=8000 REBUILD_FRONTEND=true ./start.sh  # 组合使用"
+    echo "  SERVER_WORKERS=4 ./start.sh   # 多进程模式启动（4个worker）"
+    echo "  SERVER_WORKERS=4 EXCEL_DIR=/data/excel RESULTS_PATH=/data/results.jsonl ./start.sh  # 多进程模式并预加载数据"
     echo ""
     echo "环境选择："
     echo "  - 交互模式：会询问使用哪种Python环境（推荐新手）"
@@ -378,9 +380,32 @@ else
     print_warning "建议使用虚拟环境（conda/venv）来管理依赖"
 fi
 
-# 检查前端构建产物
+# 检查前端构建产物：dist不存在、强制重建，或源码在上次构建之后有变化（frontend_hash.py 比较源码与 dist/.source-hash）时需要构建
+FRONTEND_STALE=false
+if [ -d "$FRONTEND_DIR/dist" ] && [ "$REBUILD_FRONTEND" != "true" ] && \
+   ! $PYTHON_CMD "$SCRIPT_DIR/frontend_hash.py" --check; then
+    FRONTEND_STALE=true
+fi
+
 NEED_NODE=false
-if [ ! -d "$FRONTEND_DIR/dist" ] || [ "$REBUILD_FRONTEND" = "true" ]; then
+if [ "$FRONTEND_STALE" = "true" ]; then
+    # 已有dist时只是源码有更新，无法构建不影响启动，继续使用现有的dist（新版前端的功能不可用）
+    STALE_REASON=""
+    if ! command -v node &> /dev/null; then
+        STALE_REASON="未找到Node.js"
+    elif [ "$(node --version | sed 's/v//' | cut -d. -f1)" -lt 16 ]; then
+        STALE_REASON="Node.js版本过低（需要16+，当前版本: $(node --version)）"
+    elif ! command -v npm &> /dev/null; then
+        STALE_REASON="未找到npm"
+    fi
+    if [ -n "$STALE_REASON" ]; then
+        print_warning "前端源码已更新，但dist尚未重新构建，且$STALE_REASON"
+        print_info "继续使用现有的dist；安装Node.js 16+后再次启动会自动重新构建"
+        FRONTEND_STALE=false
+    fi
+fi
+
+if [ ! -d "$FRONTEND_DIR/dist" ] || [ "$REBUILD_FRONTEND" = "true" ] || [ "$FRONTEND_STALE" = "true" ]; then
     NEED_NODE=true
     print_info "需要构建前端，检查Node.js环境..."
     
@@ -490,10 +515,37 @@ print_success "端口 $PORT 可用"
 print_info "检查前端构建..."
 cd "$FRONTEND_DIR"
 
-if [ ! -d "dist" ] || [ "$REBUILD_FRONTEND" = "true" ]; then
+# 安装依赖并构建前端：先构建到 dist.build，成功后再替换 dist，构建失败时原有的dist保持不变
+build_frontend() {
+    # npm安装完成后才写入 node_modules/.package-lock.json，没有该文件说明上次没有装完
+    if [ ! -f "node_modules/.package-lock.json" ]; then
+        print_info "安装前端依赖..."
+        if ! npm install --no-fund --no-audit || [ ! -f "node_modules/.package-lock.json" ]; then
+            print_error "前端依赖安装失败"
+            # 删除安装了一半的依赖，下次启动时重新安装
+            rm -rf node_modules
+            return 1
+        fi
+        print_success "前端依赖安装完成"
+    fi
+
+    print_info "构建前端应用（这可能需要几分钟）..."
+    rm -rf dist.build
+    if ! npm run build -- --dest dist.build; then
+        print_error "前端构建失败"
+        rm -rf dist.build
+        return 1
+    fi
+    rm -rf dist
+    mv dist.build dist
+    $PYTHON_CMD "$SCRIPT_DIR/frontend_hash.py" --write
+}
+
+if [ ! -d "dist" ] || [ "$REBUILD_FRONTEND" = "true" ] || [ "$FRONTEND_STALE" = "true" ]; then
     if [ "$REBUILD_FRONTEND" = "true" ] && [ -d "dist" ]; then
         print_info "强制重新构建前端..."
-        rm -rf dist
+    elif [ "$FRONTEND_STALE" = "true" ]; then
+        print_info "前端源码已更新，正在重新构建..."
     else
         print_info "前端未构建，正在构建..."
     fi
@@ -507,22 +559,16 @@ if [ ! -d "dist" ] || [ "$REBUILD_FRONTEND" = "true" ]; then
         fi
     fi
 
-    if [ ! -d "node_modules" ]; then
-        print_info "安装前端依赖..."
-        npm install --no-fund --no-audit
-        print_success "前端依赖安装完成"
-    fi
-
-    print_info "构建前端应用（这可能需要几分钟）..."
-    npm run build
-
-    if [ $? -ne 0 ]; then
-        print_error "前端构建失败"
-        print_info "请手动构建：cd frontend && npm run build"
+    if build_frontend; then
+        print_success "前端构建成功"
+    elif [ "$FRONTEND_STALE" = "true" ]; then
+        # 只是源码有更新时不影响启动（如离线无法安装依赖）
+        print_warning "前端重新构建失败，继续使用现有的dist（新版前端的功能不可用）"
+        print_info "可稍后手动构建：cd frontend && npm install && npm run build && cd .. && $PYTHON_CMD frontend_hash.py --write"
+    else
+        print_info "请手动构建：cd frontend && npm install && npm run build && cd .. && $PYTHON_CMD frontend_hash.py --write"
         exit 1
     fi
-
-    print_success "前端构建成功"
 else
     print_success "前端已构建（跳过构建步骤）"
     print_info "如需重新构建，请运行: REBUILD_FRONTEND=true ./start.sh"
@@ -533,6 +579,13 @@ cd "$SCRIPT_DIR"
 # 启动Flask服务
 print_info "启动Flask服务 (端口 $PORT)..."
 export PORT=$PORT
+SERVER_WORKERS=${SERVER_WORKERS:-1}
+export SERVER_WORKERS
+if [ "$SERVER_WORKERS" -gt 1 ]; then
+    print_info "多进程模式: $SERVER_WORKERS 个worker"
+    [ -n "$EXCEL_DIR" ] && print_info "预加载Excel目录: $EXCEL_DIR"
+    [ -n "$RESULTS_PATH" ] && print_info "预加载结果文件: $RESULTS_PATH"
+fi
 $PYTHON_CMD app.py &
 BACKEND_PID=$!
 
@@ -0,0 +1,100 @@
+import json
+
+import pytest
+
+import app
+
+CATEGORIES = ['水泵', '风机', '冷塔']
+
+
+def _base_row(i):
+    reference = 'a' if i % 2 else 'b'
+    predicted = reference if i % 3 else ('b' if reference == 'a' else 'a')
+    return {'alarm_id': f'x{i}', 'category': CATEGORIES[i % 3], 'reference_label': reference,
+            'predicted_label': predicted}
+
+
+def _target_row(i):
+    reference = 'a' if i % 2 else 'b'
+    predicted = None if i == 6 else (reference if i % 4 else 'c')
+    return {'alarm_id': f'x{i}', 'category': CATEGORIES[i % 3], 'reference_label': reference,
+            'predicted_label': predicted}
+
+
+# 基准运行 x0..x11；目标运行倒序的 x2..x13，并以只在目标中出现的行开头，使两个运行的标签编码顺序不同
+BASE = [_base_row(i) for i in range(12)]
+TARGET = ([{'alarm_id': 'y0', 'category': '冷塔', 'reference_label': 'b', 'predicted_label': 'c'}] +
+          [_target_row(i) for i in reversed(range(2, 14))])
+
+
+def _correct(row):
+    return row['predicted_label'] is not None and row['predicted_label'] == row['reference_label']
+
+
+def _write(path, rows):
+    with open(path, 'w', encoding='utf-8') as f:
+        for row in rows:
+            f.write(json.dumps({'alarm_id': row['alarm_id'], 'input': row['alarm_id'],
+                                'predicted_label': row['predicted_label'], 'reference_label': row['reference_label'],
+                                'correct': _correct(row), 'meta': {'category': row['category'], 'scenario_id': 's'}},
+                               ensure_ascii=False) + '\n')
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'RESULTS_SNAPSHOT_DIR', '')
+    client = app.app.test_client()
+    for run_id, rows in (('base', BASE), ('target', TARGET)):
+        path = tmp_path / f'{run_id}.jsonl'
+        _write(path, rows)
+        assert client.post('/api/load/results', json={'results_path': str(path), 'run_id': run_id}).status_code == 200
+    yield client
+    app.clear_loaded_data()
+
+
+def test_runs_have_different_label_codes(client):
+    assert app.get_run('base').columns.labels != app.get_run('target').columns.labels
+
+
+def test_compare_joins_on_alarm_id(client):
+    data = client.get('/api/runs/compare', query_string={'base': 'base', 'target': 'target'}).get_json()
+
+    targets = {row['alarm_id']: row for row in TARGET}
+    pairs = [(row, targets[row['alarm_id']]) for row in BASE if row['alarm_id'] in targets]
+    regressions = [base for base, target in pairs if _correct(base) and not _correct(target)]
+    fixes = [base for base, target in pairs if not _correct(base) and _correct(target)]
+    assert regressions and fixes
+
+    summary = data['summary']
+    assert summary['matched'] == len(pairs) == 10
+    assert summary['only_in_base'] == 2
+    assert summary['only_in_target'] == 3
+    assert summary['regressions'] == len(regressions)
+    assert summary['fixes'] == len(fixes)
+    assert summary['label_changes'] == sum(base['predicted_label'] != target['predicted_label']
+                                           for base, target in pairs)
+    assert summary['base_accuracy'] == round(sum(_correct(base) for base, _ in pairs) / len(pairs), 4)
+    assert summary['target_accuracy'] == round(sum(_correct(target) for _, target in pairs) / len(pairs), 4)
+
+    # 明细按基准运行的顺序，目标运行的预测标签按目标运行自己的编码解码
+    assert [(row['alarm_id'], row['base_predicted_label'], row['target_predicted_label'])
+            for row in data['regressions']] == [
+        (base['alarm_id'], base['predicted_label'], targets[base['alarm_id']]['predicted_label'])
+        for base in regressions]
+    assert [row['alarm_id'] for row in data['fixes']] == [base['alarm_id'] for base in fixes]
+
+    by_category = {item['category']: item for item in data['by_category']}
+    for category in CATEGORIES:
+        rows = [(base, target) for base, target in pairs if base['category'] == category]
+        item = by_category[category]
+        assert item['matched'] == len(rows)
+        assert item['regressions'] == sum(_correct(base) and not _correct(target) for base, target in rows)
+        assert item['fixes'] == sum(not _correct(base) and _correct(target) for base, target in rows)
+
+
+def test_compare_limits_rows_and_validates(client):
+    data = client.get('/api/runs/compare', query_string={'base': 'base', 'target': 'target', 'limit': 1}).get_json()
+    assert len(data['regressions']) == 1
+    assert data['summary']['regressions'] > 1
+    assert client.get('/api/runs/compare', query_string={'base': 'base'}).status_code == 400
+    assert client.get('/api/runs/compare', query_string={'base': 'base', 'target': 'nope'}).status_code == 404
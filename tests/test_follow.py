@@ -0,0 +1,74 @@
+import json
+import pickle
+
+import numpy as np
+import pytest
+
+import app
+
+
+def _line(i):
+    record = {'alarm_id': f'id-{i % 40}', 'input': f'告警内容：设备{i}', 'model_output': 'x' * (i % 90),
+              'predicted_label': ['开机', '关机', None][i % 3], 'reference_label': '开机', 'correct': i % 2 == 0,
+              'meta': {'category': ['水泵', '风机'][i % 2], 'scenario_id': f's{i % 7}'}}
+    return json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _records(results):
+    return [results[p] for p in range(len(results))]
+
+
+@pytest.mark.parametrize('mode', app.LOAD_MODES)
+def test_follow_matches_full_load(tmp_path, monkeypatch, mode):
+    # 读取块比一行还短，覆盖跨块拼接未完成行的情况
+    monkeypatch.setattr(app, 'FOLLOW_READ_BYTES', 37)
+    path = tmp_path / 'results.jsonl'
+    path.write_text('', encoding='utf-8')
+    follower = app.ResultsFollower(str(path), mode)
+    snapshots = []
+    monkeypatch.setattr(follower, '_publish', lambda loaded, appended, first: snapshots.append(loaded))
+
+    follower.poll()
+    lines = [_line(i) for i in range(120)] + ['{bad json\n', '\n'] + [_line(i) for i in range(120, 200)]
+    text = ''.join(lines)
+    # 每次追加的内容在行中间截断，最后一行写完后才被解析
+    written = 0
+    for cut in (0, 1000, 5333, 9000, len(text) - 5, len(text)):
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(text[written:cut])
+        written = cut
+        follower.poll()
+        assert follower.offset == len(text[:cut].encode('utf-8')) - len(text[:cut].split('\n')[-1].encode('utf-8'))
+
+    first = snapshots[1]
+    first_count = len(first['results'])
+    first_records = _records(first['results'])
+    expected = app.parse_results_file(str(path), mode=mode)
+    last = snapshots[-1]
+    assert _records(last['results']) == _records(expected['results'])
+    assert list(last['summaries']) == list(expected['summaries'])
+    assert list(last['duplicate_alarm_ids']) == list(expected['duplicate_alarm_ids'])
+    assert np.array_equal(last['result_columns'].category_codes, expected['result_columns'].category_codes)
+    assert np.array_equal(last['metrics'].confusion, expected['metrics'].confusion)
+
+    # 之后的追加不影响已发布的快照
+    assert len(first['results']) == first_count == len(first['result_columns'])
+    assert _records(first['results']) == first_records
+
+    # 前缀视图按普通列表保存
+    restored = pickle.loads(pickle.dumps(last['duplicate_alarm_ids']))
+    assert type(restored) is list and restored == list(expected['duplicate_alarm_ids'])
+
+
+def test_append_only_array_views_are_stable():
+    values = app.AppendOnlyArray(np.int64)
+    views = []
+    for i in range(100):
+        values.append(i)
+        if i % 7 == 0:
+            views.append(values.view())
+        if i % 13 == 0:
+            values.extend(np.arange(3))
+    for view in views:
+        assert np.array_equal(view, values.view()[:len(view)])
+    assert len(values.view(trim=True)) == len(values)
@@ -0,0 +1,68 @@
+import json
+
+import pytest
+
+import app
+
+
+def _write(path, start, count, prefix='id'):
+    with open(path, 'a', encoding='utf-8') as f:
+        for i in range(start, start + count):
+            f.write(json.dumps({'alarm_id': f'{prefix}{i}', 'input': f'告警{i}', 'predicted_label': 'a',
+                                'correct': True, 'meta': {'category': '水泵'}}, ensure_ascii=False) + '\n')
+
+
+@pytest.fixture()
+def results_path(tmp_path):
+    path = tmp_path / 'results.jsonl'
+    _write(path, 0, 3000)
+    return path
+
+
+def test_truncated_file_raises_instead_of_crashing(results_path):
+    loaded = app.parse_results_file(str(results_path), mode=app.LOAD_MODE_MMAP)
+    results = loaded['results']
+    assert results[2999]['alarm_id'] == 'id2999'
+
+    # 重新运行的评测任务截断并重写结果文件
+    with open(results_path, 'r+', encoding='utf-8') as f:
+        first_line = f.readline()
+        f.seek(len(first_line.encode('utf-8')))
+        f.truncate()
+    with pytest.raises(RuntimeError):
+        results[2999]
+    with pytest.raises(RuntimeError):
+        results[0]
+    with pytest.raises(RuntimeError):
+        list(results.records(range(len(results))))
+
+
+def test_rewritten_file_is_detected(results_path):
+    results = app.parse_results_file(str(results_path), mode=app.LOAD_MODE_MMAP)['results']
+    size = results_path.stat().st_size
+    results_path.write_text('', encoding='utf-8')
+    _write(results_path, 0, 3100, prefix='other')
+    assert results_path.stat().st_size > size
+    with pytest.raises(RuntimeError):
+        results[5]
+
+
+def test_appended_file_still_readable(results_path):
+    results = app.parse_results_file(str(results_path), mode=app.LOAD_MODE_MMAP)['results']
+    _write(results_path, 3000, 10)
+    assert results[2999]['alarm_id'] == 'id2999'
+    assert len(results) == 3000
+
+
+def test_detail_endpoint_returns_error_after_truncation(results_path, monkeypatch):
+    monkeypatch.setattr(app, 'RESULTS_SNAPSHOT_DIR', '')
+    client = app.app.test_client()
+    response = client.post('/api/load/results', json={'results_path': str(results_path), 'mode': 'mmap'})
+    assert response.status_code == 200
+    assert client.get('/api/results/id2999').get_json()['alarm_id'] == 'id2999'
+
+    results_path.write_text('{"alarm_id": "id0"}\n', encoding='utf-8')
+    response = client.get('/api/results/id2999')
+    assert response.status_code == 500
+    assert '截断或改写' in response.get_json()['error']
+    app.clear_loaded_data()
@@ -0,0 +1,97 @@
+import numpy as np
+import pytest
+
+import app
+
+
+def _row(predicted, reference, correct, category, scenario):
+    result = {'predicted_label': predicted, 'correct': correct,
+              'meta': {'category': category, 'scenario_id': scenario}}
+    if reference is not None:
+        result['reference_label'] = reference
+    return result
+
+
+ROWS = [
+    _row('A', 'A', True, 'X', 's1'),
+    _row('B', 'A', False, 'X', 's1'),
+    _row('B', 'B', True, 'Y', 's2'),
+    _row('A', 'B', False, 'Y', 's1'),
+    _row(None, 'A', False, 'X', 's2'),  # 解析失败，计入A行的最后一列
+    _row('B', None, True, 'Y', 's2'),  # 没有参考标签但预测正确，参考标签按B计
+    _row('A', None, False, 'X', 's1'),  # 参考标签未知，不计入混淆矩阵
+    _row(None, None, False, 'Y', 's1'),  # 解析失败且参考标签未知，不计入混淆矩阵
+]
+
+
+def _columns(rows):
+    columns = app.ResultColumns()
+    for row in rows:
+        columns.add(row)
+    return columns.finalize()
+
+
+def test_confusion_matrix_by_hand():
+    engine = app.MetricsEngine.from_columns(_columns(ROWS))
+    assert engine.confusion_matrix() == {
+        'reference_labels': ['A', 'B'],
+        'predicted_labels': ['A', 'B', 'parse_failed'],
+        'matrix': [[1, 1, 1],
+                   [1, 2, 0]]
+    }
+
+
+def test_overall_metrics_by_hand():
+    overall = app.MetricsEngine.from_columns(_columns(ROWS)).overall()
+    assert overall['total'] == 6
+    assert overall['parse_failures'] == 1
+    assert overall['accuracy'] == 0.5
+    # micro: TP=3，预测为某个标签的5行，有参考标签的6行
+    assert overall['micro'] == {'precision': 0.6, 'recall': 0.5, 'f1_score': 0.545}
+    assert overall['per_label'] == {
+        'A': {'precision': 0.5, 'recall': 0.333, 'f1_score': 0.4, 'support': 3, 'predicted': 2},
+        'B': {'precision': 0.667, 'recall': 0.667, 'f1_score': 0.667, 'support': 3, 'predicted': 3},
+    }
+    # macro 用未取整的各标签指标平均
+    assert overall['macro'] == {'precision': 0.583, 'recall': 0.5, 'f1_score': 0.533}
+
+
+def test_breakdowns_by_hand():
+    engine = app.MetricsEngine.from_columns(_columns(ROWS))
+    by_category = engine.breakdown('category')
+    assert set(by_category) == {'X', 'Y'}
+    # X: A行 [1, 1, 1]，B的支持为0但被预测过一次，按0计入宏平均
+    assert by_category['X'] == {
+        'total': 3, 'parse_failures': 1, 'accuracy': 0.333,
+        'micro': {'precision': 0.5, 'recall': 0.333, 'f1_score': 0.4},
+        'macro': {'precision': 0.5, 'recall': 0.167, 'f1_score': 0.25}
+    }
+    # Y: B行 [1, 2, 0]
+    assert by_category['Y']['total'] == 3
+    assert by_category['Y']['accuracy'] == 0.667
+    assert by_category['Y']['parse_failures'] == 0
+
+    by_scenario = engine.breakdown('scenario')
+    assert {name: (summary['total'], summary['accuracy'], summary['parse_failures'])
+            for name, summary in by_scenario.items()} == {'s1': (3, 0.333, 0), 's2': (3, 0.667, 1)}
+
+
+def test_status_counts_by_hand():
+    assert _columns(ROWS).counts() == {'total': 8, 'correct': 3, 'incorrect': 3, 'parse_failed': 2}
+
+
+@pytest.mark.parametrize('batches', [2, 3, len(ROWS)])
+def test_appends_match_full_load(batches):
+    full = _columns(ROWS)
+    columns = app.ResultColumns()
+    engine = app.MetricsEngine()
+    size = -(-len(ROWS) // batches)
+    for start in range(0, len(ROWS), size):
+        for row in ROWS[start:start + size]:
+            columns.add(row)
+        columns.finalize()
+        engine.add_rows(columns, start, len(columns))
+    assert columns.counts() == full.counts()
+    np.testing.assert_array_equal(engine.confusion, app.MetricsEngine.from_columns(full).confusion)
+    assert engine.overall() == app.MetricsEngine.from_columns(full).overall()
+    assert engine.breakdown('category') == app.MetricsEngine.from_columns(full).breakdown('category')
@@ -0,0 +1,86 @@
+import json
+import logging
+import random
+
+import numpy as np
+import pytest
+
+import app
+
+COLUMN_ARRAYS = ('category_codes', 'scenario_codes', 'predicted_codes', 'reference_codes',
+                 'correct', 'incorrect', 'parse_failed')
+
+
+@pytest.fixture()
+def results_file(tmp_path):
+    rng = random.Random(11)
+    path = tmp_path / 'results.jsonl'
+    labels = ['开机', '关机', '无需操作', None]
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(900):
+            kind = rng.random()
+            if kind < 0.02:
+                f.write('{bad json\n')
+                continue
+            if kind < 0.04:
+                f.write('\n')
+                continue
+            predicted = rng.choice(labels)
+            record = {
+                'input': f'告警内容：设备{i} 温度过高',
+                'expected_output': 'ok',
+                'model_output': f'输出 {i}',
+                'predicted_label': predicted,
+                'reference_label': rng.choice(labels),
+                'correct': rng.random() < 0.5,
+                'meta': {'category': rng.choice(['水泵', '风机', '冷塔']), 'scenario_id': f's{rng.randint(1, 30)}'}
+            }
+            if kind < 0.1:
+                record['alarm_id'] = f'A{rng.randint(0, 20)}'  # 重复的alarm_id
+            elif kind > 0.2:
+                record['alarm_id'] = f'id-{i}'
+            # 其余的记录没有alarm_id，由加载时生成
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
+
+
+def _load(path, mode, workers, caplog):
+    caplog.clear()
+    with caplog.at_level(logging.WARNING, logger='app'):
+        loaded = app.parse_results_file(str(path), mode=mode, workers=workers)
+    return loaded, [record.getMessage() for record in caplog.records]
+
+
+@pytest.mark.parametrize('mode', app.LOAD_MODES)
+@pytest.mark.parametrize('workers', [2, 3])
+def test_parallel_load_matches_serial(results_file, monkeypatch, caplog, mode, workers):
+    monkeypatch.setattr(app, 'PARALLEL_LOAD_MIN_BYTES', 0)
+    serial, serial_warnings = _load(results_file, mode, 1, caplog)
+    parallel, parallel_warnings = _load(results_file, mode, workers, caplog)
+
+    # 警告中包含行号：解析失败和重复alarm_id的行号、顺序都一致
+    assert any('解析第' in message for message in serial_warnings)
+    assert any('alarm_id重复' in message for message in serial_warnings)
+    assert parallel_warnings == serial_warnings
+
+    assert len(parallel['results']) == len(serial['results'])
+    assert [parallel['results'][p] for p in range(len(parallel['results']))] == \
+           [serial['results'][p] for p in range(len(serial['results']))]
+    assert parallel['alarm_index'] == serial['alarm_index']
+    assert parallel['duplicate_alarm_ids'] == serial['duplicate_alarm_ids']
+    assert parallel['summaries'] == serial['summaries']
+    assert parallel['categories'] == serial['categories']
+    assert parallel['scenarios'] == serial['scenarios']
+
+    # 分块按顺序合并，编码与串行加载时相同
+    serial_columns, parallel_columns = serial['result_columns'], parallel['result_columns']
+    assert parallel_columns.categories == serial_columns.categories
+    assert parallel_columns.scenarios == serial_columns.scenarios
+    assert parallel_columns.labels == serial_columns.labels
+    for name in COLUMN_ARRAYS:
+        assert np.array_equal(getattr(parallel_columns, name), getattr(serial_columns, name)), name
+    assert np.array_equal(parallel['metrics'].by_category, serial['metrics'].by_category)
+
+    if mode == app.LOAD_MODE_MMAP:
+        for p in range(len(serial['results'])):
+            assert parallel['results'].alarm_id(p) == serial['results'].alarm_id(p)
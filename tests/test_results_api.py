@@ -0,0 +1,95 @@
+import json
+from collections import Counter
+
+import pytest
+
+import app
+
+
+def _write_results(path, count, prefix='id'):
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(count):
+            f.write(json.dumps({'alarm_id': f'{prefix}{i}', 'input': f'告警{i}',
+                                'predicted_label': 'a' if i % 5 else None,
+                                'reference_label': 'a' if i % 3 else 'b', 'correct': bool(i % 3 and i % 5),
+                                'meta': {'category': ['水泵', '风机'][i % 2], 'scenario_id': f's{i % 4}'}},
+                               ensure_ascii=False) + '\n')
+
+
+@pytest.fixture()
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'RESULTS_SNAPSHOT_DIR', '')
+    path = tmp_path / 'results.jsonl'
+    _write_results(path, 53)
+    client = app.app.test_client()
+    assert client.post('/api/load/results', json={'results_path': str(path)}).status_code == 200
+    yield client
+    app.clear_loaded_data()
+
+
+def _cursor_pages(client, **params):
+    ids = []
+    cursor = ''
+    while cursor is not None:
+        data = client.get('/api/results', query_string=dict(params, cursor=cursor, size=10)).get_json()
+        ids.extend(record['alarm_id'] for record in data['results'])
+        cursor = data['pagination']['next_cursor']
+    return ids
+
+
+@pytest.mark.parametrize('params', [{}, {'category': '水泵'}, {'correctness': 'incorrect', 'search': '告警1'}])
+def test_cursor_pages_match_page_pagination(client, params):
+    expected = [record['alarm_id'] for record in
+                client.get('/api/results', query_string=dict(params, size=1000)).get_json()['results']]
+    assert _cursor_pages(client, **params) == expected
+
+
+@pytest.mark.parametrize('cursor', ['abc', '12', '1:x', ':'])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get('/api/results', query_string={'cursor': cursor})
+    assert response.status_code == 400
+
+
+def test_cursor_from_previous_dataset_is_rejected(client, tmp_path):
+    next_cursor = client.get('/api/results', query_string={'cursor': '', 'size': 10}).get_json()['pagination'][
+        'next_cursor']
+    assert client.get('/api/results', query_string={'cursor': next_cursor, 'size': 10}).status_code == 200
+
+    other = tmp_path / 'other.jsonl'
+    _write_results(other, 30, prefix='other')
+    assert client.post('/api/load/results', json={'results_path': str(other)}).status_code == 200
+    response = client.get('/api/results', query_string={'cursor': next_cursor, 'size': 10})
+    assert response.status_code == 409
+
+
+def _total(client, **params):
+    return client.get('/api/results', query_string=dict(params, size=1)).get_json()['pagination']['total']
+
+
+@pytest.mark.parametrize('search', ['', '告警1', '不存在'])
+@pytest.mark.parametrize('category', ['', '水泵', '风机'])
+@pytest.mark.parametrize('correctness', ['', 'correct', 'incorrect', 'parse_failed'])
+def test_facets_exclude_only_their_own_filter(client, search, category, correctness):
+    params = {'search': search, 'category': category, 'correctness': correctness}
+    facets = client.get('/api/results', query_string=dict(params, size=1, facets=1)).get_json()['facets']
+
+    # 分类分面：不按分类筛选，其余条件不变
+    expected = {value: _total(client, **dict(params, category=value)) for value in ('水泵', '风机')}
+    assert {entry['value']: entry['count'] for entry in facets['category']} == {
+        value: count for value, count in expected.items() if count}
+
+    # 预测结果分面：不按预测结果筛选，其余条件不变
+    assert facets['correctness'] == {option: _total(client, **dict(params, correctness=option))
+                                     for option in app.CORRECTNESS_OPTIONS}
+
+    # 场景没有筛选条件，按全部条件筛选后计数
+    rows = client.get('/api/results', query_string=dict(params, size=1000)).get_json()['results']
+    assert {entry['value']: entry['count'] for entry in facets['scenario']} == dict(
+        Counter(row['meta']['scenario_id'] for row in rows))
+
+
+def test_facets_param_selects_facets(client):
+    data = client.get('/api/results', query_string={'size': 1, 'facets': 'correctness,unknown'}).get_json()
+    assert set(data['facets']) == {'correctness'}
+    assert sum(data['facets']['correctness'].values()) == 53
+    assert 'facets' not in client.get('/api/results', query_string={'size': 1}).get_json()
@@ -0,0 +1,104 @@
+import json
+import random
+
+import numpy as np
+import pytest
+
+import app
+
+WORDS = ['alpha', 'Beta', '模型', '输出', '水泵', '压力', 'ä', 'Ω', 'none', '告警', 'x', '12', '😀']
+QUERIES = ['al', 'alpha', 'ALPHA', 'beta', 'ta', '模型', '型输', '水泵压力', 'ä', 'Ωx', 'none', 'no', '告警12',
+           '12', '😀', '😀模', 'a', '', 'zz', 'alpha beta', 'tano']
+
+
+def _random_text(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(0, 12))) if rng.random() > 0.1 else ''
+
+
+@pytest.fixture()
+def results_file(tmp_path):
+    rng = random.Random(7)
+    path = tmp_path / 'results.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for i in range(600):
+            record = {'alarm_id': f'a{i}', 'meta': {'category': rng.choice(['水泵', '风机']), 'scenario_id': 's1'}}
+            for field in app.SEARCH_FIELDS:
+                if rng.random() > 0.05:
+                    record[field] = _random_text(rng)
+            f.write(json.dumps(record, ensure_ascii=False) + '\n')
+    return path
+
+
+def _dataset(path, mode):
+    loaded = app.parse_results_file(str(path), mode=mode)
+    return app.Dataset(**app.results_fields(loaded, str(path), 'test'))
+
+
+def _scan(ds, search_lower, category, correctness):
+    """不使用索引的逐条子串扫描"""
+    mask = ds.columns.mask(category, correctness)
+    return [p for p in range(len(ds.results))
+            if (mask is None or mask[p]) and app._match_search(ds.results[p], search_lower)]
+
+
+@pytest.mark.parametrize('mode', app.LOAD_MODES)
+@pytest.mark.parametrize('indexed_rows', [0, 1, 257, 600])
+def test_index_matches_substring_scan(results_file, monkeypatch, mode, indexed_rows):
+    # 批次很小，构建出多个索引段并触发合并
+    monkeypatch.setattr(app, 'SEARCH_INDEX_BATCH_CHARS', 300)
+    ds = _dataset(results_file, mode)
+    index = ds.search_index
+    if mode == app.LOAD_MODE_MMAP:
+        # mmap模式不建索引，逐条解码记录校验
+        assert index is None
+    else:
+        index._build([ds.results[p] for p in range(indexed_rows)])
+        assert index.indexed_rows == indexed_rows
+        if indexed_rows == 600:
+            assert 1 < len(index.segments) < 20
+
+    for search in QUERIES:
+        for category in ('', '水泵'):
+            if not (search or category):
+                continue
+            expected = _scan(ds, search.lower(), category, '')
+            positions = app._compute_filter_positions(ds, search.lower(), category, '')
+            assert positions.tolist() == expected, (search, category)
+
+
+def test_candidates_cover_all_matches(results_file, monkeypatch):
+    monkeypatch.setattr(app, 'SEARCH_INDEX_BATCH_CHARS', 500)
+    ds = _dataset(results_file, app.LOAD_MODE_MEMORY)
+    ds.search_index._build(ds.results)
+    for search in QUERIES:
+        found = ds.search_index.candidates(search.lower(), len(ds.results))
+        if found is None:
+            continue
+        candidates, indexed = found
+        assert indexed == len(ds.results)
+        assert np.all(np.diff(candidates) > 0)
+        assert set(_scan(ds, search.lower(), '', '')) <= set(candidates.tolist())
+
+
+def test_filter_positions_builds_index_in_background(results_file):
+    ds = _dataset(results_file, app.LOAD_MODE_MEMORY)
+    app.filter_cache.clear()
+    positions = app.filter_positions(ds, search='Alpha')
+    assert list(positions) == _scan(ds, 'alpha', '', '')
+    for thread in [t for t in app.threading.enumerate() if t.name == 'search-index']:
+        thread.join(10)
+    assert ds.search_index.indexed_rows == len(ds.results)
+
+
+def test_preload_waits_for_eager_index(results_file, monkeypatch):
+    # fork前必须构建完成，否则子进程继承“正在构建”的标记而永远不再构建
+    monkeypatch.setattr(app, 'SEARCH_INDEX_MODE', 'eager')
+    monkeypatch.setattr(app, 'SEARCH_INDEX_BATCH_CHARS', 300)
+    monkeypatch.setattr(app, 'RESULTS_SNAPSHOT_DIR', '')
+    try:
+        app.preload_data(results_path=str(results_file))
+        index = app.dataset.search_index
+        assert not index.building
+        assert index.indexed_rows == len(app.dataset.results)
+    finally:
+        app.clear_loaded_data()
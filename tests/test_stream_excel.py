@@ -0,0 +1,70 @@
+import datetime
+import json
+
+import pytest
+
+import app
+
+openpyxl = pytest.importorskip('openpyxl')
+pytest.importorskip('pandas')
+
+
+@pytest.fixture
+def workbook(tmp_path, monkeypatch):
+    monkeypatch.setattr(app, 'EXCEL_SIDECAR_DIR', '')
+    wb = openpyxl.Workbook()
+    ws = wb.active
+    ws.title = '报警'
+    # 重复列名、空列名、数字列名
+    ws.append(['name', 'num', None, 'num', 'when', 'mixed', 'flag', 3, 'code', 'ratio'])
+    ws.append(['a', 1, 'x', 5, datetime.datetime(2024, 1, 2, 3, 4, 5), 1, True, 'q', '001', 1.5])
+    ws.append(['b', None, None, 6, None, 'str', False, None, 'NA', 2.0])
+    ws.append([None] * 10)  # 中间的空行
+    ws.append(['c', 3, None, 7, datetime.datetime(2024, 2, 1), datetime.datetime(2024, 3, 1), None, None, '0012', 3])
+    ws.append(['d', 4, None, 8, datetime.datetime(2024, 2, 2), 2.5, True, None, 'null', None, 'extra'])
+    # 只有格式没有值的尾部行
+    for row in range(7, 12):
+        ws.cell(row=row, column=1).number_format = '0.00'
+        ws.cell(row=row, column=5).number_format = 'yyyy-mm-dd'
+
+    ws = wb.create_sheet('长表')
+    ws.append(['id', 'val', 'half'])
+    for i in range(120):
+        ws.append([i, f'v{i}', i * 0.5 if i % 7 else None])
+
+    path = tmp_path / 'book.xlsx'
+    wb.save(path)
+    return path
+
+
+def _read(monkeypatch, backend, *args):
+    monkeypatch.setattr(app, 'EXCEL_READER_BACKEND', backend)
+    with app.app.app_context():
+        window = app.read_excel_window(*args)
+    # 按接口返回的JSON比较，日期等类型的差异也能发现
+    return json.dumps(window, default=str, ensure_ascii=False)
+
+
+@pytest.mark.parametrize('sheet', ['报警', '长表'])
+@pytest.mark.parametrize('offset, limit, columns', [
+    (0, None, None),
+    (0, 3, None),
+    (2, 2, None),
+    (4, 10, None),
+    (50, 20, None),
+    (200, 5, None),
+    (0, None, ['name', 'num.1', '3', 'when', 'id', 'half']),
+    (1, 2, ['flag', 'code', 'missing']),
+])
+def test_stream_reader_matches_pandas(workbook, monkeypatch, sheet, offset, limit, columns):
+    expected = _read(monkeypatch, app.EXCEL_READER_PANDAS, workbook, sheet, offset, limit, columns)
+    actual = _read(monkeypatch, app.EXCEL_READER_STREAM, workbook, sheet, offset, limit, columns)
+    assert json.loads(expected) is not None
+    assert actual == expected
+
+
+def test_stream_reader_counts_whole_sheet(workbook, monkeypatch):
+    window = json.loads(_read(monkeypatch, app.EXCEL_READER_STREAM, workbook, '报警', 0, 1, None))
+    # 中间的空行保留，尾部只有格式的行不计
+    assert window['total_rows'] == 5
+    assert len(window['records']) == 1